@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BasesiteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'basesite'
+
+    def ready(self):
+        # connect cache, index and metrics receivers
+        from basesite import trending, search, tag_index, generations, metrics  # noqa: F401
@@ -0,0 +1,26 @@
+from django.core.cache.backends import locmem, redis
+
+from basesite.middleware import count_cache_lookup
+
+
+class CountingCacheMixin:
+    """Counts hits and misses of get() and get_many() in the stats of the request measured by PerformanceMiddleware"""
+
+    def get(self, key, default=None, version=None):
+        get = super().get
+        return count_cache_lookup(lambda: get(key, default, version),
+                                  lambda result: (0, 1) if result is default else (1, 0))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        get_many = super().get_many
+        return count_cache_lookup(lambda: get_many(keys, version),
+                                  lambda result: (len(result), len(keys) - len(result)))
+
+
+class LocMemCache(CountingCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(CountingCacheMixin, redis.RedisCache):
+    pass
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from basesite.trending import get_trending_questions, get_trending_generation
+
+
+def trending(request):
+    """Trending column data, evaluated only if the rendered template uses it (and misses its cached fragment)"""
+    return {'trending_object_list': SimpleLazyObject(get_trending_questions),
+            'trending_generation': SimpleLazyObject(get_trending_generation)}
+
+
+def fragments(request):
+    return {'fragment_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT}
@@ -0,0 +1,100 @@
+import json
+import zlib
+from datetime import datetime
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from basesite.models import Question, Answer, Tag, QuestionVotedBy, AnswerVotedBy
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()  # full precision, unlike DjangoJSONEncoder: exported times are cursors
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _rows(queryset, fields, chunk_size):
+    """Rows of a values_list() queryset as dicts, read in chunks (by a server-side cursor where there is one)"""
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        yield dict(zip(fields, row))
+
+
+def _vote_rows(through, target, since, chunk_size):
+    """Up and down votes per voted object, as stored by the *VotedBy models"""
+    queryset = through.objects.exclude(vote=0)
+    if since is not None:
+        queryset = queryset.filter(**{f'{target}__updated_at__gte': since})
+    queryset = (queryset.values(f'{target}_id')
+                .annotate(up=Count('id', filter=Q(vote__gt=0)), down=Count('id', filter=Q(vote__lt=0)))
+                .order_by(f'{target}_id'))
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield {'id': row[f'{target}_id'], 'up': row['up'], 'down': row['down']}
+
+
+def parse_since(value):
+    """Time to export changes since, from an ISO 8601 value such as the cursor of a previous export"""
+    since = parse_datetime(value.strip())
+    if since is None:
+        raise ValueError(f'Not an ISO 8601 date and time: {value}')
+    return since if timezone.is_aware(since) else timezone.make_aware(since)
+
+
+def export_records(since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Q&A corpus as a stream of records, each a dict with its 'type': tags, questions, answers, and up/down vote
+    counts of questions and answers, ordered by id within a type. Every table is read in chunks, so memory use does
+    not depend on its size.
+
+    With `since` (an aware datetime) only questions and answers changed since then are exported, with their votes;
+    tags are always exported in full. Deletions are not exported. The last record, of type 'end', has the `cursor` to
+    export changes since this export with: the time it started, so rows changed while it ran are exported again
+    rather than missed.
+    """
+    started = timezone.now()
+    counts = {}
+    questions = Question.objects.order_by('id')
+    answers = Answer.objects.order_by('id')
+    if since is not None:
+        questions = questions.filter(updated_at__gte=since)
+        answers = answers.filter(updated_at__gte=since)
+    streams = (
+        ('tag', _rows(Tag.objects.order_by('id'), ('id', 'tag', 'slug', 'question_count'), chunk_size)),
+        ('question', _rows(questions, ('id', 'author_id', 'author_name', 'title', 'message', 'date_created',
+                                       'updated_at', 'votes', 'answer_count', 'tags_cache', 'accepted_answer_id'),
+                           chunk_size)),
+        # correct as of the export: accepting changes the question only, its accepted_answer_id is exported since
+        ('answer', _rows(answers.with_correct().annotate(author_name=F('author__username')),
+                         ('id', 'question_id', 'author_id', 'author_name', 'message', 'date_created', 'updated_at',
+                          'votes', 'correct'), chunk_size)),
+        ('question_votes', _vote_rows(QuestionVotedBy, 'question', since, chunk_size)),
+        ('answer_votes', _vote_rows(AnswerVotedBy, 'answer', since, chunk_size)),
+    )
+    for record_type, rows in streams:
+        counts[record_type] = 0
+        for row in rows:
+            counts[record_type] += 1
+            yield {'type': record_type, **row}
+    yield {'type': 'end', 'since': since, 'cursor': started, 'counts': counts}
+
+
+def export_ndjson(since=None, chunk_size=EXPORT_CHUNK_SIZE, compress=False):
+    """export_records() as NDJSON lines (bytes), gzip compressed if `compress`, in pieces of about one chunk"""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    buffer = []
+    for index, record in enumerate(export_records(since, chunk_size), 1):
+        buffer.append(json.dumps(record, default=_json_default, ensure_ascii=False))
+        if index % chunk_size == 0:
+            data = ('\n'.join(buffer) + '\n').encode()
+            buffer = []
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+    data = ('\n'.join(buffer) + '\n').encode() if buffer else b''
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
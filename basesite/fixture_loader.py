@@ -0,0 +1,88 @@
+import hashlib
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from basesite.models import LoadedFixture
+
+# demo content, in the order it has to be loaded in
+DEFAULT_FIXTURES = tuple(os.path.join(settings.BASE_DIR, 'basesite', 'fixtures', f'{name}.json')
+                         for name in ('user', 'userprofile', 'tag', 'question', 'answer'))
+
+
+def checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fixture_key(path):
+    """Fixture path as stored in LoadedFixture: relative to the project, so it does not depend on where it is"""
+    return os.path.relpath(os.path.abspath(path), settings.BASE_DIR)
+
+
+def changed_fixtures(paths):
+    """{path: checksum} of the fixtures which have not been loaded with their current content"""
+    checksums = {path: checksum(path) for path in paths}
+    loaded = dict(LoadedFixture.objects.filter(path__in=[fixture_key(path) for path in paths])
+                  .values_list('path', 'checksum'))
+    return {path: value for path, value in checksums.items() if loaded.get(fixture_key(path)) != value}
+
+
+def _bulk_upsert(model, objects, m2m_data):
+    """Insert objects, or update the rows with their pks, then replace their many-to-many links"""
+    meta = model._meta
+    update_fields = [field.name for field in meta.concrete_fields if not field.primary_key]
+    model.objects.bulk_create(objects, batch_size=1000, update_conflicts=bool(update_fields),
+                              unique_fields=[meta.pk.name], update_fields=update_fields or None)
+    for field_name, links in m2m_data.items():
+        field = meta.get_field(field_name)
+        through = field.remote_field.through
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        through.objects.filter(**{f'{source}__in': [obj.pk for obj in objects]}).delete()
+        through.objects.bulk_create([through(**{f'{source}_id': pk, f'{target}_id': target_pk})
+                                     for pk, target_pks in links for target_pk in target_pks], batch_size=1000)
+
+
+def load_fixture(path):
+    """Load a JSON fixture with bulk statements: no save() and no signals, unlike loaddata. Returns rows loaded"""
+    objects, m2m_data = defaultdict(list), defaultdict(lambda: defaultdict(list))
+    with open(path, 'rb') as f:
+        for deserialized in serializers.deserialize('json', f, handle_forward_references=False):
+            obj = deserialized.object
+            objects[type(obj)].append(obj)
+            for field_name, pks in (deserialized.m2m_data or {}).items():
+                m2m_data[type(obj)][field_name].append((obj.pk, pks))
+    for model, model_objects in objects.items():
+        _bulk_upsert(model, model_objects, m2m_data[model])
+    statements = connection.ops.sequence_reset_sql(no_style(), list(objects))  # rows came with their pks
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    return sum(len(model_objects) for model_objects in objects.values())
+
+
+def load_fixtures(paths=DEFAULT_FIXTURES, force=False):
+    """
+    Load the fixtures, in the given order, unless they have all been loaded with their current content already
+    (or `force`). All fixtures are reloaded when any of them changed, as they refer to each other; rows are
+    upserted by pk. Returns {path: rows loaded}, empty if nothing was loaded.
+    """
+    paths = list(paths)
+    changed = changed_fixtures(paths)
+    if not changed and not force:
+        return {}
+    checksums = {path: changed.get(path) or checksum(path) for path in paths}
+    loaded = {}
+    with transaction.atomic():
+        for path in paths:
+            loaded[path] = load_fixture(path)
+            LoadedFixture.objects.update_or_create(path=fixture_key(path), defaults={'checksum': checksums[path]})
+    return loaded
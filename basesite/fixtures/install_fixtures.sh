@@ -1,7 +1,3 @@
 #!/bin/bash
 
-python manage.py loaddata basesite/fixtures/user.json
-python manage.py loaddata basesite/fixtures/userprofile.json
-python manage.py loaddata basesite/fixtures/tag.json
-python manage.py loaddata basesite/fixtures/question.json
-python manage.py loaddata basesite/fixtures/answer.json
\ No newline at end of file
+python manage.py load_fixtures
@@ -13,19 +13,17 @@ class QuestionCreateForm(forms.ModelForm):
     def clean_tags(self):
         data = self.data.getlist('tags')
         if len(data) > self.Meta.model.max_tags:
-            raise forms.ValidationError({'tags': f"Maximum number of tags: {self.Meta.model.max_tags}"})
-        cleaned_tags = []
-        for tag in data:
-            tag_object, _ = self.Meta.model.tags.field.related_model.objects.get_or_create(tag=tag.strip())
-            cleaned_tags.append(tag_object)
-        return cleaned_tags
+            raise forms.ValidationError(f"Maximum number of tags: {self.Meta.model.max_tags}")
+        return self.Meta.model.tags.field.related_model.get_or_create_many(tag.strip() for tag in data)
 
     def clean(self):
         cleaned_data = super(QuestionCreateForm, self).clean()
-        if 'tags' in self.errors:
+        if 'tags' in self.errors:  # new tags are no valid choices of the model field, so clean_tags was not called
             del self.errors['tags']
-        cleaned_tags = self.clean_tags()
-        cleaned_data['tags'] = cleaned_tags
+            try:
+                cleaned_data['tags'] = self.clean_tags()
+            except forms.ValidationError as e:
+                self.add_error('tags', e)
         return cleaned_data
 
 
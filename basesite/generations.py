@@ -0,0 +1,123 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from basesite.models import Question, Answer, Tag, UserProfile, vote_counted
+
+GENERATION_KEY = 'basesite:generation:{}'
+
+# scopes of data generations: cached content is keyed by the generations of the scopes it shows, and every write bumps
+# the generations of the scopes it changes, so stale entries are never looked up again rather than searched for
+QUESTIONS = 'questions'  # any question as shown in lists: every question, answer count, vote and tag change
+ANSWERS = 'answers'  # any answer
+EVERYTHING = 'everything'  # writes to an unknown set of questions: tag renames and deletions, authors, commands
+TRENDING = 'trending'  # the trending column, bumped when its list is invalidated or recomputed differently
+
+
+def question_scope(question_id):
+    """One question as shown on its own"""
+    return f'question:{question_id}'
+
+
+def tag_scope(slug):
+    """Questions of a tag, as listed on its page"""
+    return f'tag:{slug}'
+
+
+def question_list_scopes(question_id, tags_cache=None):
+    """Scopes showing a question: its own, the question lists and the pages of its tags (read if not given)"""
+    if tags_cache is None:
+        tags_cache = Question.objects.filter(pk=question_id).values_list('tags_cache', flat=True).first() or []
+    return (QUESTIONS, question_scope(question_id), *(tag_scope(tag['slug']) for tag in tags_cache))
+
+
+def get_generations(*scopes):
+    """Current generations of the scopes, started for scopes which have none (never seen, or evicted)"""
+    keys = [GENERATION_KEY.format(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    missing = [key for key in keys if key not in generations]
+    if missing:
+        start = time.time_ns()  # never a generation seen before, even after an eviction
+        for key in missing:
+            cache.add(key, start, None)
+        generations.update(cache.get_many(missing))
+    return tuple(generations.get(key) for key in keys)
+
+
+def bump_generations(*scopes):
+    now = time.time_ns()
+    cache.set_many({GENERATION_KEY.format(scope): now for scope in scopes}, None)
+
+
+def bump_generations_on_commit(*scopes):
+    """
+    Bump once the write commits (at once outside of a transaction): bumped earlier, a concurrent reader could cache
+    rows read before the commit under the new generations, and nothing would invalidate them
+    """
+    transaction.on_commit(lambda: bump_generations(*scopes))
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def bump_on_question_change(instance, **kwargs):
+    bump_generations_on_commit(*question_list_scopes(instance.id, instance.tags_cache))
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def bump_on_answer_change(instance, signal, created=False, **kwargs):
+    if created or signal is post_delete:  # answer count of the question
+        question = instance.question if Answer.question.is_cached(instance) else None
+        scopes = question_list_scopes(instance.question_id, question and question.tags_cache)
+        bump_generations_on_commit(ANSWERS, *scopes)
+    else:
+        bump_generations_on_commit(ANSWERS, question_scope(instance.question_id))
+
+
+@receiver(vote_counted, sender=Question)
+def bump_on_question_vote(target_id, tags_cache=None, **kwargs):
+    bump_generations(*question_list_scopes(target_id, tags_cache))
+
+
+@receiver(vote_counted, sender=Answer)
+def bump_on_answer_vote(target_id, question_id=None, **kwargs):
+    if question_id is None:
+        question_id = Answer.objects.filter(pk=target_id).values_list('question_id', flat=True).first()
+    bump_generations(ANSWERS, question_scope(question_id))
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def bump_on_question_tags_change(instance, action, reverse, pk_set, **kwargs):
+    if not reverse:  # added, removed or cleared tags of a question: pages of its tags before and after
+        if action.startswith('pre_'):
+            instance._tags_cache_before = instance.tags_cache
+        else:  # tags_cache is refreshed in memory by the receiver in basesite.models
+            tags_cache = getattr(instance, '_tags_cache_before', []) + instance.tags_cache
+            bump_generations_on_commit(*question_list_scopes(instance.id, tags_cache))
+    elif action.startswith('post_'):  # tag.question_set.add(...): pk_set are questions
+        if action == 'post_clear':  # remembered on pre_clear by the receiver in basesite.models
+            pk_set = getattr(instance, '_cleared_question_ids', [])
+        bump_generations_on_commit(QUESTIONS, tag_scope(instance.slug), *(question_scope(pk) for pk in pk_set))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_on_tag_change(**kwargs):
+    bump_generations_on_commit(EVERYTHING)
+
+
+@receiver(post_save, sender=User)
+def bump_on_user_rename(created, raw, update_fields, **kwargs):
+    if created or raw or (update_fields is not None and 'username' not in update_fields):
+        return
+    bump_generations_on_commit(EVERYTHING)  # author names
+
+
+@receiver(post_save, sender=UserProfile)
+def bump_on_profile_change(created, raw, **kwargs):
+    if not (created or raw):
+        bump_generations_on_commit(EVERYTHING)  # avatars
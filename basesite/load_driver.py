@@ -0,0 +1,141 @@
+import math
+import random
+import threading
+import time
+from collections import namedtuple, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from basesite.models import Question, Tag
+from basesite.synthetic import WORDS, ZipfSampler
+
+# name: reported name, weight: share of the mix, login: sent by a logged in user, build: () -> (method, url, data)
+Endpoint = namedtuple('Endpoint', 'name weight login build')
+
+LoadResult = namedtuple('LoadResult', 'endpoint status seconds')
+
+
+def build_endpoints(rnd, sample_size=10000):
+    """
+    Realistic mix of the site and API requests, over the questions and tags in the database: mostly recent questions,
+    tags by popularity, first pages far more often than deep ones
+    """
+    question_ids = list(Question.objects.order_by('-id').values_list('id', flat=True)[:sample_size])
+    tags = list(Tag.objects.order_by('-question_count').values_list('slug', 'tag')[:sample_size])
+    if not question_ids or not tags:
+        raise ValueError('No questions or tags to request, generate some with generate_data first')
+    tag_sampler = ZipfSampler(tags, 1.1, rnd)
+
+    def page():
+        return min(int(rnd.expovariate(1.0)) + 1, 10)
+
+    def question():
+        return question_ids[min(int(rnd.expovariate(1 / 200)), len(question_ids) - 1)]
+
+    def word():
+        return rnd.choice(WORDS)
+
+    return [
+        Endpoint('list', 20, False, lambda: ('get', reverse('list'), {
+            'ordering': rnd.choice(('-date_created', '-votes', 'hot')), 'page': page()})),
+        Endpoint('tag-list', 10, False, lambda: ('get', reverse('tag-list', args=[tag_sampler.sample(1)[0][0]]),
+                                                 {'page': page()})),
+        Endpoint('search', 8, False, lambda: ('get', reverse('search'), {'q': ' '.join(
+            word() for _ in range(rnd.randint(1, 2)))})),
+        Endpoint('question-detail', 25, False, lambda: ('get', reverse('question-detail', args=[question()]), {})),
+        Endpoint('tag-typeahead', 5, False, lambda: ('get', reverse('tag-typeahead'), {
+            'query': tag_sampler.sample(1)[0][1][:rnd.randint(2, 6)]})),
+        Endpoint('api-question-list', 8, True, lambda: ('get', reverse('api-question-list'), {
+            'ordering': rnd.choice(('-date_created', '-votes', 'hot')), 'page': page()})),
+        Endpoint('api-question-detail', 8, True, lambda: ('get', reverse('api-question-detail', args=[question()]),
+                                                          rnd.choice(({}, {'include': 'answers,tags,author'})))),
+        Endpoint('api-answer-list', 5, True, lambda: ('get', reverse('api-answer-list', args=[question()]), {})),
+        Endpoint('api-trending', 3, True, lambda: ('get', reverse('api-question-trending-list'), {})),
+        Endpoint('vote', 3, True, lambda: ('post', reverse('vote', args=[question()]), {
+            'instance_type': 'q', 'instance_id': 0, 'increment': rnd.choice((-1, 1))})),
+    ]
+
+
+def default_host():
+    """A host name the site accepts, for requests made without a network"""
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class LoadReport:
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+
+    def rows(self):
+        """Per endpoint, and 'total' in the end: requests, errors, throughput (per second), p50/p95/p99/max in ms"""
+        by_endpoint = defaultdict(list)
+        for result in self.results:
+            by_endpoint[result.endpoint].append(result)
+        rows = []
+        for name, results in sorted(by_endpoint.items()) + [('total', self.results)]:
+            seconds = sorted(result.seconds for result in results)
+            rows.append({
+                'endpoint': name,
+                'requests': len(results),
+                'errors': sum(result.status >= 500 for result in results),
+                'throughput': len(results) / self.elapsed if self.elapsed else 0.0,
+                **{f'p{p}': percentile(seconds, p) * 1000 for p in (50, 95, 99)},
+                'max': seconds[-1] * 1000,
+            })
+        return rows
+
+
+def run_load(requests=1000, concurrency=4, seed=None, host=None, endpoints=None):
+    """
+    Send `requests` requests, picked from the endpoint mix, from `concurrency` threads, each with its own anonymous
+    and logged in test client (and database connection): everything runs in this process, nothing needs a server.
+    """
+    rnd = random.Random(seed)
+    endpoints = endpoints or build_endpoints(rnd)
+    plan = [(endpoint.name, endpoint.login, *endpoint.build())
+            for endpoint in rnd.choices(endpoints, weights=[endpoint.weight for endpoint in endpoints], k=requests)]
+    users = list(User.objects.order_by('-id').values_list('id', flat=True)[:concurrency])
+    if not users:
+        raise ValueError('No users to log in with, generate some with generate_data first')
+    host = host or default_host()
+    results = []
+    lock = threading.Lock()
+
+    clients = []
+    for index in range(concurrency):  # logged in up front: session writes from threads would contend on SQLite
+        logged = Client(HTTP_HOST=host, raise_request_exception=False)
+        logged.force_login(User.objects.get(pk=users[index % len(users)]))
+        clients.append((Client(HTTP_HOST=host, raise_request_exception=False), logged))
+
+    def worker(index):
+        anonymous, logged = clients[index]
+        try:
+            for name, login, method, url, data in plan[index::concurrency]:
+                client = logged if login else anonymous
+                start = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    results.append(LoadResult(name, response.status_code, elapsed))
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return LoadReport(results, time.perf_counter() - start)
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from basesite.generations import bump_generations, EVERYTHING
+from basesite.models import Question, Tag, Counter
+
+
+class Command(BaseCommand):
+    help = ("Recalculate denormalized Question fields: answer_count, tags_cache and author_name, and the question "
+            "counters of list pages")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Questions updated per bulk statement')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = (Question.objects.select_related('author').prefetch_related('tags')
+                    .annotate(answers_total=Count('answers')).order_by('id'))
+        batch, updated = [], 0
+        for question in queryset.iterator(chunk_size=batch_size):
+            values = {'answer_count': question.answers_total,
+                      'tags_cache': Question.build_tags_cache(question.tags.all()),
+                      'author_name': question.author.username}
+            if all(getattr(question, field) == value for field, value in values.items()):
+                continue  # untouched: updated_at drives incremental exports and ETags
+            for field, value in values.items():
+                setattr(question, field, value)
+            question.updated_at = timezone.now()
+            batch.append(question)
+            if len(batch) >= batch_size:
+                updated += self._flush(batch)
+                batch = []
+        updated += self._flush(batch)
+        Counter.objects.update_or_create(name=Counter.QUESTIONS, defaults={'value': Question.objects.count()})
+        Tag.refresh_question_count(Tag.objects.values_list('id', flat=True))
+        bump_generations(EVERYTHING)
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} questions"))
+
+    @staticmethod
+    def _flush(batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            Question.objects.bulk_update(batch, ['answer_count', 'tags_cache', 'author_name', 'updated_at'])
+        return len(batch)
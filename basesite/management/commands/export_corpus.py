@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from basesite.export import EXPORT_CHUNK_SIZE, export_ndjson, parse_since
+
+
+class Command(BaseCommand):
+    help = ("Stream questions, answers, tags and vote counts as NDJSON, one record per line, with memory use "
+            "independent of the number of rows; the last line has the cursor for the next --since export")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='File to write, standard output if not given')
+        parser.add_argument('--gzip', action='store_true', help='Compress with gzip (also if --output ends with .gz)')
+        parser.add_argument('--since', help="Export changes since this time: the 'cursor' of a previous export")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows read per database fetch')
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since']) if options['since'] else None
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        output = options['output']
+        compress = options['gzip'] or bool(output and output.endswith('.gz'))
+        chunks = export_ndjson(since=since, chunk_size=options['chunk_size'], compress=compress)
+        if output:
+            with open(output, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            return
+        stream = getattr(self.stdout, 'buffer', None)  # binary stream under the text one
+        if stream is None and compress:
+            raise CommandError('Compressed output needs --output or a binary standard output')
+        for chunk in chunks:
+            if stream is not None:
+                stream.write(chunk)
+            else:
+                self.stdout.write(chunk.decode(), ending='')
+        self.stdout.flush()
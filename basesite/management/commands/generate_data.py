@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from basesite.synthetic import SYNTHETIC_PASSWORD, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = ("Generate synthetic users, tags, questions, answers and votes with bulk inserts, with Zipf-distributed "
+            "tag usage and heavy-tailed votes, keeping counters, hot scores and the search index in step")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--questions', type=int, default=1000)
+        parser.add_argument('--answers-per-question', type=float, default=3, help='Mean answers per question')
+        parser.add_argument('--votes-per-question', type=float, default=5, help='Mean votes per question')
+        parser.add_argument('--zipf-s', type=float, default=1.1, help='Skew of tag usage: larger is more skewed')
+        parser.add_argument('--days', type=int, default=365, help='Questions are spread over this many past days')
+        parser.add_argument('--batch-size', type=int, default=500, help='Questions inserted per transaction')
+        parser.add_argument('--seed', type=int, help='Seed for reproducible data')
+
+    def handle(self, *args, **options):
+        generator = SyntheticDataGenerator(
+            users=options['users'], tags=options['tags'], questions=options['questions'],
+            answers_per_question=options['answers_per_question'], votes_per_question=options['votes_per_question'],
+            zipf_s=options['zipf_s'], days=options['days'], batch_size=options['batch_size'], seed=options['seed'],
+            stdout=self.stdout)
+        created = generator.generate()
+        self.stdout.write(self.style.SUCCESS(
+            'Created ' + ', '.join(f'{count} {name}' for name, count in created.items())
+            + f"; users are {generator.prefix}_user<n>, password {SYNTHETIC_PASSWORD}"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from basesite.load_driver import run_load
+
+
+class Command(BaseCommand):
+    help = ("Replay a realistic mix of site and API requests from concurrent threads in this process, without a "
+            "server or network, and report throughput and p50/p95/p99 latency per endpoint")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=4, help='Threads sending requests')
+        parser.add_argument('--seed', type=int, help='Seed for a reproducible request mix')
+        parser.add_argument('--host', help='Host header, the first of ALLOWED_HOSTS by default')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_load(requests=options['requests'], concurrency=options['concurrency'], seed=options['seed'],
+                              host=options['host'])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"{'endpoint':<22}{'requests':>9}{'errors':>7}{'req/s':>9}"
+                          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for row in report.rows():
+            self.stdout.write(f"{row['endpoint']:<22}{row['requests']:>9}{row['errors']:>7}{row['throughput']:>9.1f}"
+                              f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{row['max']:>9.1f}")
+        self.stdout.write(f"{len(report.results)} requests in {report.elapsed:.2f}s")
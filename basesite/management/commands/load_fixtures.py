@@ -0,0 +1,25 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from basesite.fixture_loader import DEFAULT_FIXTURES, load_fixtures
+
+
+class Command(BaseCommand):
+    help = ("Load JSON fixtures (the demo content by default) in one process with bulk statements and no signals, "
+            "unless they have been loaded with the same content already; then refresh denormalized question fields "
+            "and the search index, which bulk loading bypasses")
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixtures', nargs='*', help='Fixture files, in the order to load them in')
+        parser.add_argument('--force', action='store_true', help='Load fixtures even if they have not changed')
+
+    def handle(self, *args, **options):
+        loaded = load_fixtures(options['fixtures'] or DEFAULT_FIXTURES, force=options['force'])
+        if not loaded:
+            self.stdout.write("Fixtures have not changed since they were loaded, nothing to do")
+            return
+        for path, rows in loaded.items():
+            self.stdout.write(f"Loaded {rows} rows from {path}")
+        for command in ('backfill_question_counters', 'update_hot_scores', 'rebuild_search_index'):
+            call_command(command, stdout=self.stdout, stderr=self.stderr)
+        self.stdout.write(self.style.SUCCESS(f"Loaded {sum(loaded.values())} rows"))
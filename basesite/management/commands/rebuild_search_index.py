@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from basesite.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Reindex all questions for full-text search, ex. after loaddata (which bypasses incremental indexing)"
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} questions"))
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from basesite.notifications import send_answer_digests
+
+
+class Command(BaseCommand):
+    help = "Send digest emails about new answers to question authors"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=settings.ANSWER_NOTIFICATION_WINDOW,
+                            help='Seconds to wait for more answers before an author is notified')
+        parser.add_argument('--loop', action='store_true', help='Keep running, sending digests every --interval')
+        parser.add_argument('--interval', type=int, default=30, help='Seconds between runs in --loop mode')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_answer_digests(window=options['window'])
+            if sent:
+                self.stdout.write(f"Sent {sent} answer digest(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
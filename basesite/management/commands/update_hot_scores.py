@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from basesite.generations import bump_generations, EVERYTHING
+from basesite.models import Question
+
+
+class Command(BaseCommand):
+    help = ("Recalculate Question.hot_score and write only the rows where it changed, ex. after votes or answers were "
+            "loaded bypassing the model (loaddata, bulk updates) or HOT_SCORE_* settings were changed")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Questions read and updated per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rows = Question.objects.values_list('id', 'date_created', 'votes', 'answer_count', 'hot_score').order_by('id')
+        changed, updated = [], 0
+        for question_id, date_created, votes, answer_count, hot_score in rows.iterator(chunk_size=batch_size):
+            score = Question.compute_hot_score(date_created, votes, answer_count)
+            if score != hot_score:
+                changed.append(Question(id=question_id, hot_score=score, updated_at=timezone.now()))
+            if len(changed) >= batch_size:
+                updated += self._flush(changed)
+                changed = []
+        updated += self._flush(changed)
+        if updated:
+            bump_generations(EVERYTHING)
+        self.stdout.write(self.style.SUCCESS(f"Updated hot score of {updated} questions"))
+
+    @staticmethod
+    def _flush(changed):
+        if not changed:
+            return 0
+        with transaction.atomic():
+            Question.objects.bulk_update(changed, ['hot_score', 'updated_at'])
+        return len(changed)
@@ -0,0 +1,74 @@
+import hmac
+import ipaddress
+import os
+
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from basesite.models import Question, Answer, vote_counted
+
+# Metrics of all uwsgi workers are aggregated through files in the PROMETHEUS_MULTIPROC_DIR directory, when this
+# environment variable is set (it has to be set before the workers start, and the directory emptied)
+
+REQUESTS = Counter('hasker_requests_total', 'Requests by URL name, method and status',
+                   ['view', 'method', 'status'])
+REQUEST_DURATION = Histogram('hasker_request_duration_seconds', 'Request latency by URL name', ['view'],
+                             buckets=(.005, .01, .025, .05, .075, .1, .25, .5, .75, 1, 2.5, 5, 10))
+REQUEST_QUERIES = Histogram('hasker_request_db_queries', 'SQL queries per request by URL name', ['view'],
+                            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+VOTES = Counter('hasker_votes_total', 'Counted votes', ['target', 'direction'])
+WRITES = Counter('hasker_writes_total', 'Created questions and answers', ['model'])
+CACHE_LOOKUPS = Counter('hasker_cache_lookups_total', 'Lookups of the application caches', ['cache', 'result'])
+
+
+def observe_request(request, response, queries, duration):
+    match = request.resolver_match
+    view = match.view_name if match is not None else 'unmatched'  # URL names, not paths: bounded label values
+    REQUESTS.labels(view, request.method, response.status_code).inc()
+    REQUEST_DURATION.labels(view).observe(duration)
+    REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_LOOKUPS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def render_metrics():
+    """Prometheus text exposition of all workers' metrics (or of this process without PROMETHEUS_MULTIPROC_DIR)"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def is_metrics_client(address):
+    """Whether the address is in settings.METRICS_ALLOWED_NETWORKS"""
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS)
+
+
+def has_metrics_token(authorization):
+    """Whether an Authorization header value is `Bearer <settings.METRICS_TOKEN>`, never when no token is set"""
+    scheme, _, token = authorization.partition(' ')
+    return bool(settings.METRICS_TOKEN) and scheme.lower() == 'bearer' \
+        and hmac.compare_digest(token.strip().encode(), settings.METRICS_TOKEN.encode())
+
+
+@receiver(vote_counted)
+def count_vote(sender, increment, **kwargs):
+    VOTES.labels(sender.__name__.lower(), 'up' if increment > 0 else 'down').inc()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Answer)
+def count_write(sender, created, raw=False, **kwargs):
+    if created and not raw:
+        WRITES.labels(sender.__name__.lower()).inc()
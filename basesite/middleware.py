@@ -0,0 +1,149 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from basesite.metrics import observe_request
+
+logger = logging.getLogger('basesite.performance')
+
+# stats of the request being handled in this thread, None outside of PerformanceMiddleware
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'template_time', 'cache_hits', 'cache_misses', 'in_cache')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = self.template_time = 0.0
+        self.cache_hits = self.cache_misses = 0
+        self.in_cache = False  # a cache call is being counted: get_many() of some backends calls get()
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def count_cache_lookup(lookup, count):
+    """
+    Run a cache lookup and add count(result), its (hits, misses), to the stats of the current request. Used by the
+    cache backends of basesite.cache_backends; lookups nested in a counted one (get_many() calling get()) are not
+    counted again.
+    """
+    stats = _current.get()
+    if stats is None or stats.in_cache:
+        return lookup()
+    stats.in_cache = True
+    try:
+        result = lookup()
+    finally:
+        stats.in_cache = False
+    hits, misses = count(result)
+    stats.cache_hits += hits
+    stats.cache_misses += misses
+    return result
+
+
+class PerformanceMiddleware:
+    """
+    Measures every request: SQL queries and their time, template (and API renderer) time, cache hits and misses (of
+    the backends in basesite/cache_backends.py), and the total time spent below this middleware. They are sent in a
+    Server-Timing header (shown by browser dev tools) and logged as one JSON line to the 'basesite.performance' logger,
+    at WARNING for requests slower than PERFORMANCE_SLOW_REQUEST_MS. A PERFORMANCE_PROFILE_SAMPLE_RATE share of
+    requests runs under cProfile, and the profiles of slow ones are written to PERFORMANCE_PROFILE_DIR. Request counts,
+    latency and queries also go to the Prometheus metrics (see basesite/metrics.py).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        profiler = self.start_profiler()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_record_query))
+                response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            _current.reset(token)
+        response['Server-Timing'] = self.server_timing(stats, total)
+        observe_request(request, response, stats.queries, total)
+        slow = total * 1000 >= settings.PERFORMANCE_SLOW_REQUEST_MS
+        self.log(request, response, stats, total, slow)
+        if profiler is not None and slow:
+            self.save_profile(profiler, request, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # the last process_template_response() as this middleware comes first: render here to time it, the
+        # handler does not render a response twice
+        stats = _current.get()
+        if stats is not None:
+            start = time.perf_counter()
+            response.render()
+            stats.template_time += time.perf_counter() - start
+        return response
+
+    @staticmethod
+    def start_profiler():
+        if not settings.PERFORMANCE_PROFILE_DIR or random.random() >= settings.PERFORMANCE_PROFILE_SAMPLE_RATE:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is active (Python 3.12+ allows one per process)
+            return None
+        return profiler
+
+    @staticmethod
+    def server_timing(stats, total):
+        return ', '.join((
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+            f'tpl;dur={stats.template_time * 1000:.1f}',
+            f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"',
+            f'total;dur={total * 1000:.1f}',
+        ))
+
+    @staticmethod
+    def log(request, response, stats, total, slow):
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            'method': request.method, 'path': request.path, 'status': response.status_code,
+            'queries': stats.queries, 'db_ms': round(stats.db_time * 1000, 1),
+            'template_ms': round(stats.template_time * 1000, 1), 'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses, 'total_ms': round(total * 1000, 1),
+        }
+        logger.log(level, json.dumps(record), extra={'performance': record})
+
+    @staticmethod
+    def save_profile(profiler, request, total):
+        os.makedirs(settings.PERFORMANCE_PROFILE_DIR, exist_ok=True)
+        name = re.sub(r'[^\w-]+', '_', request.path).strip('_') or 'root'
+        path = os.path.join(settings.PERFORMANCE_PROFILE_DIR,
+                            f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}-{name}-{total * 1000:.0f}ms.prof')
+        profiler.dump_stats(path)
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.7 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0009_userprofile_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='answer_count',
+            field=models.IntegerField(default=0, verbose_name='Number of answers'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='author_name',
+            field=models.CharField(blank=True, default='', max_length=150, verbose_name='Author username cached'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='tags_cache',
+            field=models.JSONField(blank=True, default=list, verbose_name='Tags (tag, slug) cached'),
+        ),
+    ]
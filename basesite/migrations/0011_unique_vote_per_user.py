@@ -0,0 +1,34 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:02
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_votes(apps, schema_editor):
+    """Keep the earliest vote row of every (user, object) pair, votes counters have already been moved by it"""
+    for model_name, field in (('QuestionVotedBy', 'question'), ('AnswerVotedBy', 'answer')):
+        model = apps.get_model('basesite', model_name)
+        duplicates = (model.objects.values('user', field).annotate(rows=Count('id'), first_id=Min('id'))
+                      .filter(rows__gt=1))
+        for duplicate in duplicates:
+            model.objects.filter(user=duplicate['user'], **{field: duplicate[field]}).exclude(
+                id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0010_question_answer_count_tags_cache_author_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='answervotedby',
+            constraint=models.UniqueConstraint(fields=('user', 'answer'), name='unique_answer_vote_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='questionvotedby',
+            constraint=models.UniqueConstraint(fields=('user', 'question'), name='unique_question_vote_per_user'),
+        ),
+    ]
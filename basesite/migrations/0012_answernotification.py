@@ -0,0 +1,23 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0011_unique_vote_per_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_created', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Date of creation')),
+                ('answer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='basesite.answer')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_hot_score(apps, schema_editor):
+    question_model = apps.get_model('basesite', 'Question')
+    questions = list(question_model.objects.only('date_created', 'votes', 'answer_count'))
+    for question in questions:
+        question.hot_score = (int(question.date_created.timestamp()) + question.votes * settings.HOT_SCORE_VOTE_SECONDS
+                              + question.answer_count * settings.HOT_SCORE_ANSWER_SECONDS)
+    question_model.objects.bulk_update(questions, ['hot_score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0012_answernotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='hot_score',
+            field=models.BigIntegerField(db_index=True, default=0, verbose_name='Hot ranking score'),
+        ),
+        migrations.RunPython(fill_hot_score, migrations.RunPython.noop),
+    ]
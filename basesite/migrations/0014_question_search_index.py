@@ -0,0 +1,46 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:13
+
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_TABLE = 'basesite_question_search'
+
+
+def create_search_index(apps, schema_editor):
+    """Search index of basesite.search: FTS5 table on SQLite, tsvector + GIN on PostgreSQL, none elsewhere"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, message, answers)')
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, message, answers) '
+            f'SELECT q.id, q.title, q.message, COALESCE((SELECT group_concat(a.message, \' \') FROM basesite_answer a '
+            f'WHERE a.question_id = q.id), \'\') FROM basesite_question q')
+    elif vendor == 'postgresql':
+        config = settings.SEARCH_CONFIG
+        schema_editor.execute(
+            f'CREATE TABLE {SEARCH_TABLE} (question_id bigint PRIMARY KEY REFERENCES basesite_question (id) '
+            f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)')
+        schema_editor.execute(f'CREATE INDEX {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)')
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (question_id, document) '
+            f'SELECT q.id, setweight(to_tsvector(%s::regconfig, q.title), \'A\') || '
+            f'setweight(to_tsvector(%s::regconfig, q.message), \'B\') || '
+            f'setweight(to_tsvector(%s::regconfig, COALESCE((SELECT string_agg(a.message, \' \') '
+            f'FROM basesite_answer a WHERE a.question_id = q.id), \'\')), \'C\') FROM basesite_question q',
+            [config, config, config])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0013_question_hot_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
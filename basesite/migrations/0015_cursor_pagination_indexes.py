@@ -0,0 +1,25 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0014_question_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'correct', 'votes', 'id'], name='answer_question_order'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['date_created', 'id'], name='question_date_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['votes', 'id'], name='question_votes_id'),
+        ),
+    ]
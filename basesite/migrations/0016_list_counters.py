@@ -0,0 +1,38 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    question_model = apps.get_model('basesite', 'Question')
+    tag_model = apps.get_model('basesite', 'Tag')
+    apps.get_model('basesite', 'Counter').objects.create(name='questions', value=question_model.objects.count())
+    tags = list(tag_model.objects.annotate(total=Count('question')))
+    for tag in tags:
+        tag.question_count = tag.total
+    tag_model.objects.bulk_update(tags, ['question_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0015_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='question_count',
+            field=models.IntegerField(default=0, verbose_name='Number of questions'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
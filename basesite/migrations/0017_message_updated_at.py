@@ -0,0 +1,30 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    for model_name in ('Question', 'Answer'):
+        apps.get_model('basesite', model_name).objects.update(updated_at=F('date_created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0016_list_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date of last change'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Date of last change'),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
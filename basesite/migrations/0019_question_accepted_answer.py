@@ -0,0 +1,54 @@
+# Generated by Django 4.1.7 on 2026-10-18 19:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_accepted_answers(apps, schema_editor):
+    question_model = apps.get_model('basesite', 'Question')
+    answer_model = apps.get_model('basesite', 'Answer')
+    correct = answer_model.objects.filter(question=OuterRef('pk'), correct=True)
+    # one UPDATE: the latest accepted answer, had several been flagged
+    question_model.objects.filter(pk__in=correct.values('question')).update(
+        accepted_answer=Subquery(correct.order_by('-updated_at', '-id').values('pk')[:1]))
+
+
+def fill_correct_flags(apps, schema_editor):
+    question_model = apps.get_model('basesite', 'Question')
+    apps.get_model('basesite', 'Answer').objects.filter(
+        pk__in=question_model.objects.filter(accepted_answer__isnull=False).values('accepted_answer')
+    ).update(correct=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basesite', '0018_loaded_fixture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='accepted_answer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='basesite.answer', verbose_name='Accepted answer'),
+        ),
+        migrations.RunPython(fill_accepted_answers, fill_correct_flags),
+        migrations.RemoveIndex(
+            model_name='answer',
+            name='answer_question_order',
+        ),
+        migrations.AlterField(  # a default for the column added back when migrating backwards
+            model_name='answer',
+            name='correct',
+            field=models.BooleanField(default=False, verbose_name='Correct answer flag'),
+        ),
+        migrations.RemoveField(
+            model_name='answer',
+            name='correct',
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'votes', 'id'], name='answer_question_order'),
+        ),
+    ]
@@ -1,17 +1,23 @@
+import re
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.contrib.sites.models import Site
-from django.core.mail import send_mail
 from django.core.validators import MinLengthValidator
-from django.db import models
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.template.defaultfilters import truncatechars
-from django.template.loader import render_to_string
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q, Count, OuterRef, Subquery, Value, ExpressionWrapper
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver, Signal
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 
 
+# sent after a vote has been counted and committed: sender is the voted model, kwargs are target_id, increment, the
+# filters given to apply_vote (question_id of answers voted on their page) and the model's vote_signal_data()
+vote_counted = Signal()
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField('auth.User', on_delete=models.CASCADE)
     email = models.EmailField(unique=True)
@@ -26,30 +32,125 @@ class Message(models.Model):
     author = models.ForeignKey('auth.User', related_name="%(class)ss", on_delete=models.CASCADE)
     date_created = models.DateTimeField(verbose_name='Date of creation', default=timezone.now)
     votes = models.IntegerField(verbose_name="Number of votes for the Q", default=0)
+    # last change of anything the API shows about the object, bumped by bulk updates too (HTTP validators)
+    updated_at = models.DateTimeField(verbose_name='Date of last change', auto_now=True)
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def vote_update_fields(cls, increment):
+        """Fields to update, as expressions, when a vote is counted"""
+        return {'votes': F('votes') + increment, 'updated_at': timezone.now()}
+
+    @classmethod
+    def vote_signal_data(cls, target_id):
+        """Data of the voted object sent with vote_counted, read in the vote's transaction (nothing is read after it)"""
+        return {}
+
+    @classmethod
+    def apply_vote(cls, target_id, user, increment, **filters):
+        """
+        Move user's vote state for the object by increment (-1 or 1) unless it is already there, and move object's
+        votes counter accordingly. Runs as conditional statements in one transaction, without reading rows first, so
+        concurrent votes are never lost or counted twice.
+        :param filters: extra conditions the object must match, ex. question_id for an answer
+        :return: True if the vote was counted, False if the user has already voted this way
+        :raises DoesNotExist: if there is no object with target_id matching filters
+        """
+        through = cls.voted_by.through
+        vote_lookup = {'user': user, f'{cls._meta.model_name}_id': target_id}
+        with transaction.atomic():
+            counted = through.objects.filter(**vote_lookup).exclude(vote=increment).update(vote=F('vote') + increment)
+            if not counted:
+                try:
+                    with transaction.atomic():
+                        through.objects.create(vote=increment, **vote_lookup)
+                    counted = 1
+                except IntegrityError:  # vote inserted by a concurrent request, or no such object
+                    counted = through.objects.filter(**vote_lookup).exclude(vote=increment).update(
+                        vote=F('vote') + increment)
+                    if not counted and not cls.objects.filter(pk=target_id, **filters).exists():
+                        raise cls.DoesNotExist(f"{cls.__name__} matching query does not exist.")
+            if counted and not cls.objects.filter(pk=target_id, **filters).update(**cls.vote_update_fields(increment)):
+                raise cls.DoesNotExist(f"{cls.__name__} matching query does not exist.")  # rolls the vote back
+            data = cls.vote_signal_data(target_id) if counted else {}
+        if counted:
+            vote_counted.send(sender=cls, target_id=target_id, increment=increment, **filters, **data)
+        return bool(counted)
+
 
 class Tag(models.Model):
     tag = models.CharField(verbose_name='Tag text', max_length=64, unique=True)
     slug = models.SlugField(default="")
+    question_count = models.IntegerField(verbose_name='Number of questions', default=0)
 
     def save(self, *args, **kwargs):
         """Alter save to create slug, omitting non-ascii symbols, altering with counter to prevent duplicates"""
-        self.slug = slugify(self.tag)
-        base_slug, n = self.slug, 0
-        if not base_slug:
-            base_slug = f"{n}"
-        while Tag.objects.filter(slug=self.slug).exists():
-            n += 1
-            self.slug = f"{base_slug}{n}"
+        self.slug = self.free_slugs([self.tag], exclude_pk=self.pk)[0]
         return super(Tag, self).save(*args, **kwargs)
 
+    @classmethod
+    def free_slugs(cls, tags, exclude_pk=None):
+        """
+        Slugs for tag texts, suffixed with the lowest free counter on collision (with existing tags and with each
+        other). Taken slugs are read with a single query.
+        """
+        slugs = [slugify(tag) for tag in tags]
+        condition = models.Q()
+        for slug in set(slugs):
+            condition |= models.Q(slug=slug) | models.Q(slug__regex=rf'^{re.escape(slug or "0")}[0-9]+$')
+        queryset = cls.objects.filter(condition)
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        taken = set(queryset.values_list('slug', flat=True))
+        result = []
+        for slug in slugs:
+            candidate, n = slug, 0
+            while candidate in taken:
+                n += 1
+                candidate = f"{slug or '0'}{n}"
+            taken.add(candidate)
+            result.append(candidate)
+        return result
+
+    @classmethod
+    def refresh_question_count(cls, tag_ids):
+        """Recount questions of the given tags, in a single statement"""
+        if not tag_ids:
+            return
+        links = (Question.tags.through.objects.filter(tag=OuterRef('pk')).order_by().values('tag')
+                 .annotate(total=Count('*')).values('total'))
+        cls.objects.filter(pk__in=tag_ids).update(question_count=Coalesce(Subquery(links), 0))
+
+    @classmethod
+    def get_or_create_many(cls, tags):
+        """
+        Tag objects for tag texts, in the given order, without duplicates: existing tags are read with one query,
+        missing ones are created with one bulk insert
+        """
+        tags = list(dict.fromkeys(tags))
+        found = {tag.tag: tag for tag in cls.objects.filter(tag__in=tags)}
+        missing = [tag for tag in tags if tag not in found]
+        if missing:
+            created = [cls(tag=tag, slug=slug) for tag, slug in zip(missing, cls.free_slugs(missing))]
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create(created)
+            except IntegrityError:  # some of them were created concurrently
+                return [cls.objects.get_or_create(tag=tag)[0] for tag in tags]
+            for tag in created:  # bulk_create does not send it, receivers keep tag indexes up to date
+                post_save.send(sender=cls, instance=tag, created=True, update_fields=None, raw=False,
+                               using=cls.objects.db)
+            found.update((tag.tag, tag) for tag in created)
+        return [found[tag] for tag in tags]
+
 
 class TrendingQuestionManager(models.Manager):
+    size = 20
+
     def get_queryset(self):
-        return super().get_queryset().order_by('-votes')[:20]
+        return super().get_queryset().order_by('-hot_score', '-votes', '-id')[:self.size]
 
 
 class Question(Message):
@@ -60,22 +161,125 @@ class Question(Message):
     tags = models.ManyToManyField('Tag', blank=True)  # todo: validate max 3 choices, how?
     voted_by = models.ManyToManyField('auth.User', blank=True, related_name='voted_questions',
                                       through='QuestionVotedBy')
+    # denormalized data for list pages, maintained by the Answer/Tag/User write paths below
+    answer_count = models.IntegerField(verbose_name='Number of answers', default=0)
+    tags_cache = models.JSONField(verbose_name='Tags (tag, slug) cached', default=list, blank=True)
+    author_name = models.CharField(verbose_name='Author username cached', max_length=150, default='', blank=True)
+    # ranking: creation time in seconds, shifted forward by every vote and answer, see compute_hot_score
+    hot_score = models.BigIntegerField(verbose_name='Hot ranking score', default=0, db_index=True)
+    updated_at = models.DateTimeField(verbose_name='Date of last change', auto_now=True, db_index=True)
+    # set by accept_answer() with one UPDATE of the question, answers are not written
+    accepted_answer = models.ForeignKey('Answer', verbose_name='Accepted answer', related_name='+', null=True,
+                                        blank=True, on_delete=models.SET_NULL)
 
     max_tags = 3
+    maintained_fields = ('answer_count', 'tags_cache', 'hot_score')  # written by Answer/Tag/vote write paths only
 
     objects = models.Manager()
     trending = TrendingQuestionManager()
 
+    class Meta:
+        indexes = [  # cursor pagination keys, see basesite.pagination
+            models.Index(fields=['date_created', 'id'], name='question_date_created_id'),
+            models.Index(fields=['votes', 'id'], name='question_votes_id'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Alter save to fill author_name and to never overwrite maintained counters with stale in-memory values"""
+        if self.author_id and not self.author_name:
+            self.author_name = self.author.username
+        if self._state.adding:
+            self.hot_score = self.compute_hot_score(self.date_created, self.votes, self.answer_count)
+        if not self._state.adding and not args and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.maintained_fields]
+        return super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("question-detail", kwargs={"pk": self.pk})
 
+    @staticmethod
+    def compute_hot_score(date_created, votes, answer_count):
+        """
+        Every vote and answer makes a question rank as if it was asked HOT_SCORE_VOTE_SECONDS/HOT_SCORE_ANSWER_SECONDS
+        later. Age is anchored to the creation time, so scores of idle questions never need to be rewritten to decay,
+        and votes/answers change the score by a constant, applied with F() expressions.
+        """
+        return (int(date_created.timestamp()) + votes * settings.HOT_SCORE_VOTE_SECONDS
+                + answer_count * settings.HOT_SCORE_ANSWER_SECONDS)
+
+    @classmethod
+    def vote_update_fields(cls, increment):
+        fields = super().vote_update_fields(increment)
+        fields['hot_score'] = F('hot_score') + increment * settings.HOT_SCORE_VOTE_SECONDS
+        return fields
+
+    @classmethod
+    def vote_signal_data(cls, target_id):
+        # the ranking of the question for the trending list, and its tags for the pages of its tags
+        data = cls.objects.filter(pk=target_id).values('tags_cache', 'hot_score', 'votes').first()
+        return data or {'tags_cache': []}
+
+    @staticmethod
+    def build_tags_cache(tags):
+        return [{'tag': tag.tag, 'slug': tag.slug} for tag in tags]
+
+    @classmethod
+    def refresh_tags_cache(cls, question_ids):
+        """Rebuild `tags_cache` for given questions with one read of the m2m table. Returns {question id: tags_cache}"""
+        question_ids = set(question_ids)
+        if not question_ids:
+            return {}
+        cache = {question_id: [] for question_id in question_ids}
+        through = cls.tags.through.objects.filter(question_id__in=question_ids).select_related('tag').order_by('id')
+        for link in through:
+            cache[link.question_id].append(link.tag)
+        now = timezone.now()
+        questions = [cls(id=question_id, tags_cache=cls.build_tags_cache(tags), updated_at=now)
+                     for question_id, tags in cache.items()]
+        cls.objects.bulk_update(questions, ['tags_cache', 'updated_at'])
+        return {question.id: question.tags_cache for question in questions}
+
+    @classmethod
+    def accept_answer(cls, question_id, answer_id, author):
+        """
+        Make the answer the accepted one of its question, if the question is the author's, with one UPDATE statement
+        :return: True if accepted, False if there is no such answer of a question of the author
+        """
+        return bool(cls.objects.filter(pk=question_id, author=author, answers__pk=answer_id).update(
+            accepted_answer_id=answer_id, updated_at=timezone.now()))
+
+    @classmethod
+    def user_votes(cls, user, question_id, answer_ids):
+        """
+        The user's votes (-1, 1, or 0 if cancelled or none) on a question and on the given answers of it, read with one
+        query whatever the number of answers. Returns (question vote, {answer id: vote}), answers not voted left out
+        """
+        question_votes = (QuestionVotedBy.objects.filter(user=user, question_id=question_id)
+                          .annotate(is_question=Value(True)).values_list('question_id', 'vote', 'is_question'))
+        answer_votes = (AnswerVotedBy.objects.filter(user=user, answer_id__in=answer_ids)
+                        .annotate(is_question=Value(False)).values_list('answer_id', 'vote', 'is_question'))
+        question_vote, votes = 0, {}
+        # annotations come last in the SQL of a union, so they come last in values_list() too
+        for target_id, vote, is_question in question_votes.union(answer_votes, all=True):
+            if is_question:
+                question_vote = vote
+            else:
+                votes[target_id] = vote
+        return question_vote, votes
+
     @property
     def api_url(self):
         return reverse("api-question-detail", kwargs={"pk": self.pk})
 
     @property
     def has_answers(self):
-        return self.answers.exists()
+        return self.answer_count > 0
+
+    @property
+    def has_accepted_answer(self):
+        return self.accepted_answer_id is not None
 
     @property
     def api_answers_url(self):
@@ -83,7 +287,7 @@ class Question(Message):
 
     @property
     def has_tags(self):
-        return self.tags.exists()
+        return bool(self.tags_cache)
 
     @property
     def api_tags_url(self):
@@ -95,30 +299,190 @@ class QuestionVotedBy(models.Model):
     question = models.ForeignKey('Question', on_delete=models.CASCADE)
     vote = models.SmallIntegerField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'question'), name='unique_question_vote_per_user'),
+        ]
+
+
+class AnswerQuerySet(models.QuerySet):
+    def with_correct(self):
+        """Answers annotated with `correct`, from the accepted_answer of their question"""
+        accepted = ExpressionWrapper(Q(question__accepted_answer=F('pk')), output_field=models.BooleanField())
+        return self.annotate(correct=Coalesce(accepted, False))  # NULL for questions without an accepted answer
+
 
 class Answer(Message):
     question = models.ForeignKey('Question', related_name='answers', on_delete=models.CASCADE)
-    correct = models.BooleanField(verbose_name='Correct answer flag')
     voted_by = models.ManyToManyField('auth.User', blank=True, related_name='voted_answers', through='AnswerVotedBy')
 
+    objects = AnswerQuerySet.as_manager()
+
+    _correct = None
+
+    class Meta:
+        indexes = [  # answers of a question in the order of the question page, see basesite.pagination
+            models.Index(fields=['question', 'votes', 'id'], name='answer_question_order'),
+        ]
+
+    @property
+    def correct(self):
+        """
+        Whether this is the accepted answer of its question: annotated by with_correct(), or read from the question.
+        Reading it from the question costs a query per answer unless the question was fetched with it
+        (select_related('question')): querysets of answers to be listed use with_correct()
+        """
+        if self._correct is None:
+            return self.question.accepted_answer_id == self.pk
+        return self._correct
+
+    @correct.setter
+    def correct(self, value):
+        # set by with_correct(), or given to a new answer: Answer(correct=True) is saved as the accepted one
+        self._correct = value
+
+    def save(self, *args, **kwargs):
+        """Keep Question.answer_count (and accepted_answer) in the same transaction as the answer insert"""
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                accepted = {'accepted_answer_id': self.pk} if self._correct else {}
+                Question.objects.filter(pk=self.question_id).update(
+                    answer_count=F('answer_count') + 1, hot_score=F('hot_score') + settings.HOT_SCORE_ANSWER_SECONDS,
+                    updated_at=timezone.now(), **accepted)
+
 
 class AnswerVotedBy(models.Model):
     user = models.ForeignKey('auth.User', on_delete=models.CASCADE)
     answer = models.ForeignKey('Answer', on_delete=models.CASCADE)
     vote = models.SmallIntegerField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'answer'), name='unique_answer_vote_per_user'),
+        ]
+
+
+@receiver(post_delete, sender=Answer)
+def decrease_answer_count(instance, **kwargs):
+    Question.objects.filter(pk=instance.question_id).update(
+        answer_count=F('answer_count') - 1, hot_score=F('hot_score') - settings.HOT_SCORE_ANSWER_SECONDS,
+        updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def refresh_question_tags_cache(instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        if action != 'pre_clear':
+            instance.tags_cache = Question.refresh_tags_cache([instance.pk])[instance.pk]  # in memory too
+    elif action == 'pre_clear':  # tag.question_set.clear(): remember questions before links are gone
+        instance._cleared_question_ids = list(instance.question_set.values_list('id', flat=True))
+    elif action == 'post_clear':
+        Question.refresh_tags_cache(getattr(instance, '_cleared_question_ids', []))
+    else:
+        Question.refresh_tags_cache(pk_set)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def refresh_tag_question_count(instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Tag.refresh_question_count([instance.pk])
+    elif action == 'pre_clear':  # question.tags.clear(): remember tags before links are gone
+        instance._cleared_tag_ids = list(instance.tags.values_list('id', flat=True))
+    elif action == 'post_clear':
+        Tag.refresh_question_count(getattr(instance, '_cleared_tag_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        Tag.refresh_question_count(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def refresh_tags_cache_on_tag_change(instance, created, raw, **kwargs):
+    if not created and not raw:
+        Question.refresh_tags_cache(instance.question_set.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def collect_questions_on_tag_delete(instance, **kwargs):
+    instance._deleted_question_ids = list(instance.question_set.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def refresh_tags_cache_on_tag_delete(instance, **kwargs):
+    Question.refresh_tags_cache(getattr(instance, '_deleted_question_ids', []))
+
+
+@receiver(post_save, sender=User)
+def refresh_author_name(instance, created, raw, update_fields, **kwargs):
+    if created or raw or (update_fields is not None and 'username' not in update_fields):
+        return
+    now = timezone.now()
+    Question.objects.filter(author=instance).exclude(author_name=instance.username).update(
+        author_name=instance.username, updated_at=now)
+    Answer.objects.filter(author=instance).update(updated_at=now)  # answers show the username, with no copy to compare
+
+
+@receiver(post_save, sender=UserProfile)
+def touch_messages_on_profile_change(instance, created, raw, **kwargs):
+    if created or raw:
+        return
+    now = timezone.now()  # the API and the cached page fragments show avatars
+    Question.objects.filter(author_id=instance.user_id).update(updated_at=now)
+    Answer.objects.filter(author_id=instance.user_id).update(updated_at=now)
+
+
+class Counter(models.Model):
+    """Maintained row counts of lists too large to COUNT(*) for every page, see basesite.pagination"""
+    QUESTIONS = 'questions'
+
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def get_value(cls, name):
+        """Counter value, None if it has not been created (by migration or backfill_question_counters) yet"""
+        return cls.objects.filter(name=name).values_list('value', flat=True).first()
+
+    @classmethod
+    def add(cls, name, delta):
+        cls.objects.filter(name=name).update(value=F('value') + delta)
+
+
+class LoadedFixture(models.Model):
+    """Checksum of a fixture file as last loaded by the load_fixtures command, which skips unchanged fixtures"""
+    path = models.CharField(max_length=255, unique=True)
+    checksum = models.CharField(max_length=64)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+
+@receiver(post_save, sender=Question)
+def count_new_question(instance, created, raw, **kwargs):
+    if created and not raw:
+        Counter.add(Counter.QUESTIONS, 1)
+
+
+@receiver(pre_delete, sender=Question)
+def collect_tags_on_question_delete(instance, **kwargs):
+    instance._deleted_tag_ids = list(instance.tags.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Question)
+def uncount_deleted_question(instance, **kwargs):
+    Counter.add(Counter.QUESTIONS, -1)
+    Tag.refresh_question_count(getattr(instance, '_deleted_tag_ids', []))
+
+
+class AnswerNotification(models.Model):
+    """Outbox of answers the question author has not been notified about yet, see basesite.notifications"""
+    answer = models.OneToOneField('Answer', on_delete=models.CASCADE)
+    date_created = models.DateTimeField(verbose_name='Date of creation', default=timezone.now, db_index=True)
+
 
 @receiver(post_save, sender=Answer)
-def notify_question_author_on_answer(**kwargs):
-    obj = kwargs['instance']
-    domain = Site.objects.get_current().domain
-    message = render_to_string(template_name='basesite/answer_email.txt', context={
-        'domain': domain,
-        'answer': obj
-    })
-    send_mail(
-        f"New answer: {truncatechars(obj.question.title, 15)}",
-        message,
-        'test@test.com',
-        [obj.question.author.email]
-    )
+def queue_answer_notification(instance, created, raw, **kwargs):
+    """Only a new answer is notified about; the row is written in the answer insert transaction"""
+    if created and not raw:
+        AnswerNotification.objects.create(answer=instance)
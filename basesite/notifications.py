@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Min
+from django.template.defaultfilters import truncatechars
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from basesite.models import AnswerNotification
+
+
+def send_answer_digests(window=None, now=None):
+    """
+    Send one email per question author, listing all new answers to their questions. An author is notified once the
+    oldest pending answer has waited for `window` seconds (settings.ANSWER_NOTIFICATION_WINDOW), so answers arriving
+    within the window are folded into one digest. All emails of a run go through one mail backend connection. The
+    answers of a digest are marked sent as soon as it is sent, so a failing email does not resend earlier ones.
+    :return: number of emails sent
+    """
+    window = settings.ANSWER_NOTIFICATION_WINDOW if window is None else window
+    now = now or timezone.now()
+    ready_authors = list(AnswerNotification.objects.values('answer__question__author')
+                         .annotate(oldest=Min('date_created'))
+                         .filter(oldest__lte=now - timedelta(seconds=window))
+                         .values_list('answer__question__author', flat=True))
+    if not ready_authors:
+        return 0
+    domain = Site.objects.get_current().domain
+    sent = 0
+    with get_connection() as connection:
+        for author_id in ready_authors:
+            with transaction.atomic():
+                pending = list(AnswerNotification.objects.select_for_update(skip_locked=True, of=('self',))
+                               .filter(answer__question__author=author_id)
+                               .select_related('answer__author', 'answer__question__author')
+                               .order_by('answer__question', 'date_created'))
+                if not pending:  # taken by a concurrent run
+                    continue
+                author = pending[0].answer.question.author
+                if author.email:
+                    connection.send_messages([_build_digest(author, [n.answer for n in pending], domain)])
+                    sent += 1
+                AnswerNotification.objects.filter(id__in=[notification.id for notification in pending]).delete()
+    return sent
+
+
+def _build_digest(author, answers, domain):
+    questions = {}
+    for answer in answers:
+        questions.setdefault(answer.question, []).append(answer)
+    if len(answers) == 1:
+        subject = f"New answer: {truncatechars(answers[0].question.title, 15)}"
+    else:
+        subject = f"{len(answers)} new answers to your questions"
+    message = render_to_string(template_name='basesite/answer_email.txt', context={
+        'domain': domain,
+        'questions': questions.items(),
+    })
+    return EmailMessage(subject, message, to=[author.email])
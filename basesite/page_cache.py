@@ -0,0 +1,65 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from basesite.generations import get_generations
+from basesite.metrics import record_cache_lookup
+
+PAGE_CACHE_KEY = 'basesite:page:{}'
+
+
+class PageCacheMixin:
+    """
+    Caches whole pages rendered for anonymous visitors, keyed by the query parameters in page_cache_params and by the
+    generations of the data scopes of get_page_cache_scopes() (see basesite.generations), which writes bump. Requests
+    with a session cookie are never served from, nor stored in, the cache. Cacheable pages are sent as public for
+    PAGE_CACHE_MAX_AGE seconds, so nginx can micro-cache them in front of the app server, other responses as private.
+    Writes reach the pages of other processes only through a shared cache; with a per-process one, they are stale for up
+    to PAGE_CACHE_TIMEOUT seconds.
+    """
+    page_cache_params = ('ordering', 'page', 'cursor')
+
+    def get_page_cache_scopes(self):
+        """Data scopes the page depends on, or None for pages which are not cached"""
+        return None
+
+    def get_page_cache_key(self, request):
+        if request.method not in ('GET', 'HEAD') or settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        scopes = self.get_page_cache_scopes()
+        if scopes is None:
+            return None
+        params = [(name, request.GET.getlist(name)) for name in self.page_cache_params if name in request.GET]
+        key = repr((request.get_host(), request.path, params, get_generations(*scopes)))
+        return PAGE_CACHE_KEY.format(hashlib.md5(key.encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        key = self.get_page_cache_key(request)
+        if key is None:
+            response = super().dispatch(request, *args, **kwargs)
+            patch_cache_control(response, private=True)
+            return response
+        entry = cache.get(key)
+        record_cache_lookup('page', hit=entry is not None)
+        if entry is not None:
+            response = HttpResponse(entry['body'], content_type=entry['content_type'])
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200 or not hasattr(response, 'add_post_render_callback'):
+                return response
+            response.add_post_render_callback(lambda rendered: self.store_page(request, key, rendered))
+        patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    @staticmethod
+    def store_page(request, key, response):
+        # a CSRF token (its cookie is set later, by the middleware) or another cookie of this visitor: not shareable
+        if response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE') or request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+            return
+        cache.set(key, {'content_type': response['Content-Type'], 'body': response.content},
+                  settings.PAGE_CACHE_TIMEOUT)
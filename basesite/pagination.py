@@ -0,0 +1,280 @@
+import base64
+import json
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator, Page, PageNotAnInteger, EmptyPage
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+# orderings of question and answer lists which can be paginated by cursor, and the keys they are paginated by:
+# unique in the end, so that every row has its own position
+CURSOR_KEYS = {
+    ('-date_created',): ('-date_created', '-id'),
+    ('date_created',): ('date_created', 'id'),
+    ('-votes',): ('-votes', '-id'),
+    ('votes',): ('votes', 'id'),
+    ('-hot_score',): ('-hot_score', '-id'),
+    ('-votes', '-date_created'): ('-votes', '-id'),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(keys, values, reverse=False):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]  # full precision
+    data = json.dumps({'k': keys, 'v': values, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return data['k'], data['v'], bool(data['r'])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def get_cursor_keys(queryset):
+    """Keys to paginate an ordered queryset by, or None if its ordering has no cursor pagination"""
+    return CURSOR_KEYS.get(tuple(dict.fromkeys(queryset.query.order_by)))
+
+
+class CursorPage(Sequence):
+    """Page of a KeysetPaginator, with opaque cursors of the pages around it (None if there is no such page)"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) pagination: a page is found by the values of the keys of the row before it rather than by an
+    OFFSET, so with an index on the keys every page costs the same, and no COUNT(*) is needed. Keys are model
+    fields, '-' prefixed for descending order, the last of them unique.
+    """
+
+    def __init__(self, queryset, keys, per_page):
+        self.queryset = queryset
+        self.keys = list(keys)
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        values, reverse = None, False
+        if cursor:
+            keys, values, reverse = decode_cursor(cursor)
+            if keys != self.keys or not isinstance(values, list) or len(values) != len(self.keys):
+                raise InvalidCursor('Cursor of another ordering')
+            values = self._to_python(values)
+        ordering = [self._reversed(key) for key in self.keys] if reverse else self.keys
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        has_next, has_previous = (True, has_more) if reverse else (has_more, values is not None)
+        return CursorPage(
+            rows,
+            self._cursor(rows[-1], False) if has_next and rows else None,
+            self._cursor(rows[0], True) if has_previous and rows else None,
+        )
+
+    def _to_python(self, values):
+        model = self.queryset.model
+        try:
+            return [model._meta.get_field(key.lstrip('-')).to_python(value) for key, value in zip(self.keys, values)]
+        except Exception as exc:
+            raise InvalidCursor('Invalid cursor value') from exc
+
+    def _cursor(self, row, reverse):
+        return encode_cursor(self.keys, [getattr(row, key.lstrip('-')) for key in self.keys], reverse)
+
+    @staticmethod
+    def _reversed(key):
+        return key[1:] if key.startswith('-') else f'-{key}'
+
+    @staticmethod
+    def _after(ordering, values):
+        """
+        Rows after the given key values in the ordering: (k1 > v1) or (k1 = v1 and k2 > v2) or ..., led by
+        k1 >= v1 so that an index on the keys is used as a range
+        """
+        fields = [(key.lstrip('-'), 'lt' if key.startswith('-') else 'gt') for key in ordering]
+        condition, equal = Q(), Q()
+        for (field, op), value in zip(fields, values):
+            condition |= equal & Q(**{f'{field}__{op}': value})
+            equal &= Q(**{field: value})
+        first_field, first_op = fields[0]
+        return Q(**{f'{first_field}__{first_op}e': values[0]}) & condition
+
+
+class CursorPaginationMixin:
+    """
+    MultipleObjectMixin pagination by cursor instead of page number, with ?cursor= (empty for the first page), or
+    always if cursor_pagination is set. Orderings without cursor keys are still paginated by page number.
+    """
+    cursor_pagination = False
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        keys = get_cursor_keys(queryset)
+        if keys is None or not (self.cursor_pagination or self.cursor_kwarg in self.request.GET):
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = KeysetPaginator(queryset, keys, page_size).page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as exc:
+            raise Http404(str(exc)) from exc
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if isinstance(page, CursorPage):
+            context['cursor_pagination'] = True
+            context['next_page_query'] = self.cursor_query(page.next_cursor)
+            context['previous_page_query'] = self.cursor_query(page.previous_cursor)
+        return context
+
+    def cursor_query(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query.pop('page', None)
+        query[self.cursor_kwarg] = cursor
+        return query.urlencode()
+
+
+def estimate_count(queryset):
+    """Number of rows the PostgreSQL planner expects from a queryset, without running it"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountingPage(Page):
+    def has_next(self):
+        if self.paginator.count_is_exact:
+            return super().has_next()
+        return len(self.object_list) >= self.paginator.per_page  # the count may be lower than the actual one
+
+
+class CountingPaginator(Paginator):
+    """
+    Paginator which does not have to run an exact COUNT(*), depending on count_mode:
+    * 'exact': COUNT(*)
+    * 'maintained': the value of maintained_count(), a callable returning a maintained counter (or None, then it is
+      'estimate')
+    * 'estimate': the row estimate of the query plan on PostgreSQL, 'capped' on other databases
+    * 'capped': COUNT(*) of at most settings.PAGINATION_COUNT_CAP rows, shown as "10,000+" when there are more
+    Pages past an inexact count are served rather than rejected, they are just empty if there are no such rows.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, count_mode='exact',
+                 maintained_count=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.count_mode = count_mode
+        self.maintained_count = maintained_count
+
+    @cached_property
+    def _count(self):
+        """(count, whether it is exact)"""
+        mode = self.count_mode
+        if mode == 'maintained':
+            count = self.maintained_count() if self.maintained_count is not None else None
+            if count is not None:
+                return count, True
+            mode = 'estimate'
+        if mode == 'estimate':
+            if getattr(self.object_list, 'db', None) and connections[self.object_list.db].vendor == 'postgresql':
+                return estimate_count(self.object_list), False
+            mode = 'capped'
+        if mode == 'capped' and hasattr(self.object_list, 'query'):
+            cap = settings.PAGINATION_COUNT_CAP
+            count = self.object_list.order_by()[:cap + 1].count()
+            return min(count, cap), count <= cap
+        return super().count, True
+
+    @property
+    def count(self):
+        return self._count[0]
+
+    @property
+    def count_is_exact(self):
+        return self._count[1]
+
+    @property
+    def count_label(self):
+        if self.count_is_exact:
+            return f'{self.count:,}'
+        return f'{self.count:,}+' if self.count_mode == 'capped' else f'~{self.count:,}'
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return CountingPage(*args, **kwargs)
+
+
+class CountingPaginationMixin:
+    """
+    MultipleObjectMixin pagination with a CountingPaginator: count_mode per view, maintained count given by
+    get_maintained_count()
+    """
+    paginator_class = CountingPaginator
+    count_mode = 'exact'
+
+    def get_count_mode(self):
+        return self.count_mode
+
+    def get_maintained_count(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(queryset, per_page, orphans, allow_empty_first_page,
+                                     count_mode=self.get_count_mode(), maintained_count=self.get_maintained_count,
+                                     **kwargs)
@@ -0,0 +1,147 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value, FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from basesite.models import Question, Answer
+
+# created by migration 0014: FTS5 virtual table on SQLite, tsvector table with a GIN index on PostgreSQL
+SEARCH_TABLE = 'basesite_question_search'
+
+
+def search_terms(query):
+    """Words of a query, the only part of user input that gets to the search engine"""
+    return re.findall(r'\w+', query.lower())
+
+
+class IContainsSearchBackend:
+    """Fallback for databases without a search index: substring match in question and answer texts"""
+
+    def filter(self, queryset, terms):
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(message__icontains=term) | Q(answers__message__icontains=term)
+        return queryset.filter(condition).distinct().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index(self, question_id, title, message, answers):
+        pass
+
+    def delete(self, question_id):
+        pass
+
+
+class SQLiteSearchBackend(IContainsSearchBackend):
+    """FTS5 index, rowid is the question id; bm25 rank with title weighted over message over answers"""
+
+    def filter(self, queryset, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        question_id = f'{connection.ops.quote_name(Question._meta.db_table)}."id"'
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [match])
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0) FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = {question_id}', [match], output_field=FloatField()))
+
+    def index(self, question_id, title, message, answers):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [question_id])
+            cursor.execute(f'INSERT INTO {SEARCH_TABLE} (rowid, title, message, answers) VALUES (%s, %s, %s, %s)',
+                           [question_id, title, message, answers])
+
+    def delete(self, question_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [question_id])
+
+
+class PostgresSearchBackend(IContainsSearchBackend):
+    """tsvector document per question (title A, message B, answers C weights), prefix-matched terms, ts_rank"""
+
+    def filter(self, queryset, terms):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        params = [settings.SEARCH_CONFIG, tsquery]
+        question_id = f'{connection.ops.quote_name(Question._meta.db_table)}."id"'
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT question_id FROM {SEARCH_TABLE} '
+                          f'WHERE document @@ to_tsquery(%s::regconfig, %s)', params)
+        ).annotate(search_rank=RawSQL(
+            f'SELECT ts_rank(document, to_tsquery(%s::regconfig, %s)) FROM {SEARCH_TABLE} '
+            f'WHERE question_id = {question_id}', params, output_field=FloatField()))
+
+    def index(self, question_id, title, message, answers):
+        config = settings.SEARCH_CONFIG
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (question_id, document) VALUES (%s, '
+                f'setweight(to_tsvector(%s::regconfig, %s), \'A\') || '
+                f'setweight(to_tsvector(%s::regconfig, %s), \'B\') || '
+                f'setweight(to_tsvector(%s::regconfig, %s), \'C\')) '
+                f'ON CONFLICT (question_id) DO UPDATE SET document = EXCLUDED.document',
+                [question_id, config, title, config, message, config, answers])
+
+    def delete(self, question_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE question_id = %s', [question_id])
+
+
+_index_available = {}
+
+
+def get_search_backend():
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return IContainsSearchBackend()
+    if connection.alias not in _index_available:
+        _index_available[connection.alias] = SEARCH_TABLE in connection.introspection.table_names()
+    if not _index_available[connection.alias]:
+        return IContainsSearchBackend()
+    return SQLiteSearchBackend() if connection.vendor == 'sqlite' else PostgresSearchBackend()
+
+
+def search_questions(queryset, query):
+    """
+    Filter questions by words of the query found in title, message or answers, annotated with `search_rank`
+    (the higher, the more relevant). Every word must be found, as a word prefix.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return get_search_backend().filter(queryset, terms)
+
+
+def index_question(question_id, title=None, message=None):
+    if title is None or message is None:
+        row = Question.objects.filter(pk=question_id).values_list('title', 'message').first()
+        if row is None:
+            return
+        title, message = row
+    answers = ' '.join(Answer.objects.filter(question_id=question_id).values_list('message', flat=True))
+    get_search_backend().index(question_id, title, message, answers)
+
+
+def rebuild_search_index(batch_size=1000):
+    count = 0
+    for question_id, title, message in Question.objects.values_list('id', 'title', 'message').iterator(batch_size):
+        index_question(question_id, title, message)
+        count += 1
+    return count
+
+
+@receiver(post_save, sender=Question)
+def index_question_on_save(instance, raw, **kwargs):
+    if not raw:
+        index_question(instance.id, instance.title, instance.message)
+
+
+@receiver(post_delete, sender=Question)
+def delete_question_from_index(instance, **kwargs):
+    get_search_backend().delete(instance.id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def index_question_on_answer_change(instance, raw=False, **kwargs):
+    if not raw:
+        index_question(instance.question_id)
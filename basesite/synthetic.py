@@ -0,0 +1,164 @@
+import itertools
+import random
+from bisect import bisect
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from basesite.generations import bump_generations, EVERYTHING
+from basesite.models import Question, Answer, Tag, UserProfile, QuestionVotedBy, AnswerVotedBy, Counter
+from basesite.search import get_search_backend
+from basesite.trending import invalidate_trending_questions
+
+# every synthetic user can log in with it, the load driver does
+SYNTHETIC_PASSWORD = 'Synthetic$1'
+
+WORDS = ('python', 'django', 'query', 'index', 'cache', 'thread', 'memory', 'socket', 'string', 'list', 'dict',
+         'class', 'error', 'server', 'client', 'request', 'response', 'template', 'model', 'field', 'migration',
+         'database', 'postgres', 'sqlite', 'join', 'select', 'update', 'delete', 'insert', 'view', 'form', 'test',
+         'docker', 'nginx', 'deploy', 'async', 'loop', 'file', 'path', 'json', 'parse', 'encode', 'unicode',
+         'performance', 'latency', 'benchmark', 'profile', 'lock', 'queue', 'worker', 'signal', 'session')
+
+
+class ZipfSampler:
+    """Random items where the item of rank k (from 1) is drawn with probability proportional to 1 / k**s"""
+
+    def __init__(self, items, s, rnd):
+        self.items = list(items)
+        self.rnd = rnd
+        self.cum_weights = list(itertools.accumulate(1 / rank ** s for rank in range(1, len(self.items) + 1)))
+
+    def sample(self, k):
+        """k distinct items (fewer if there are not as many)"""
+        chosen = {}
+        total = self.cum_weights[-1]
+        while len(chosen) < min(k, len(self.items)):
+            item = self.items[bisect(self.cum_weights, self.rnd.random() * total)]
+            chosen[id(item)] = item
+        return list(chosen.values())
+
+
+class SyntheticDataGenerator:
+    """
+    Generates users, tags, questions, answers and votes with bulk inserts, batch by batch, and keeps everything derived
+    from them in step: vote and answer counters, tags caches, hot scores, list counters and the search index. Tag
+    usage follows a Zipf distribution (a few tags on most questions, a long tail), so do votes per question.
+    """
+
+    def __init__(self, users=100, tags=200, questions=1000, answers_per_question=3, votes_per_question=5,
+                 zipf_s=1.1, days=365, batch_size=500, seed=None, prefix=None, stdout=None):
+        self.rnd = random.Random(seed)
+        self.users, self.tags, self.questions = users, tags, questions
+        self.answers_per_question, self.votes_per_question = answers_per_question, votes_per_question
+        self.zipf_s, self.days, self.batch_size = zipf_s, days, batch_size
+        self.prefix = prefix or f'synth{self.rnd.randrange(16 ** 6):06x}'
+        self.stdout = stdout
+        self.now = timezone.now()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def text(self, words):
+        return ' '.join(self.rnd.choice(WORDS) for _ in range(words))
+
+    def generate(self):
+        """Returns {model name: rows created}"""
+        created = {'users': 0, 'tags': 0, 'questions': 0, 'answers': 0, 'votes': 0}
+        users = self.create_users()
+        created['users'] = len(users)
+        tags = self.create_tags()
+        created['tags'] = len(tags)
+        tag_sampler = ZipfSampler(tags, self.zipf_s, self.rnd)
+        for start in range(0, self.questions, self.batch_size):
+            size = min(self.batch_size, self.questions - start)
+            with transaction.atomic():
+                batch = self.create_questions(size, users, tag_sampler)
+            for name, count in batch.items():
+                created[name] += count
+            self.log(f"{start + size}/{self.questions} questions")
+        Tag.refresh_question_count([tag.id for tag in tags])
+        bump_generations(EVERYTHING)
+        invalidate_trending_questions()
+        return created
+
+    def create_users(self):
+        password = make_password(SYNTHETIC_PASSWORD)  # hashed once: hashing is deliberately slow
+        users = User.objects.bulk_create(
+            [User(username=f'{self.prefix}_user{i}', email=f'{self.prefix}_user{i}@example.com', password=password)
+             for i in range(self.users)], batch_size=self.batch_size)
+        UserProfile.objects.bulk_create([UserProfile(user=user, email=user.email) for user in users],
+                                        batch_size=self.batch_size)
+        return users
+
+    def create_tags(self):
+        return Tag.objects.bulk_create([Tag(tag=f'{self.prefix}-{word}-{i}', slug=f'{self.prefix}-{word}-{i}')
+                                        for i, word in zip(range(self.tags), itertools.cycle(WORDS))],
+                                       batch_size=self.batch_size)
+
+    def votes(self, users, mean):
+        """(user, vote) pairs: distinct voters, their number heavy-tailed around the mean, mostly upvotes"""
+        count = min(int(self.rnd.paretovariate(2.0) * mean / 2), len(users))
+        return [(user, 1 if self.rnd.random() < 0.8 else -1) for user in self.rnd.sample(users, count)]
+
+    def create_questions(self, size, users, tag_sampler):
+        questions, question_tags, question_votes = [], [], []
+        for _ in range(size):
+            tags = tag_sampler.sample(self.rnd.randint(1, Question.max_tags))
+            votes = self.votes(users, self.votes_per_question)
+            date_created = self.now - timedelta(seconds=self.rnd.uniform(0, self.days * 86400))
+            author = self.rnd.choice(users)
+            questions.append(Question(
+                author=author, author_name=author.username, title=self.text(self.rnd.randint(3, 8)).capitalize(),
+                message=self.text(self.rnd.randint(15, 60)), date_created=date_created,
+                votes=sum(vote for _, vote in votes), tags_cache=Question.build_tags_cache(tags)))
+            question_tags.append(tags)
+            question_votes.append(votes)
+
+        answers, answer_votes = [], []
+        for question in questions:
+            count = int(self.rnd.expovariate(1 / self.answers_per_question)) if self.answers_per_question else 0
+            correct = self.rnd.randrange(count) if count and self.rnd.random() < 0.3 else None
+            question.answer_count = count
+            question.hot_score = Question.compute_hot_score(question.date_created, question.votes, count)
+            for i in range(count):
+                votes = self.votes(users, self.votes_per_question / 2)
+                # not later than now, for questions asked in the last hours
+                date_created = min(question.date_created + timedelta(minutes=self.rnd.randint(1, 600)), self.now)
+                answers.append(Answer(author=self.rnd.choice(users), question=question,
+                                      message=self.text(self.rnd.randint(10, 40)), correct=i == correct,
+                                      votes=sum(vote for _, vote in votes), date_created=date_created))
+                answer_votes.append(votes)
+
+        Question.objects.bulk_create(questions)
+        through = Question.tags.through
+        through.objects.bulk_create([through(question=question, tag=tag)
+                                     for question, tags in zip(questions, question_tags) for tag in tags])
+        for answer in answers:
+            answer.question_id = answer.question.id  # known once the questions are inserted
+        Answer.objects.bulk_create(answers, batch_size=self.batch_size)
+        accepted = []
+        for answer in answers:
+            if answer.correct:  # bulk_create() does not save() answers, accepted_answer is set once they have pks
+                answer.question.accepted_answer_id = answer.pk
+                accepted.append(answer.question)
+        Question.objects.bulk_update(accepted, ['accepted_answer'], batch_size=self.batch_size)
+        QuestionVotedBy.objects.bulk_create(
+            [QuestionVotedBy(question=question, user=user, vote=vote)
+             for question, votes in zip(questions, question_votes) for user, vote in votes], batch_size=self.batch_size)
+        AnswerVotedBy.objects.bulk_create(
+            [AnswerVotedBy(answer=answer, user=user, vote=vote)
+             for answer, votes in zip(answers, answer_votes) for user, vote in votes], batch_size=self.batch_size)
+        Counter.add(Counter.QUESTIONS, len(questions))
+
+        backend = get_search_backend()
+        answer_texts = {}
+        for answer in answers:
+            answer_texts.setdefault(answer.question_id, []).append(answer.message)
+        for question in questions:
+            backend.index(question.id, question.title, question.message, ' '.join(answer_texts.get(question.id, [])))
+        return {'questions': len(questions), 'answers': len(answers),
+                'votes': sum(map(len, question_votes)) + sum(map(len, answer_votes))}
@@ -0,0 +1,154 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from basesite.metrics import record_cache_lookup
+from basesite.models import Question, Tag
+
+# bumped when tags are created, renamed or deleted, so indexes of other processes sharing the cache get rebuilt
+TAG_INDEX_VERSION_KEY = 'basesite:tag-index-version'
+
+
+def normalize(text):
+    return text.strip().casefold()
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TagIndex:
+    """
+    Per-process typeahead index of tags: sorted normalized tags for prefix matches, and a map of 2- and 3-grams to
+    tags for infix matches. Matches are ranked by the number of questions using a tag (Tag.question_count). Built
+    from the database once, then kept up to date by tag and question-tag signals; rebuilt when another process changes
+    tags (see TAG_INDEX_VERSION_KEY) or after settings.TAG_INDEX_MAX_AGE seconds.
+    """
+    prefix_candidates = 1000  # prefix matches considered for ranking, for short and very common prefixes
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.built_at = None
+        self.version = None
+        # keyed by tag id: tags differing only by case (or spaces around) share a normalized tag, not an entry
+        self.tags = {}  # tag id -> [tag, normalized tag, usage]
+        self.keys = []  # sorted (normalized tag, tag id)
+        self.grams = defaultdict(set)  # 2- and 3-grams -> tag ids
+
+    def invalidate(self):
+        with self._lock:
+            self.built_at = None
+
+    def ensure_built(self):
+        version = cache.get(TAG_INDEX_VERSION_KEY)
+        if self.built_at is not None and version == self.version \
+                and time.monotonic() - self.built_at < settings.TAG_INDEX_MAX_AGE:
+            record_cache_lookup('tag_index', hit=True)
+            return
+        record_cache_lookup('tag_index', hit=False)
+        rows = Tag.objects.values_list('id', 'tag', 'question_count')
+        with self._lock:
+            self.tags, self.grams = {}, defaultdict(set)
+            self.keys = sorted(self._add(tag_id, tag, usage) for tag_id, tag, usage in rows)
+            self.version, self.built_at = version, time.monotonic()
+
+    def _add(self, tag_id, tag, usage):
+        key = normalize(tag)
+        self.tags[tag_id] = [tag, key, usage]
+        for n in (2, 3):
+            for gram in ngrams(key, n):
+                self.grams[gram].add(tag_id)
+        return key, tag_id
+
+    def add(self, tag_id, tag, usage=0):
+        with self._lock:
+            if self.built_at is None or tag_id in self.tags:
+                return
+            entry = self._add(tag_id, tag, usage)
+            self.keys.insert(bisect_left(self.keys, entry), entry)
+
+    def remove(self, tag_id):
+        with self._lock:
+            entry = self.tags.pop(tag_id, None)
+            if entry is None:
+                return
+            key = entry[1]
+            position = bisect_left(self.keys, (key, tag_id))
+            if position < len(self.keys) and self.keys[position] == (key, tag_id):
+                del self.keys[position]
+            for n in (2, 3):
+                for gram in ngrams(key, n):
+                    self.grams[gram].discard(tag_id)
+
+    def change_usage(self, tag_ids, delta):
+        with self._lock:
+            for tag_id in tag_ids:
+                entry = self.tags.get(tag_id)
+                if entry is not None:
+                    entry[2] = max(entry[2] + delta, 0)
+
+    def search(self, value, limit=7):
+        """Tags starting with value first, then tags containing it; most used first within each group"""
+        self.ensure_built()
+        query = normalize(value)
+        if not query:
+            return []
+        with self._lock:
+            prefixed = []
+            for key, tag_id in self.keys[bisect_left(self.keys, (query,)):]:
+                if not key.startswith(query) or len(prefixed) >= self.prefix_candidates:
+                    break
+                prefixed.append(tag_id)
+            result = self._ranked(prefixed)[:limit]
+            if len(result) < limit and len(query) > 1:
+                grams = ngrams(query, min(len(query), 3))
+                candidates = set.intersection(*(self.grams.get(gram, set()) for gram in grams))
+                infixed = [tag_id for tag_id in candidates
+                           if query in self.tags[tag_id][1] and not self.tags[tag_id][1].startswith(query)]
+                result += self._ranked(infixed)[:limit - len(result)]
+            return [self.tags[tag_id][0] for tag_id in result]
+
+    def _ranked(self, tag_ids):
+        return sorted(tag_ids, key=lambda tag_id: (-self.tags[tag_id][2], self.tags[tag_id][1], tag_id))
+
+
+tag_index = TagIndex()
+
+
+def bump_tag_index_version():
+    cache.set(TAG_INDEX_VERSION_KEY, time.time_ns(), None)
+
+
+@receiver(post_save, sender=Tag)
+def index_tag(instance, created, **kwargs):
+    bump_tag_index_version()
+    if created:
+        tag_index.add(instance.id, instance.tag)
+        tag_index.version = cache.get(TAG_INDEX_VERSION_KEY)  # this process is up to date
+    else:
+        tag_index.invalidate()  # tag renamed
+
+
+@receiver(post_delete, sender=Tag)
+def unindex_tag(instance, **kwargs):
+    bump_tag_index_version()
+    tag_index.remove(instance.id)
+    tag_index.version = cache.get(TAG_INDEX_VERSION_KEY)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def update_tag_usage(instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_clear':
+        tag_index.invalidate()
+    elif action in ('post_add', 'post_remove') and pk_set:
+        delta = 1 if action == 'post_add' else -1
+        if reverse:  # tag.question_set.add(...): pk_set are questions
+            tag_index.change_usage([instance.id], delta * len(pk_set))
+        else:
+            tag_index.change_usage(pk_set, delta)
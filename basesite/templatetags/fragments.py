@@ -0,0 +1,20 @@
+from django import template
+from django.utils import timezone
+
+register = template.Library()
+
+# age (seconds) below which naturaltime shows a finer unit: seconds, minutes, hours (also "x days, y hours")
+_NATURALTIME_UNITS = ((60, 1), (3600, 60), (7 * 86400, 3600))
+
+
+@register.filter
+def naturaltime_key(value):
+    """
+    Part of a fragment cache key which changes when `value|naturaltime` would read differently, so fragments showing
+    it are cached for as long as it reads the same: a minute for "x minutes ago", a day for dates weeks ago
+    """
+    age = int(abs((timezone.now() - value).total_seconds()))
+    for limit, unit in _NATURALTIME_UNITS:
+        if age < limit:
+            return f'{unit}:{age // unit}'
+    return f'86400:{age // 86400}'
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from basesite.generations import get_generations, bump_generations, TRENDING
+from basesite.metrics import record_cache_lookup
+from basesite.models import Question, Answer, vote_counted
+
+TRENDING_CACHE_KEY = 'basesite:trending-questions'
+# what the trending column shows of the list last computed, kept without a timeout to tell whether a refresh changed it
+TRENDING_SHOWN_KEY = 'basesite:trending-shown'
+
+
+def get_trending_questions():
+    """Trending questions list, shared by all pages and the API; computed only on a cache miss"""
+    questions = cache.get(TRENDING_CACHE_KEY)
+    record_cache_lookup('trending', hit=questions is not None)
+    if questions is None:
+        questions = refresh_trending_questions()
+    return questions
+
+
+def refresh_trending_questions():
+    questions = list(Question.trending.all())
+    cache.set(TRENDING_CACHE_KEY, questions, settings.TRENDING_CACHE_TIMEOUT)
+    shown = [(q.id, q.title, q.votes) for q in questions]
+    previous = cache.get(TRENDING_SHOWN_KEY)
+    if shown != previous:
+        cache.set(TRENDING_SHOWN_KEY, shown, None)
+        # not bumped for an unchanged list: pages being rendered are cached under the generation
+        if previous is not None:
+            bump_generations(TRENDING)
+    return questions
+
+
+def invalidate_trending_questions():
+    cache.delete(TRENDING_CACHE_KEY)
+    bump_generations(TRENDING)
+
+
+def get_trending_generation():
+    """Version of the trending column: rendered columns are cached under it, and not recomputed until it changes"""
+    return get_generations(TRENDING)[0]
+
+
+def _reorders(questions, question_id, hot_score, votes):
+    """Whether the question, ranked with `hot_score` and `votes`, takes another place in the cached list"""
+    ranked = sorted([(q.hot_score, q.votes, q.id) for q in questions if q.id != question_id]
+                    + [(hot_score, votes, question_id)], reverse=True)  # the order of TrendingQuestionManager
+    ids = [q_id for *_, q_id in ranked]
+    size = Question.trending.size
+    if len(questions) == size and ids[-1] == question_id and any(q.id == question_id for q in questions):
+        return True  # last of a full list: a question outside of it may rank higher now
+    return ids[:size] != [q.id for q in questions]
+
+
+@receiver(vote_counted, sender=Question)
+def refresh_trending_on_vote(target_id, increment, hot_score=None, votes=None, **kwargs):
+    questions = cache.get(TRENDING_CACHE_KEY)
+    if questions is None:
+        return
+    if any(q.id == target_id for q in questions):
+        invalidate_trending_questions()  # order and shown votes changed
+    elif increment > 0 and hot_score is not None:  # a downvote cannot bring a question in
+        if _reorders(questions, target_id, hot_score, votes):
+            invalidate_trending_questions()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def refresh_trending_on_question_change(instance, **kwargs):
+    question_id, hot_score, votes = instance.id, instance.hot_score, instance.votes
+    # once committed: invalidated earlier, the list could be recomputed by another request from the rows before it
+    transaction.on_commit(lambda: _refresh_on_question_change(question_id, hot_score, votes))
+
+
+def _refresh_on_question_change(question_id, hot_score, votes):
+    questions = cache.get(TRENDING_CACHE_KEY)
+    if questions is None:
+        return
+    if any(q.id == question_id for q in questions) or _reorders(questions, question_id, hot_score, votes):
+        invalidate_trending_questions()
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def refresh_trending_on_answer_change(instance, signal, created=False, **kwargs):
+    if created or signal is post_delete:
+        question_id = instance.question_id
+        # once committed, with the counters of the question Answer.save() and decrease_answer_count() update
+        transaction.on_commit(lambda: _refresh_on_answer_change(question_id, removed=not created))
+
+
+def _refresh_on_answer_change(question_id, removed):
+    """
+    Answers move their question in the ranking, without changing what is shown. The cached list keeps the scores it
+    was computed with: a move it misses is picked up by the TRENDING_CACHE_TIMEOUT refresh
+    """
+    questions = cache.get(TRENDING_CACHE_KEY)
+    if questions is None:
+        return
+    if removed and not any(q.id == question_id for q in questions):
+        return  # a removed answer cannot bring a question in
+    question = Question.objects.filter(pk=question_id).values('hot_score', 'votes').first()
+    if question is not None and _reorders(questions, question_id, question['hot_score'], question['votes']):
+        invalidate_trending_questions()
@@ -1,56 +1,88 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView
-from django.db.models import Q
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponseForbidden, HttpResponse, Http404
 from django.shortcuts import redirect
 from django.urls import reverse_lazy, reverse
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_GET
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import FormMixin, CreateView, UpdateView
 from django.views.generic.list import ListView, MultipleObjectMixin
 
 from basesite.forms import QuestionCreateForm, AnswerForm, UserProfileForm, UserProfileChangeForm
-from basesite.models import Question, Answer, QuestionVotedBy, AnswerVotedBy, Tag
+from basesite.generations import bump_generations, question_scope, tag_scope, ANSWERS, QUESTIONS, EVERYTHING, TRENDING
+from basesite.metrics import render_metrics, is_metrics_client, has_metrics_token
+from basesite.models import Question, Answer, Tag, Counter
+from basesite.page_cache import PageCacheMixin
+from basesite.pagination import CursorPaginationMixin, CountingPaginationMixin
+from basesite.search import search_questions
+from basesite.tag_index import tag_index
 
 
-class QuestionListView(ListView):
+# ?ordering= values accepted by question lists, and the model ordering they stand for
+QUESTION_ORDERINGS = {
+    '-date_created': '-date_created',
+    '-votes': '-votes',
+    'hot': '-hot_score',
+}
+
+
+class QuestionListView(PageCacheMixin, CursorPaginationMixin, CountingPaginationMixin, ListView):
     model = Question
     paginate_by = 20
     ordering = '-date_created'
+    count_mode = 'maintained'
+
+    def get_page_cache_scopes(self):
+        return EVERYTHING, TRENDING, QUESTIONS
 
     def get_ordering(self):
         ordering = self.request.GET.get('ordering', '-date_created')
-        if ordering in ['-date_created', '-votes']:
+        if ordering in QUESTION_ORDERINGS:
             self.ordering = ordering
-        return self.ordering
+        return QUESTION_ORDERINGS[self.ordering]
+
+    def get_maintained_count(self):
+        return Counter.get_value(Counter.QUESTIONS)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['trending_object_list'] = Question.trending.all()
         context['ordering'] = self.ordering
         return context
 
 
-class QuestionTagListView(ListView):
+class QuestionTagListView(PageCacheMixin, CursorPaginationMixin, CountingPaginationMixin, ListView):
     model = Question
     paginate_by = 20
     ordering = ('-votes', '-date_created')
     template_name = 'basesite/question_tag_list.html'
+    count_mode = 'maintained'
+    tag = None
+
+    def get_page_cache_scopes(self):
+        return EVERYTHING, TRENDING, tag_scope(self.kwargs['slug'])
+
+    def get_ordering(self):
+        ordering = self.request.GET.get('ordering')
+        if ordering in QUESTION_ORDERINGS:
+            return QUESTION_ORDERINGS[ordering]
+        return self.ordering
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        queryset = queryset.filter(tags__slug=self.kwargs['slug'])
-        return queryset
+        self.tag = Tag.objects.filter(slug=self.kwargs['slug']).first()
+        if self.tag is None:
+            return queryset.none()
+        return queryset.filter(tags=self.tag)
+
+    def get_maintained_count(self):
+        return self.tag.question_count if self.tag else 0
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        context['trending_object_list'] = Question.trending.all()
-        try:
-            tag = Tag.objects.get(slug=self.kwargs['slug'])
-        except Tag.DoesNotExist:
-            tag = None
-        context['tag'] = tag
+        context['tag'] = self.tag
         return context
 
 
@@ -58,26 +90,45 @@ class QuestionCreateView(LoginRequiredMixin, CreateView):
     model = Question
     form_class = QuestionCreateForm
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['trending_object_list'] = Question.trending.all()
-        return context
-
     def form_valid(self, form):
         form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class QuestionDetailView(FormMixin, MultipleObjectMixin, DetailView):
+class QuestionDetailView(PageCacheMixin, CursorPaginationMixin, CountingPaginationMixin, FormMixin, MultipleObjectMixin,
+                         DetailView):
     model = Question
     form_class = AnswerForm
     paginate_by = 30
+    count_mode = 'maintained'
+    page_cache_params = ('page', 'cursor')
     object: Question
 
+    def get_page_cache_scopes(self):
+        return EVERYTHING, TRENDING, question_scope(self.kwargs['pk'])
+
+    def get_queryset(self):
+        # authors with their avatars are joined, accepted answer included, tags are read from tags_cache: a constant
+        # number of queries
+        return super().get_queryset().select_related('author__userprofile', 'accepted_answer__author__userprofile')
+
+    def get_maintained_count(self):
+        return self.object.answer_count - self.object.has_accepted_answer
+
     def get_context_data(self, **kwargs):
-        object_list = Answer.objects.filter(question_id=self.object.id).order_by('-correct', '-votes', '-date_created')
+        # the accepted answer is shown above the first page, the others are paginated by votes
+        object_list = (Answer.objects.filter(question_id=self.object.id).exclude(pk=self.object.accepted_answer_id)
+                       .select_related('author__userprofile').order_by('-votes', '-date_created'))
         context = super().get_context_data(object_list=object_list, **kwargs)
-        context['trending_object_list'] = Question.trending.all()
+        page = context['page_obj']
+        accepted = self.object.accepted_answer if not page.has_previous() else None
+        context['accepted_answer'] = accepted
+        if self.request.user.is_authenticated:  # highlighted vote buttons, anonymous visitors have no votes
+            answers = list(page) + ([accepted] if accepted else [])
+            self.object.user_vote, votes = Question.user_votes(self.request.user, self.object.id,
+                                                               [answer.id for answer in answers])
+            for answer in answers:
+                answer.user_vote = votes.get(answer.id, 0)
         form = kwargs.get('form', None) or AnswerForm()
         context['form'] = form
         return context
@@ -96,7 +147,6 @@ class QuestionDetailView(FormMixin, MultipleObjectMixin, DetailView):
         obj = form.save(commit=False)
         obj.question = self.object
         obj.author = self.request.user
-        obj.correct = False
         obj.save()
         return super().form_valid(form)
 
@@ -108,14 +158,9 @@ def accept_answer(request, qpk: int, apk: int):
     if not request.user.is_authenticated:
         return JsonResponse({'result': 'Login required'})
     if request.POST:
-        user = request.user
-        try:
-            Answer.objects.get(id=apk, question__id=qpk, question__author=user)  # just check if answer exists
-            answers = Answer.objects.filter(question__id=qpk, question__author=user)
-            answers.exclude(id=apk).update(correct=False)
-            answers.filter(id=apk).update(correct=True)  # using update to avoid .save() and sending email as a result
-        except Answer.DoesNotExist:
+        if not Question.accept_answer(qpk, apk, request.user):  # update avoids .save() and its signals
             return JsonResponse({'result': 'Not found'})
+        bump_generations(ANSWERS, QUESTIONS, question_scope(qpk))  # lists filtered by accepted answers too
     return JsonResponse({'result': 'Success'})
 
 
@@ -130,39 +175,37 @@ def vote(request, pk):
             instance_id = int(request.POST['instance_id'])
             if increment not in (-1, 1) or instance_type not in ('a', 'q'):
                 return JsonResponse({'result': 'Wrong request data (increment or instance_type)'})
-            q = Question.objects.get(pk=pk)
             if instance_type == 'a':
-                a = Answer.objects.get(pk=instance_id)
+                counted = Answer.apply_vote(instance_id, user, increment, question_id=pk)
+            else:
+                counted = Question.apply_vote(pk, user, increment)
         except (ValueError, Question.DoesNotExist, Answer.DoesNotExist) as exc:
             return JsonResponse({'result': 'Wrong request data: ' + str(exc)})
-        if instance_type == 'a':
-            voted_by = AnswerVotedBy.objects.get_or_create(user=user, answer=a)[0]
-            instance = a
-        else:
-            voted_by = QuestionVotedBy.objects.get_or_create(user=user, question=q)[0]
-            instance = q
-        if voted_by.vote != increment:
-            instance.votes += increment
-            voted_by.vote += increment
-            voted_by.save()
-            instance.save()  # todo: change in order to not sending email on every vote (bulk update?)!
+        if counted:
             return JsonResponse({'result': 'Success'})
         return JsonResponse({'result': 'Already voted'})
 
 
 @require_GET
+@cache_control(public=True, max_age=settings.TAG_TYPEAHEAD_MAX_AGE)
 def tag_typeahead(request):
     value = request.GET['query']
-    tag_candidates = Tag.objects.filter(tag__icontains=value).values('id', 'tag')[:7]
-    result = [{"value": tc['tag'], "label": tc['tag']} for tc in tag_candidates]
+    result = [{"value": tag, "label": tag} for tag in tag_index.search(value, limit=7)]
     return JsonResponse(result, safe=False)
 
 
+@require_GET
+def metrics(request):
+    """Prometheus metrics of all app server workers, for the scraper (with the metrics token), loopback and staff"""
+    if not (request.user.is_staff or has_metrics_token(request.META.get('HTTP_AUTHORIZATION', ''))
+            or is_metrics_client(request.META.get('REMOTE_ADDR', ''))):
+        raise Http404
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
 class HaskerLoginView(LoginView):
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['trending_object_list'] = Question.trending.all()
-        return context
+    pass
 
 
 class SignUpView(CreateView):
@@ -170,11 +213,6 @@ class SignUpView(CreateView):
     form_class = UserProfileForm
     success_url = reverse_lazy('list')
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['trending_object_list'] = Question.trending.all()
-        return context
-
 
 class SettingsView(LoginRequiredMixin, UpdateView):
     model = User
@@ -186,18 +224,18 @@ class SettingsView(LoginRequiredMixin, UpdateView):
         current_user = self.request.user
         return current_user
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['trending_object_list'] = Question.trending.all()
-        return context
-
 
-class QuestionSearchListView(ListView):
+class QuestionSearchListView(PageCacheMixin, CursorPaginationMixin, CountingPaginationMixin, ListView):
     model = Question
     paginate_by = 20
     template_name = 'basesite/search_results.html'
+    count_mode = 'capped'
+    page_cache_params = ('q', 'ordering', 'page', 'cursor')
     query: str = ""
 
+    def get_page_cache_scopes(self):
+        return EVERYTHING, TRENDING, QUESTIONS, ANSWERS  # answers are searched too
+
     def get(self, *args, **kwargs):
         self.query: str = self.request.GET['q']
         return super().get(*args, **kwargs)
@@ -213,18 +251,9 @@ class QuestionSearchListView(ListView):
         return super().render_to_response(context, **response_kwargs)
 
     def get_ordering(self):
-        ordering = self.request.GET.get('ordering', '-date_created')
-        if ordering in ['-votes', '-date_created']:
-            return ordering
-        return '-date_created'
+        ordering = self.request.GET.get('ordering', 'relevance')
+        return QUESTION_ORDERINGS.get(ordering, '-search_rank')
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = queryset.filter(Q(title__icontains=self.query) | Q(message__icontains=self.query) |
-                                   Q(answers__message__icontains=self.query)).distinct()
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['trending_object_list'] = Question.trending.all()
-        return context
+        queryset = search_questions(Question.objects.all(), self.query)
+        return queryset.order_by(self.get_ordering(), '-date_created')
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'basesite.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +72,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'basesite.context_processors.trending',
+                'basesite.context_processors.fragments',
             ],
         },
     },
@@ -129,6 +132,48 @@ LOGIN_REDIRECT_URL = reverse_lazy('list')
 LOGOUT_REDIRECT_URL = reverse_lazy('list')
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # todo: test real sending
+DEFAULT_FROM_EMAIL = 'test@test.com'
+# new answers are collected for this number of seconds into one digest email, see send_answer_notifications command
+ANSWER_NOTIFICATION_WINDOW = 300
+# trending column is recomputed at least this often (seconds), and also when a vote or a new question changes it
+TRENDING_CACHE_TIMEOUT = 60
+# hot ranking: a vote/an answer makes a question rank as if it was asked this number of seconds later
+HOT_SCORE_VOTE_SECONDS = 3600
+HOT_SCORE_ANSWER_SECONDS = 1800
+# PostgreSQL text search configuration of the question search index
+SEARCH_CONFIG = 'english'
+# in-memory tag typeahead index is rebuilt from the database at least this often (seconds)
+TAG_INDEX_MAX_AGE = 300
+# tag typeahead responses may be cached by browsers and nginx for this long (seconds)
+TAG_TYPEAHEAD_MAX_AGE = 60
+# paginators counting in "capped" mode stop counting rows there, and show the count as "10,000+"
+PAGINATION_COUNT_CAP = 10000
+# backends of basesite/cache_backends.py count their hits and misses in the stats of PerformanceMiddleware
+CACHES = {
+    'default': {
+        'BACKEND': 'basesite.cache_backends.LocMemCache',
+    }
+}
+# rendered API responses are cached for this long (seconds), or until a write changes the data they show
+API_RESPONSE_CACHE_TIMEOUT = 300
+# rendered question rows, answers and the trending column are cached for this long (seconds), or until they change
+FRAGMENT_CACHE_TIMEOUT = 600
+# whole pages rendered for anonymous visitors are cached for this long (seconds; they show "x minutes ago" dates), or
+# until a write changes what they show (in other processes too with a shared cache; keep it short without one)
+PAGE_CACHE_TIMEOUT = 60
+# browsers and nginx may reuse pages for anonymous visitors for this long (seconds)
+PAGE_CACHE_MAX_AGE = 5
+# requests slower than this (ms) are logged as warnings, and have their profile saved when sampled
+PERFORMANCE_SLOW_REQUEST_MS = 500
+# cProfile captures of slow requests are written there, None turns profiling off
+PERFORMANCE_PROFILE_DIR = None
+# share of requests run under cProfile when PERFORMANCE_PROFILE_DIR is set
+PERFORMANCE_PROFILE_SAMPLE_RATE = 0.01
+# /metrics answers clients of these networks, requests with the METRICS_TOKEN bearer token and staff users only; the
+# source address of proxied requests is the proxy's, so only loopback is trusted: a scraper in another container sends
+# the token
+METRICS_ALLOWED_NETWORKS = ['127.0.0.0/8', '::1/128']
+METRICS_TOKEN = env_vars.get('METRICS_TOKEN', '')
 SITE_ID = 1
 
 REST_FRAMEWORK = {
@@ -141,3 +186,15 @@ REST_FRAMEWORK = {
 }
 
 USE_X_FORWARDED_HOST = True
+
+# one JSON line per request from PerformanceMiddleware: slow requests only, set the level to INFO to log all of them
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'basesite.performance': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
@@ -10,3 +10,12 @@ DATABASES = {
         'PORT': env_vars['POSTGRES_PORT'],
     }
 }
+
+# shared by all uwsgi workers and the notifier: generations, the trending list, cached pages and responses, the tag
+# index version are only consistent across processes through one cache
+CACHES = {
+    'default': {
+        'BACKEND': 'basesite.cache_backends.RedisCache',
+        'LOCATION': env_vars['REDIS_URL'],
+    }
+}
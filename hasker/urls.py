@@ -58,6 +58,7 @@ urlpatterns = [
     path('vote/<int:pk>', views.vote, name='vote'),
     path('tag-typeahead', views.tag_typeahead, name='tag-typeahead'),
     path('accept-answer/<int:qpk>/<int:apk>', views.accept_answer, name='accept-answer'),
+    path('metrics', views.metrics, name='metrics'),
 
     path('api/v1/', include('hasker_api.urls')),
     # path('api/v1/openapi', get_schema_view(
@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from basesite.generations import get_generations
+from basesite.metrics import record_cache_lookup
+
+RESPONSE_CACHE_KEY = 'hasker_api:response:{}'
+# response headers stored and served with a cached body
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+accepts_gzip = re.compile(r'\bgzip\b')
+
+
+class ResponseCacheStats:
+    """Response cache activity of this process, to size the cache by"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stored = self.stored_bytes = self.rendered_bytes = 0
+
+    def record(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else None,
+                'stored': self.stored,
+                'stored_bytes': self.stored_bytes,  # compressed
+                'rendered_bytes': self.rendered_bytes,
+            }
+
+
+response_cache_stats = ResponseCacheStats()
+
+
+class ResponseCacheMixin:
+    """
+    Caches rendered JSON responses, which are the same for every user allowed to see them, under the request (host,
+    path, query parameters, media type) and the generations of the data scopes the response shows, given by
+    get_cache_scopes(), see basesite.generations: writes make the keys of affected responses change, nothing is
+    deleted. Bodies are stored gzip compressed, and served as they are to clients accepting gzip.
+    """
+
+    def get_cache_scopes(self):
+        """Data scopes the response depends on, or None for responses which are not cached"""
+        return None
+
+    def get_response_cache_key(self, request):
+        scopes = self.get_cache_scopes()
+        if scopes is None or request.accepted_renderer.format != 'json':  # browsable API pages show the user
+            return None
+        key = repr((request.get_host(), request.path, sorted(request.GET.lists()), request.accepted_media_type,
+                    get_generations(*scopes)))
+        return RESPONSE_CACHE_KEY.format(hashlib.md5(key.encode()).hexdigest())
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        entry = cache.get(key)
+        if entry is not None:
+            response_cache_stats.record(hits=1)
+            record_cache_lookup('api_response', hit=True)
+            return self.build_cached_response(request, entry)
+        response_cache_stats.record(misses=1)
+        record_cache_lookup('api_response', hit=False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(lambda rendered: self.store_response(key, rendered))
+        return response
+
+    @staticmethod
+    def store_response(key, response):
+        body = compress_string(response.content)
+        entry = {
+            'content_type': response['Content-Type'],
+            'headers': {header: response[header] for header in CACHED_HEADERS if response.has_header(header)},
+            'body': body,
+        }
+        cache.set(key, entry, settings.API_RESPONSE_CACHE_TIMEOUT)
+        response_cache_stats.record(stored=1, stored_bytes=len(body), rendered_bytes=len(response.content))
+
+    @staticmethod
+    def build_cached_response(request, entry):
+        response = HttpResponse(content_type=entry['content_type'])
+        if accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            response.content = entry['body']
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response.content = gzip.decompress(entry['body'])
+        patch_vary_headers(response, ('Accept-Encoding',))
+        for header, value in entry['headers'].items():
+            response[header] = value
+        return response
@@ -1,30 +1,34 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils.functional import cached_property
 from rest_framework import serializers
 
 from basesite.models import Question, Answer, Tag
 
 
-class QuestionSerializer(serializers.ModelSerializer):
-    author = serializers.ReadOnlyField(source='author.username')
-    url = serializers.SerializerMethodField()
-    tags_url = serializers.SerializerMethodField()
-    answers_url = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Question
-        fields = ('author', 'title', 'message', 'date_created', 'votes', 'url', 'has_tags', 'tags_url', 'has_answers',
-                  'answers_url')
+class URLTemplateField(serializers.Field):
+    """
+    Absolute URL of a view taking the object pk as its only argument. The URL is reversed once per serializer, with a
+    placeholder pk, and then formatted for every row: much cheaper than reverse() and build_absolute_uri() per row.
+    """
+    placeholder = 2147483647
 
-    def get_url(self, obj):
-        request = self.context.get('request')
-        return request.build_absolute_uri(obj.api_url)
+    def __init__(self, view_name, **kwargs):
+        self.view_name = view_name
+        kwargs['source'] = 'pk'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
 
-    def get_tags_url(self, obj):
+    @cached_property
+    def template(self):
+        url = reverse(self.view_name, args=[self.placeholder])
         request = self.context.get('request')
-        return request.build_absolute_uri(obj.api_tags_url)
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return url.replace(str(self.placeholder), '{pk}')
 
-    def get_answers_url(self, obj):
-        request = self.context.get('request')
-        return request.build_absolute_uri(obj.api_answers_url)
+    def to_representation(self, value):
+        return self.template.format(pk=value)
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -42,4 +46,46 @@ class AnswerSerializer(serializers.ModelSerializer):
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = '__all__'
+        fields = ('id', 'tag', 'slug')
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    avatar = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'avatar')
+
+    def get_avatar(self, obj):
+        profile = getattr(obj, 'userprofile', None)
+        if profile is None or not profile.avatar:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(profile.avatar.url) if request is not None else profile.avatar.url
+
+
+class QuestionSerializer(serializers.ModelSerializer):
+    """
+    Question, with related objects embedded when they are in the 'include' set of the context: answers, tags and author
+    (as author_detail). The queryset is expected to prefetch them.
+    """
+    author = serializers.ReadOnlyField(source='author_name')
+    url = URLTemplateField('api-question-detail')
+    tags_url = URLTemplateField('api-tag-list')
+    answers_url = URLTemplateField('api-answer-list')
+
+    class Meta:
+        model = Question
+        fields = ('author', 'title', 'message', 'date_created', 'votes', 'url', 'has_tags', 'tags_url', 'has_answers',
+                  'answers_url', 'has_accepted_answer')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include = self.context.get('include', ())
+        if 'answers' in include:
+            fields['answers'] = AnswerSerializer(many=True, read_only=True)
+        if 'tags' in include:
+            fields['tags'] = TagSerializer(many=True, read_only=True)
+        if 'author' in include:
+            fields['author_detail'] = AuthorSerializer(source='author', read_only=True)
+        return fields
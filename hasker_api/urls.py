@@ -21,6 +21,8 @@ router.register(r'questions/(?P<question_id>\d+)/tags', views.QuestionTagViewSet
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('export/', views.export, name='api-export'),
+    path('response-cache-stats/', views.cache_stats, name='api-response-cache-stats'),
     path('openapi/', get_schema_view(
         title="Hasker",
         description="Q&A traversing API",
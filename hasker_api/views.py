@@ -1,25 +1,86 @@
+import hashlib
 import json
+from collections import OrderedDict
+from functools import partial
 
-from django.http import HttpResponse
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
 from rest_framework import permissions, mixins, viewsets, filters, pagination
-from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
 
-from basesite.models import Question, Answer
+from basesite.export import export_ndjson, parse_since
+from basesite.generations import ANSWERS, EVERYTHING, QUESTIONS, question_scope
+from basesite.models import Question, Answer, Counter
+from basesite.pagination import KeysetPaginator, InvalidCursor, CountingPaginator, get_cursor_keys
+from basesite.search import search_questions, search_terms
+from basesite.trending import get_trending_questions
+from hasker_api.cache import ResponseCacheMixin, response_cache_stats
 from hasker_api.serializers import TagSerializer, AnswerSerializer, QuestionSerializer
 
 
 class PageNumberPaginationWithCount(pagination.PageNumberPagination):
+    """
+    Page number pagination with the number of pages; the count is exact or not as the view's count mode tells, see
+    basesite.pagination.CountingPaginator. With ?cursor= (empty for the first page) orderings which have cursor keys
+    are paginated by cursor instead, without counts: results, next and previous only
+    """
     page_size = 20
+    cursor_query_param = 'cursor'
+    count_mode = 'exact'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_page = None
+        keys = get_cursor_keys(queryset)
+        if keys is None or self.cursor_query_param not in request.query_params:
+            self.django_paginator_class = self.get_django_paginator_class(view)
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        try:
+            self.cursor_page = KeysetPaginator(queryset, keys, self.get_page_size(request)).page(
+                request.query_params[self.cursor_query_param])
+        except InvalidCursor as exc:
+            raise NotFound(str(exc)) from exc
+        return list(self.cursor_page)
 
-    def get_paginated_response(self, *args, **kwargs):
-        response = super().get_paginated_response(*args, **kwargs)
+    def get_paginated_response(self, data):
+        if self.cursor_page is not None:
+            return Response(OrderedDict([
+                ('next', self.get_cursor_link(self.cursor_page.next_cursor)),
+                ('previous', self.get_cursor_link(self.cursor_page.previous_cursor)),
+                ('results', data),
+            ]))
+        response = super().get_paginated_response(data)
+        response.data['count_exact'] = self.page.paginator.count_is_exact
         response.data['page_count'] = self.page.paginator.num_pages
         return response
 
+    def get_django_paginator_class(self, view):
+        """CountingPaginator with the count mode and the maintained count of the view, if it has them"""
+        if hasattr(view, 'get_count_mode'):
+            count_mode = view.get_count_mode()
+        else:
+            count_mode = getattr(view, 'count_mode', self.count_mode)
+        return partial(CountingPaginator, count_mode=count_mode,
+                       maintained_count=getattr(view, 'get_maintained_count', None))
+
+    def get_cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
     def get_paginated_response_schema(self, *args, **kwargs):
         schema = super().get_paginated_response_schema(*args, **kwargs)
+        schema['properties']['count_exact'] = {
+            'type': 'boolean',
+            'example': True,
+        }
         schema['properties']['page_count'] = {
             'type': 'integer',
             'example': 123,
@@ -27,31 +88,236 @@ class PageNumberPaginationWithCount(pagination.PageNumberPagination):
         return schema
 
 
-class QuestionViewSet(viewsets.ModelViewSet):
+class ConditionalGetMixin:
+    """
+    Answers with 304 Not Modified, before any query of the response data or serialization, when the validators of the
+    requested resource match the request. Validators come from get_validators(): a version, any value which changes
+    whenever the response content does (maintained counters, modification times), and a modification time. They are
+    computed before the handler for conditional requests only, otherwise after it, so that they can reuse what the
+    handler has read anyway.
+    """
+
+    def get_validators(self, request):
+        """(version, last_modified) of the requested resource, either may be None"""
+        return None, None
+
+    @cached_property
+    def http_validators(self):
+        """(ETag, Last-Modified timestamp) of the requested resource"""
+        request = self.request
+        version, last_modified = self.get_validators(request)
+        etag = None
+        if version is not None:
+            # same data is rendered differently for other hosts (absolute URLs) and formats
+            key = repr((request.get_host(), request.get_full_path(), request.META.get('HTTP_ACCEPT'), version))
+            etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        return etag, int(last_modified.timestamp()) if last_modified is not None else None
+
+    def conditional(self, request, handler, *args, **kwargs):
+        response = None
+        if 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            etag, timestamp = self.http_validators
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            return response
+        if not response.has_header('ETag'):  # cached responses come with the validators they were stored with
+            etag, timestamp = self.http_validators
+            if etag is not None:
+                response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def latest_answer_change():
+    """Last change of the answers of the question of the outer query"""
+    return Answer.objects.filter(question=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+
+
+def questions_version():
+    """Changes with every question shown by lists: the latest change, and the number of questions for deletions"""
+    latest = Question.objects.order_by('-updated_at').values('updated_at')[:1]
+    return Counter.objects.filter(name=Counter.QUESTIONS).values_list('value', Subquery(latest)).first()
+
+
+class QuestionSearchFilter(filters.SearchFilter):
+    """SearchFilter served by the full-text search index, see basesite.search"""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not search_terms(query):
+            return queryset
+        return search_questions(queryset, query)
+
+
+class QuestionOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter which also accepts ?ordering=hot, served by the hot_score index, and orders search results by
+    relevance unless an ordering is given
+    """
+    aliases = {'hot': ['-hot_score']}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_param)
+        if ordering in self.aliases:
+            return self.aliases[ordering]
+        if not ordering and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-date_created']
+        return super().get_ordering(request, queryset, view)
+
+
+class QuestionViewSet(ConditionalGetMixin, ResponseCacheMixin, viewsets.ModelViewSet):
     """
     View set that returns a list of all or filtered questions, trending questions, or detailed question.
     Default filter: off. Enable it by including ?search query to url
-    Default sorting: date of creaton, reversed. Alter it by ?ordering query:-date_created, votes, -votes. Searches
-    in title and message in Question, and in message of Answer objects to that Questions
+    Default sorting: date of creaton, reversed. Alter it by ?ordering query:-date_created, votes, -votes, hot. Searches
+    in title and message in Question, and in message of Answer objects to that Questions, results are ordered by
+    relevance unless ?ordering is given. List, search and question responses are cached, see ResponseCacheMixin
+    Related objects are embedded with ?include=answers,tags,author (any of them), loaded by one query each whatever the
+    number of questions. Questions can be listed by id with ?ids=1,2,3, and filtered by whether they have an accepted
+    answer with ?accepted=true|false
     """
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = PageNumberPaginationWithCount
     http_method_names = ['get']
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'message', 'answers__message']
+    filter_backends = [QuestionSearchFilter, QuestionOrderingFilter]
     ordering_fields = ['date_created', 'votes']
     ordering = ['-date_created']
+    count_mode = 'maintained'  # searches: 'capped', lists by id: 'exact'
+    includes = ('answers', 'tags', 'author')
+    max_ids = 100
+    answer_ordering = ('-correct', '-votes', '-date_created')  # as on the question page
+
+    @cached_property
+    def include(self):
+        """Related objects to embed, from ?include="""
+        include = {name.strip() for name in self.request.query_params.get('include', '').split(',') if name.strip()}
+        unknown = include.difference(self.includes)
+        if unknown:
+            raise ValidationError({'include': f"Unknown: {', '.join(sorted(unknown))}. "
+                                              f"Expected any of: {', '.join(self.includes)}"})
+        return frozenset(include) if self.action in ('list', 'retrieve') else frozenset()
+
+    @cached_property
+    def ids(self):
+        """Question ids from ?ids=, None if not given"""
+        value = self.request.query_params.get('ids')
+        if value is None or self.action != 'list':
+            return None
+        try:
+            ids = {int(pk) for pk in value.split(',') if pk.strip()}
+        except ValueError as exc:
+            raise ValidationError({'ids': 'Comma separated question ids expected'}) from exc
+        if len(ids) > self.max_ids:
+            raise ValidationError({'ids': f'At most {self.max_ids} ids expected'})
+        return ids
+
+    @cached_property
+    def accepted(self):
+        """Whether listed questions have an accepted answer, from ?accepted=, None if not given"""
+        value = self.request.query_params.get('accepted')
+        if value is None or self.action != 'list':
+            return None
+        if value.lower() not in ('true', 'false'):
+            raise ValidationError({'accepted': 'true or false expected'})
+        return value.lower() == 'true'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if 'answers' in self.include:
+            answers = Answer.objects.with_correct().select_related('author').order_by(*self.answer_ordering)
+            queryset = queryset.prefetch_related(Prefetch('answers', queryset=answers))
+            if self.action == 'retrieve':
+                queryset = queryset.annotate(answers_updated_at=Subquery(latest_answer_change()))
+        if 'tags' in self.include:
+            queryset = queryset.prefetch_related('tags')
+        if 'author' in self.include:
+            queryset = queryset.select_related('author__userprofile')
+        if self.ids is not None:
+            queryset = queryset.filter(pk__in=self.ids)
+        if self.accepted is not None:
+            queryset = queryset.filter(accepted_answer__isnull=not self.accepted)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.include
+        return context
+
+    def get_count_mode(self):
+        if self.ids is not None:
+            return 'exact'
+        if self.accepted is not None:  # no maintained count of either
+            return 'capped'
+        if search_terms(self.request.query_params.get(QuestionSearchFilter.search_param, '')):
+            return 'capped'
+        return self.count_mode
+
+    @cached_property
+    def questions_version(self):
+        return questions_version()
+
+    def get_maintained_count(self):
+        return self.questions_version[0] if self.questions_version else None
+
+    def get_object(self):
+        self.object = super().get_object()
+        return self.object
+
+    def get_validators(self, request):
+        """
+        Retrieve: the last change of the question (and of its answers, if included), from the retrieved question if
+        there is one. Trending: the cached trending questions. Lists: questions_version(), read for the maintained
+        count anyway; searches, lists by id and lists with answers are not validated.
+        """
+        if self.action == 'retrieve':
+            question = getattr(self, 'object', None)
+            if question is None:
+                queryset = Question.objects.filter(pk=self.kwargs['pk']).only('updated_at')
+                if 'answers' in self.include:
+                    queryset = queryset.annotate(answers_updated_at=Subquery(latest_answer_change()))
+                question = queryset.first()
+                if question is None:
+                    return None, None
+            changes = [question.updated_at]
+            if 'answers' in self.include and question.answers_updated_at is not None:
+                changes.append(question.answers_updated_at)
+            return changes, max(changes)
+        if self.action == 'trending_questions':
+            return [(question.id, question.updated_at) for question in get_trending_questions()], None
+        if self.get_count_mode() != 'maintained' or 'answers' in self.include:
+            return None, None
+        return self.questions_version, None
+
+    def get_cache_scopes(self):
+        if self.action == 'retrieve':
+            scopes = (EVERYTHING, question_scope(self.kwargs['pk']))
+        else:
+            scopes = (EVERYTHING, QUESTIONS)
+        return scopes + (ANSWERS,) if 'answers' in self.include else scopes
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, self.cached_response, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, self.cached_response, super().retrieve, *args, **kwargs)
 
     @action(detail=False, methods=['get'], url_path='trending-questions', url_name='trending-list')
     def trending_questions(self, request):
-        queryset = Question.trending.all()
+        return self.conditional(request, self._trending_questions)
+
+    def _trending_questions(self, request):
+        queryset = get_trending_questions()
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
 
-class AnswerViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class AnswerViewSet(ConditionalGetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     Returns a list of answers associated with a specific question id
     """
@@ -62,18 +328,60 @@ class AnswerViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['date_created', 'votes']
     ordering = ['-date_created']
+    count_mode = 'maintained'
+    question = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.paginator.page_size = 30
 
     def get_queryset(self):
-        question_id = self.kwargs.get('question_id')
-        try:
-            q = Question.objects.get(pk=question_id)
-            return Answer.objects.filter(question=q)
-        except Question.DoesNotExist as exc:
-            raise NotFound("Question not found.") from exc
+        if self.question is None:
+            # with the last change of its answers, for the validators
+            try:
+                self.question = Question.objects.annotate(answers_updated_at=Subquery(latest_answer_change())).get(
+                    pk=self.kwargs.get('question_id'))
+            except Question.DoesNotExist as exc:
+                raise NotFound("Question not found.") from exc
+        return Answer.objects.filter(question=self.question).with_correct().select_related('author')
+
+    def get_maintained_count(self):
+        return self.question.answer_count
+
+    def get_validators(self, request):
+        """Last change of the answers, their number for deletions, and the accepted one (set on the question)"""
+        self.get_queryset()
+        return (self.question.answers_updated_at, self.question.answer_count, self.question.accepted_answer_id), None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, super().list, *args, **kwargs)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats(request):
+    """Response cache hits, misses and stored sizes of the serving process"""
+    return Response(response_cache_stats.as_dict())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export(request):
+    """
+    Whole Q&A corpus as streamed NDJSON, see basesite.export.export_records: changes only with ?since=<cursor of a
+    previous export>, gzip compressed with ?compress=gzip
+    """
+    since = request.query_params.get('since')
+    try:
+        since = parse_since(since) if since else None
+    except ValueError as exc:
+        raise ValidationError({'since': str(exc)}) from exc
+    compress = request.query_params.get('compress') == 'gzip'
+    response = StreamingHttpResponse(export_ndjson(since=since, compress=compress),
+                                     content_type='application/gzip' if compress else 'application/x-ndjson')
+    filename = 'hasker-export.ndjson.gz' if compress else 'hasker-export.ndjson'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
 
 def infoview(request):
@@ -42,7 +42,7 @@ class TestAnswerViewSet(APITestCase):
         ids = create_test_data()
         url = reverse('api-answer-list', args=(ids['q3'], ))
         response = self.client.get(url)
-        fields_expected = ['count', 'next', 'previous', 'results', 'page_count']
+        fields_expected = ['count', 'count_exact', 'next', 'previous', 'results', 'page_count']
         self.assertEqual(set(fields_expected), set(response.data.keys()))
 
     def test_return_answers(self):
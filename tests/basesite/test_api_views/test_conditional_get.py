@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from basesite.models import Question, Answer, Tag
+from tests.basesite.utils import create_test_data, get_logged_user
+
+
+class TestConditionalGet(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        get_logged_user(self.client)
+        self.ids = create_test_data()
+
+    def assertNotModified(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(b'', response.content)
+        return response
+
+    def revalidate(self, url):
+        """ETag of the first response, and the response to a request with it"""
+        etag = self.client.get(url)['ETag']
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_question_list(self):
+        url = reverse('api-question-list')
+        etag, response = self.revalidate(url)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+        with self.assertNumQueries(3):  # session, user, validators: no page, no count
+            self.assertNotModified(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(etag, self.client.get(f'{url}?ordering=-votes')['ETag'])  # other query
+
+        for change in (lambda: Question.apply_vote(self.ids['q3'], User.objects.get(pk=self.ids['u']), 1),
+                       lambda: Answer.objects.create(author_id=self.ids['u'], question_id=self.ids['q3'], message='A',
+                                                     correct=False),
+                       lambda: Question.objects.get(pk=self.ids['q3']).tags.add(self.ids['t1']),
+                       lambda: Tag.objects.filter(pk=self.ids['t1']).get().delete(),
+                       lambda: Question.objects.get(pk=self.ids['q3']).delete()):
+            with self.captureOnCommitCallbacks(execute=True):  # generations are bumped once writes commit
+                change()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            self.assertNotEqual(etag, response['ETag'])
+            etag = response['ETag']
+
+    def test_question_retrieve(self):
+        url = reverse('api-question-detail', args=(self.ids['q1'],))
+        response = self.client.get(url)
+        updated_at = Question.objects.get(pk=self.ids['q1']).updated_at
+        self.assertEqual(http_date(int(updated_at.timestamp())), response['Last-Modified'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotModified(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertNotModified(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        Question.apply_vote(self.ids['q1'], User.objects.get(pk=self.ids['u']), 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((status.HTTP_200_OK, 4), (response.status_code, response.data['votes']))
+        response = self.client.get(reverse('api-question-detail', args=(0,)), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_answer_list(self):
+        url = reverse('api-answer-list', args=(self.ids['q2'],))
+        etag, response = self.revalidate(url)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        Answer.objects.filter(pk=self.ids['a2_1']).get().delete()
+        etag, response = self.revalidate(url)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.client.force_login(User.objects.get(pk=self.ids['u']))  # the author of the question
+        self.client.post(reverse('accept-answer', args=(self.ids['q2'], self.ids['a2_2'])), {'accept': 1})
+        self.assertTrue(Answer.objects.get(pk=self.ids['a2_2']).correct)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+        response = self.client.get(reverse('api-answer-list', args=(0,)), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_trending(self):
+        url = reverse('api-question-trending-list')
+        etag, response = self.revalidate(url)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        Question.apply_vote(self.ids['q3'], User.objects.get(pk=self.ids['u']), 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from basesite.models import Answer, UserProfile
+from tests.basesite.utils import create_test_data, get_logged_user
+
+
+class TestQuestionInclude(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        get_logged_user(self.client)
+        self.ids = create_test_data()
+
+    def test_retrieve(self):
+        url = reverse('api-question-detail', args=(self.ids['q2'],))
+        response = self.client.get(url, {'include': 'answers,tags,author'})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        data = response.data
+        self.assertEqual(['A to Q2 number 3, content', 'A to Q2 number 2, content', 'A to Q2, content'],
+                         [answer['message'] for answer in data['answers']])  # accepted first, then newest
+        self.assertEqual({'id', 'author', 'message', 'date_created', 'votes', 'correct'}, set(data['answers'][0]))
+        self.assertEqual([], data['tags'])
+        self.assertEqual({'id': self.ids['u'], 'username': 'testuser1', 'avatar': None}, data['author_detail'])
+        self.assertNotIn('answers', self.client.get(url).data)
+
+    def test_list(self):
+        response = self.client.get(reverse('api-question-list'), {'include': 'tags'})
+        tags = {question['title']: [tag['tag'] for tag in question['tags']] for question in response.data['results']}
+        self.assertEqual({'Q title': ['tag1', 'Tag 2'], 'Q2 title': [], 'Q3 title': []}, tags)
+        self.assertNotIn('answers', response.data['results'][0])
+
+    def test_unknown_include(self):
+        response = self.client.get(reverse('api-question-list'), {'include': 'answers,comments'})
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('comments', str(response.data['include']))
+
+    def test_ids(self):
+        url = reverse('api-question-list')
+        response = self.client.get(url, {'ids': f"{self.ids['q1']},{self.ids['q3']},0", 'include': 'answers'})
+        self.assertEqual((2, True), (response.data['count'], response.data['count_exact']))
+        self.assertEqual({'Q title': 1, 'Q3 title': 0},
+                         {question['title']: len(question['answers']) for question in response.data['results']})
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, self.client.get(url, {'ids': '1,x'}).status_code)
+        too_many = ','.join(str(pk) for pk in range(1, 102))
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, self.client.get(url, {'ids': too_many}).status_code)
+
+    def test_included_changes(self):
+        """Cached responses and validators with included answers and authors follow their changes"""
+        url = reverse('api-question-detail', args=(self.ids['q2'],))
+        params = {'include': 'answers,author'}
+        etag = self.client.get(url, params)['ETag']
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        Answer.apply_vote(self.ids['a2_1'], User.objects.get(pk=self.ids['u']), 1)
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, {answer['id']: answer['votes'] for answer in response.data['answers']}[self.ids['a2_1']])
+        with self.captureOnCommitCallbacks(execute=True):  # generations are bumped once writes commit
+            profile = UserProfile.objects.create(user_id=self.ids['u'], email='testuser1@test.com')
+            profile.avatar = 'avatars/testuser1.png'
+            profile.save()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(response.data['author_detail']['avatar'].endswith('/avatars/testuser1.png'))
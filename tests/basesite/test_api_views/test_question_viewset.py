@@ -2,6 +2,7 @@ import base64
 from datetime import datetime
 from urllib.parse import urlparse
 
+from django.core.cache import cache
 from django.urls import reverse, exceptions
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -11,6 +12,7 @@ from tests.basesite.utils import create_test_data, get_logged_user
 
 class TestQuestionViewSet(APITestCase):
     def setUp(self) -> None:
+        cache.clear()  # cached responses of other tests
         get_logged_user(self.client)
 
     def test_invalid_url(self):
@@ -52,7 +54,7 @@ class TestQuestionViewSet(APITestCase):
     def test_fields_expected(self):
         url = reverse('api-question-list')
         response = self.client.get(url)
-        fields_expected = ['count', 'next', 'previous', 'results', 'page_count']
+        fields_expected = ['count', 'count_exact', 'next', 'previous', 'results', 'page_count']
         self.assertEqual(set(fields_expected), set(response.data.keys()))
 
     def test_return_model_fields_expected(self):
@@ -60,7 +62,7 @@ class TestQuestionViewSet(APITestCase):
         url = reverse('api-question-list')
         response = self.client.get(url)
         fields_expected = ['author', 'title', 'message', 'date_created', 'votes', 'url', 'has_tags', 'tags_url',
-                           'has_answers', 'answers_url']
+                           'has_answers', 'answers_url', 'has_accepted_answer']
         self.assertEqual(set(fields_expected), set(response.data['results'][0].keys()))
 
     def test_return_questions_in_one_page(self):
@@ -123,3 +125,16 @@ class TestQuestionViewSet(APITestCase):
         response = self.client.get(url)
         self.assertEqual(0, len(response.data['results']))
         self.assertEqual(0, response.data['count'])
+
+    def test_filter_accepted(self):
+        ids = create_test_data()  # an answer of q2 is accepted
+        url = reverse('api-question-list')
+        response = self.client.get(url, {'accepted': 'true'})
+        self.assertEqual(['Q2 title'], [question['title'] for question in response.data['results']])
+        self.assertTrue(response.data['results'][0]['has_accepted_answer'])
+        response = self.client.get(url, {'accepted': 'false'})
+        self.assertCountEqual(['Q title', 'Q3 title'], [question['title'] for question in response.data['results']])
+        self.assertEqual(2, response.data['count'])
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, self.client.get(url, {'accepted': 'yes'}).status_code)
+        response = self.client.get(reverse('api-answer-list', args=[ids['q2']]))
+        self.assertEqual({ids['a2_3']}, {answer['id'] for answer in response.data['results'] if answer['correct']})
@@ -0,0 +1,104 @@
+import gzip
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from basesite.generations import get_generations, question_scope, ANSWERS, QUESTIONS
+from basesite.models import Question, Answer, Tag
+from hasker_api.cache import response_cache_stats
+from tests.basesite.utils import create_test_data, get_logged_user
+
+
+class TestResponseCache(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        get_logged_user(self.client)
+        self.ids = create_test_data()
+        self.author = User.objects.get(pk=self.ids['u'])
+
+    def test_hit(self):
+        url = reverse('api-question-list')
+        response = self.client.get(url, {'ordering': '-votes', 'page': 1})
+        hits = response_cache_stats.hits
+        with self.assertNumQueries(2):  # session, user
+            cached = self.client.get(url, {'page': 1, 'ordering': '-votes'})  # same parameters in another order
+        self.assertEqual(hits + 1, response_cache_stats.hits)
+        self.assertEqual(response.content, cached.content)
+        self.assertEqual(response['Content-Type'], cached['Content-Type'])
+        self.assertEqual(response['ETag'], cached['ETag'])
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED,
+                         self.client.get(url, {'ordering': '-votes', 'page': 1},
+                                         HTTP_IF_NONE_MATCH=cached['ETag']).status_code)
+        self.assertEqual(hits + 1, response_cache_stats.hits)
+        self.assertNotEqual(response.content, self.client.get(url, {'ordering': 'votes'}).content)
+
+    def test_precompressed(self):
+        url = reverse('api-question-detail', args=(self.ids['q1'],))
+        response = self.client.get(url)
+        cached = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual('gzip', cached['Content-Encoding'])
+        self.assertIn('Accept-Encoding', cached['Vary'])
+        self.assertEqual(response.content, gzip.decompress(cached.content))
+
+    def test_writes_change_responses(self):
+        url = reverse('api-question-list')
+        self.client.get(url)
+
+        def rename_tag():
+            tag = Tag.objects.get(pk=self.ids['t1'])
+            tag.tag = 'renamed'
+            tag.save()
+
+        for change in (lambda: Question.apply_vote(self.ids['q1'], self.author, 1),
+                       lambda: Answer.objects.create(author=self.author, question_id=self.ids['q3'], message='A',
+                                                     correct=False),
+                       lambda: Question.objects.get(pk=self.ids['q3']).tags.add(self.ids['t1']),
+                       rename_tag):
+            with self.captureOnCommitCallbacks(execute=True):  # generations are bumped once writes commit
+                change()
+            misses = response_cache_stats.misses
+            self.client.get(url)
+            self.assertEqual(misses + 1, response_cache_stats.misses)
+        self.assertEqual([1, 2, 4], [q['votes'] for q in json.loads(self.client.get(url).content)['results']])
+
+    def test_generations_bumped_after_commit(self):
+        scopes = (ANSWERS, QUESTIONS, question_scope(self.ids['q3']))
+        before = get_generations(*scopes)
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                Answer.objects.create(author=self.author, question_id=self.ids['q3'], message='A', correct=False)
+                self.assertEqual(before, get_generations(*scopes))
+            self.assertEqual(before, get_generations(*scopes))  # a reader before the commit keeps the old ones
+        for callback in callbacks:  # the commit
+            callback()
+        self.assertTrue(all(new != old for new, old in zip(get_generations(*scopes), before)))
+
+    def test_question_scope(self):
+        detail_url = reverse('api-question-detail', args=(self.ids['q2'],))
+        self.client.get(detail_url)
+        Question.apply_vote(self.ids['q1'], self.author, 1)  # another question
+        hits = response_cache_stats.hits
+        self.client.get(detail_url)
+        self.assertEqual(hits + 1, response_cache_stats.hits)
+        Question.apply_vote(self.ids['q2'], self.author, 1)
+        self.assertEqual(3, json.loads(self.client.get(detail_url).content)['votes'])
+
+    def test_browsable_api_not_cached(self):
+        url = reverse('api-question-list')
+        misses, hits = response_cache_stats.misses, response_cache_stats.hits
+        for _ in range(2):
+            self.client.get(url, HTTP_ACCEPT='text/html')
+        self.assertEqual((misses, hits), (response_cache_stats.misses, response_cache_stats.hits))
+
+    def test_stats(self):
+        url = reverse('api-response-cache-stats')
+        self.assertEqual(status.HTTP_403_FORBIDDEN, self.client.get(url).status_code)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@test.com', 'QWEr4$31'))
+        response = self.client.get(url)
+        self.assertEqual({'hits', 'misses', 'hit_ratio', 'stored', 'stored_bytes', 'rendered_bytes'},
+                         set(response.data.keys()))
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from basesite.export import export_ndjson, export_records, parse_since
+from basesite.models import Question, Answer
+from tests.basesite.utils import create_test_data, get_logged_user
+
+
+def parse_lines(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+class ExportTest(TestCase):
+    def setUp(self) -> None:
+        self.ids = create_test_data()
+        self.user = User.objects.get(pk=self.ids['u'])
+        Question.apply_vote(self.ids['q1'], self.user, 1)
+        Answer.apply_vote(self.ids['a2_1'], self.user, -1)
+
+    def test_records(self):
+        records = list(export_records())
+        self.assertEqual(['tag'] * 2 + ['question'] * 3 + ['answer'] * 4 + ['question_votes', 'answer_votes', 'end'],
+                         [record['type'] for record in records])
+        question = records[2]
+        self.assertEqual((self.ids['q1'], 'testuser1', 4), (question['id'], question['author_name'], question['votes']))
+        self.assertEqual([{'tag': 'tag1', 'slug': 'tag1'}, {'tag': 'Tag 2', 'slug': 'tag-2'}], question['tags_cache'])
+        self.assertEqual('testuser1', records[5]['author_name'])
+        self.assertEqual({'type': 'question_votes', 'id': self.ids['q1'], 'up': 1, 'down': 0}, records[-3])
+        self.assertEqual({'type': 'answer_votes', 'id': self.ids['a2_1'], 'up': 0, 'down': 1}, records[-2])
+        self.assertEqual({'tag': 2, 'question': 3, 'answer': 4, 'question_votes': 1, 'answer_votes': 1},
+                         records[-1]['counts'])
+
+    def test_incremental(self):
+        end = list(export_records())[-1]
+        Answer.objects.create(author=self.user, question_id=self.ids['q3'], message='New answer', correct=False)
+        records = list(export_records(since=end['cursor']))
+        self.assertEqual(['tag', 'tag', 'question', 'answer', 'end'], [record['type'] for record in records])
+        self.assertEqual(self.ids['q3'], records[2]['id'])  # its answer count changed
+        self.assertEqual('New answer', records[3]['message'])
+        cursor = parse_lines(b''.join(export_ndjson()))[-1]['cursor']  # as a client reads it
+        self.assertEqual(['tag', 'tag', 'end'], [record['type'] for record in export_records(parse_since(cursor))])
+
+    def test_ndjson_chunks(self):
+        chunks = list(export_ndjson(chunk_size=2))
+        self.assertEqual(6, len(chunks))  # 12 records, 2 a piece
+        self.assertEqual(12, len(parse_lines(b''.join(chunks))))
+        compressed = b''.join(export_ndjson(chunk_size=2, compress=True))
+        self.assertEqual(parse_lines(b''.join(chunks))[:-1], parse_lines(gzip.decompress(compressed))[:-1])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('export_corpus', stdout=out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(12, len(lines))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson.gz')
+            call_command('export_corpus', output=path, since=lines[-1]['cursor'])
+            with gzip.open(path) as f:
+                self.assertEqual(['tag', 'tag', 'end'], [record['type'] for record in parse_lines(f.read())])
+        with self.assertRaises(CommandError):
+            call_command('export_corpus', since='yesterday', stdout=StringIO())
+
+    def test_api(self):
+        url = reverse('api-export')
+        get_logged_user(self.client)
+        self.assertEqual(403, self.client.get(url).status_code)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@test.com', 'QWEr4$31'))
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+        records = parse_lines(b''.join(response.streaming_content))
+        self.assertEqual(12, len(records))
+        since = timezone.now().isoformat()
+        response = self.client.get(url, {'since': since, 'compress': 'gzip'})
+        records = parse_lines(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(['tag', 'tag', 'end'], [record['type'] for record in records])
+        self.assertEqual(400, self.client.get(url, {'since': 'garbage'}).status_code)
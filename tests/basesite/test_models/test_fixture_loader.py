@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from basesite.fixture_loader import DEFAULT_FIXTURES, load_fixtures
+from basesite.models import Question, Answer, Tag, UserProfile, AnswerNotification, Counter
+
+
+def fixture_rows(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class FixtureLoaderTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for path in DEFAULT_FIXTURES:
+            self.paths.append(os.path.join(self.directory, os.path.basename(path)))
+            shutil.copy(path, self.paths[-1])
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_load(self):
+        loaded = load_fixtures(self.paths)
+        self.assertEqual([len(fixture_rows(path)) for path in self.paths], list(loaded.values()))
+        for model, path in zip((User, UserProfile, Tag, Question, Answer), self.paths):
+            self.assertEqual(len(fixture_rows(path)), model.objects.count())
+        question = fixture_rows(self.paths[3])[0]
+        self.assertEqual(question['fields']['tags'],
+                         list(Question.objects.get(pk=question['pk']).tags.values_list('id', flat=True)))
+        self.assertEqual(0, AnswerNotification.objects.count())  # no signals: nobody is notified of fixture answers
+
+    def test_unchanged_fixtures_are_skipped(self):
+        load_fixtures(self.paths)
+        with self.assertNumQueries(1):  # checksums of the loaded fixtures
+            self.assertEqual({}, load_fixtures(self.paths))
+        self.assertEqual(len(self.paths), len(load_fixtures(self.paths, force=True)))
+
+    def test_changed_fixture_is_upserted(self):
+        load_fixtures(self.paths)
+        rows = fixture_rows(self.paths[2])
+        rows[0]['fields']['tag'] = 'Renamed tag'
+        with open(self.paths[2], 'w') as f:
+            json.dump(rows, f)
+        loaded = load_fixtures(self.paths)
+        self.assertEqual(len(self.paths), len(loaded))
+        self.assertEqual('Renamed tag', Tag.objects.get(pk=rows[0]['pk']).tag)
+        self.assertEqual(len(rows), Tag.objects.count())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('load_fixtures', *self.paths, stdout=out)
+        self.assertIn('Indexed', out.getvalue())  # followed by the maintenance commands
+        self.assertEqual(Question.objects.count(), Counter.get_value(Counter.QUESTIONS))
+        answered = Question.objects.filter(answer_count__gt=0).count()
+        self.assertEqual(Question.objects.filter(answers__isnull=False).distinct().count(), answered)
+        out = StringIO()
+        call_command('load_fixtures', *self.paths, stdout=out)
+        self.assertIn('nothing to do', out.getvalue())
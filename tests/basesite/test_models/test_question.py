@@ -0,0 +1,137 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+
+from basesite.models import Question, Answer, Tag, Counter
+from tests.basesite.utils import create_test_data
+
+
+class TestQuestionDenormalizedFields(TestCase):
+    def setUp(self) -> None:
+        self.ids = create_test_data()
+
+    def test_answer_count(self):
+        self.assertEqual(1, Question.objects.get(pk=self.ids['q1']).answer_count)
+        self.assertEqual(3, Question.objects.get(pk=self.ids['q2']).answer_count)
+        self.assertEqual(0, Question.objects.get(pk=self.ids['q3']).answer_count)
+        Answer.objects.get(pk=self.ids['a2_1']).delete()
+        self.assertEqual(2, Question.objects.get(pk=self.ids['q2']).answer_count)
+        answer = Answer.objects.get(pk=self.ids['a2_2'])
+        answer.votes = 10
+        answer.save()  # updating an answer does not count it once again
+        self.assertEqual(2, Question.objects.get(pk=self.ids['q2']).answer_count)
+
+    def test_tags_cache(self):
+        q1 = Question.objects.get(pk=self.ids['q1'])
+        self.assertEqual([{'tag': 'tag1', 'slug': 'tag1'}, {'tag': 'Tag 2', 'slug': 'tag-2'}], q1.tags_cache)
+        self.assertTrue(q1.has_tags)
+        q1.tags.remove(self.ids['t1'])
+        self.assertEqual([{'tag': 'Tag 2', 'slug': 'tag-2'}], Question.objects.get(pk=self.ids['q1']).tags_cache)
+        t2 = Tag.objects.get(pk=self.ids['t2'])
+        t2.tag = 'Renamed'
+        t2.save()
+        self.assertEqual([{'tag': 'Renamed', 'slug': 'renamed'}], Question.objects.get(pk=self.ids['q1']).tags_cache)
+        t2.question_set.add(self.ids['q3'])
+        self.assertEqual(1, len(Question.objects.get(pk=self.ids['q3']).tags_cache))
+        t2.delete()
+        self.assertEqual([], Question.objects.get(pk=self.ids['q1']).tags_cache)
+        self.assertEqual([], Question.objects.get(pk=self.ids['q3']).tags_cache)
+
+    def test_author_name(self):
+        self.assertEqual('testuser1', Question.objects.get(pk=self.ids['q1']).author_name)
+        u = User.objects.get(pk=self.ids['u'])
+        u.username = 'renamed_user'
+        u.save()
+        self.assertEqual('renamed_user', Question.objects.get(pk=self.ids['q1']).author_name)
+
+    def test_list_counters(self):
+        self.assertEqual(3, Counter.get_value(Counter.QUESTIONS))
+        self.assertEqual(1, Tag.objects.get(pk=self.ids['t1']).question_count)
+        q3 = Question.objects.get(pk=self.ids['q3'])
+        q3.tags.add(self.ids['t1'], self.ids['t2'])
+        q3.tags.remove(self.ids['t2'], self.ids['t2'])
+        self.assertEqual(2, Tag.objects.get(pk=self.ids['t1']).question_count)
+        self.assertEqual(1, Tag.objects.get(pk=self.ids['t2']).question_count)
+        Tag.objects.get(pk=self.ids['t2']).question_set.add(self.ids['q2'], self.ids['q3'])
+        self.assertEqual(3, Tag.objects.get(pk=self.ids['t2']).question_count)
+        q3.tags.clear()
+        self.assertEqual(1, Tag.objects.get(pk=self.ids['t1']).question_count)
+        Question.objects.get(pk=self.ids['q1']).delete()
+        self.assertEqual(2, Counter.get_value(Counter.QUESTIONS))
+        self.assertEqual(0, Tag.objects.get(pk=self.ids['t1']).question_count)
+        self.assertEqual(1, Tag.objects.get(pk=self.ids['t2']).question_count)
+
+    def test_backfill_command(self):
+        Counter.objects.update(value=0)
+        Tag.objects.update(question_count=0)
+        Question.objects.update(answer_count=0, tags_cache=[], author_name='')
+        call_command('backfill_question_counters', stdout=StringIO())
+        q1 = Question.objects.get(pk=self.ids['q1'])
+        self.assertEqual(1, q1.answer_count)
+        self.assertEqual({'tag1', 'tag-2'}, {t['slug'] for t in q1.tags_cache})
+        self.assertEqual('testuser1', q1.author_name)
+        self.assertEqual(3, Question.objects.get(pk=self.ids['q2']).answer_count)
+        self.assertEqual(3, Counter.get_value(Counter.QUESTIONS))
+        self.assertEqual(1, Tag.objects.get(pk=self.ids['t1']).question_count)
+
+    def test_backfill_command_keeps_unchanged_questions(self):
+        Question.objects.filter(pk=self.ids['q2']).update(answer_count=0)
+        before = dict(Question.objects.values_list('id', 'updated_at'))
+        out = StringIO()
+        call_command('backfill_question_counters', stdout=out)
+        after = dict(Question.objects.values_list('id', 'updated_at'))
+        self.assertEqual(3, Question.objects.get(pk=self.ids['q2']).answer_count)
+        self.assertGreater(after.pop(self.ids['q2']), before.pop(self.ids['q2']))
+        self.assertEqual(before, after)
+        self.assertIn('Updated 1 questions', out.getvalue())
+
+    def test_list_queries_do_not_depend_on_rows(self):
+        with self.assertNumQueries(3):  # question counter, page, trending
+            self.client.get(reverse('list'))
+        u = User.objects.get(pk=self.ids['u'])
+        with self.captureOnCommitCallbacks(execute=True):  # cached pages and trending see writes once committed
+            for i in range(10):
+                q = Question.objects.create(author=u, title=f'Extra Q {i}', message='Extra content')
+                q.tags.set([self.ids['t1']])
+                Answer.objects.create(author=u, question=q, message='Extra answer', correct=False)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('list'))
+
+
+class TestQuestionHotScore(TestCase):
+    def setUp(self) -> None:
+        self.ids = create_test_data()
+        self.voter = User.objects.create_user(username='hot_voter', password='voterpass')
+
+    def expected_score(self, question_id):
+        q = Question.objects.get(pk=question_id)
+        return Question.compute_hot_score(q.date_created, q.votes, q.answer_count)
+
+    def test_maintained_incrementally(self):
+        for key in ('q1', 'q2', 'q3'):
+            self.assertEqual(self.expected_score(self.ids[key]), Question.objects.get(pk=self.ids[key]).hot_score)
+        Question.apply_vote(self.ids['q3'], self.voter, 1)
+        Answer.objects.create(author=self.voter, question_id=self.ids['q3'], message='New answer', correct=False)
+        Answer.objects.get(pk=self.ids['a2_1']).delete()
+        for key in ('q2', 'q3'):
+            self.assertEqual(self.expected_score(self.ids[key]), Question.objects.get(pk=self.ids[key]).hot_score)
+
+    def test_update_hot_scores_command(self):
+        Question.objects.filter(pk=self.ids['q1']).update(votes=10)  # bypasses incremental update
+        out = StringIO()
+        call_command('update_hot_scores', stdout=out)
+        self.assertIn('Updated hot score of 1 questions', out.getvalue())
+        self.assertEqual(self.expected_score(self.ids['q1']), Question.objects.get(pk=self.ids['q1']).hot_score)
+
+    def test_ordering_hot(self):
+        Question.objects.filter(pk=self.ids['q3']).update(hot_score=F('hot_score') + 100000)
+        response = self.client.get(reverse('list') + '?ordering=hot')
+        self.assertEqual('hot', response.context_data['ordering'])
+        self.assertEqual(self.ids['q3'], response.context_data['object_list'][0].id)
+        self.client.force_login(self.voter)
+        response = self.client.get(reverse('api-question-list') + '?ordering=hot')
+        self.assertEqual('Q3 title', response.data['results'][0]['title'])
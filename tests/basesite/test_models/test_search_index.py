@@ -0,0 +1,65 @@
+from io import StringIO
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from basesite.models import Question, Answer
+from basesite.search import search_questions, SEARCH_TABLE
+from tests.basesite.utils import create_test_data
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self) -> None:
+        self.ids = create_test_data()
+        self.u = User.objects.get(pk=self.ids['u'])
+
+    def search(self, query):
+        return list(search_questions(Question.objects.all(), query).order_by('-search_rank', '-id')
+                    .values_list('id', flat=True))
+
+    def test_found_in_title_message_and_answers(self):
+        self.assertEqual([self.ids['q3']], self.search('Q3'))
+        self.assertEqual([self.ids['q2']], self.search('number 2'))  # only answer text contains it
+        self.assertEqual([], self.search('NotExisting Q2'))
+
+    def test_relevance(self):
+        in_answer = Question.objects.create(author=self.u, title='Plain title', message='Plain message')
+        Answer.objects.create(author=self.u, question=in_answer, message='about pineapple', correct=False)
+        in_title = Question.objects.create(author=self.u, title='Pineapple question', message='Plain message')
+        self.assertEqual([in_title.id, in_answer.id], self.search('pineapple'))
+
+    def test_incremental_updates(self):
+        answer = Answer.objects.create(author=self.u, question_id=self.ids['q3'], message='Mentions kiwi',
+                                       correct=False)
+        self.assertEqual([self.ids['q3']], self.search('kiwi'))
+        answer.delete()
+        self.assertEqual([], self.search('kiwi'))
+        q1 = Question.objects.get(pk=self.ids['q1'])
+        q1.title = 'Mango title'
+        q1.save()
+        self.assertEqual([self.ids['q1']], self.search('mango'))
+        q1.delete()
+        self.assertEqual([], self.search('mango'))
+
+    def test_prefix_and_unsafe_input(self):
+        self.assertEqual([self.ids['q2']], self.search('Q2 tit'))
+        self.assertEqual([self.ids['q2']], self.search('"Q2" * ( title: -'))
+        self.assertEqual(3, len(self.search('  ')))  # no words: no filtering
+
+    def test_rebuild_command(self):
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        self.assertEqual([], self.search('Q3'))
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual([self.ids['q3']], self.search('Q3'))
+
+    def test_search_page_relevance_order(self):
+        q = Question.objects.create(author=self.u, title='Content about content', message='content')
+        response = self.client.get(f"{reverse('search')}?{urlencode({'q': 'content'})}")
+        self.assertEqual(q.id, response.context['page_obj'][0].id)
+        self.assertEqual(4, len(response.context['page_obj']))
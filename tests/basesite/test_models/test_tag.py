@@ -21,4 +21,23 @@ class TestTag(TestCase):
             t3 = Tag(tag='foo')  # tag should be unique
             t3.save()
 
+    def test_slug_counter(self):
+        for tag in ('foo', 'fooш', 'fooщ', 'foo2'):
+            Tag.objects.create(tag=tag)  # foo, foo1, foo2, foo21
+        Tag.objects.get(tag='fooш').delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(['foo1', 'foo3', 'bar', 'foo22'], Tag.free_slugs(['fooы', 'fooъ', 'bar', 'foo2']))
+        t = Tag.objects.get(tag='foo')
+        t.save()
+        self.assertEqual('foo', t.slug)  # not a collision with itself
+
+    def test_get_or_create_many(self):
+        existing = Tag.objects.create(tag='foo')
+        with self.assertNumQueries(5):  # lookup, slugs, insert in a savepoint
+            tags = Tag.get_or_create_many(['fooш', 'foo', 'bar', 'fooш'])
+        self.assertEqual(['fooш', 'foo', 'bar'], [t.tag for t in tags])
+        self.assertEqual(['foo1', 'foo', 'bar'], [t.slug for t in tags])
+        self.assertEqual(existing.pk, tags[1].pk)
+        self.assertEqual(3, Tag.objects.count())
+
 #TODO: more tests next week
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+
+from basesite.models import Question, Answer
+from basesite.trending import get_trending_questions, TRENDING_CACHE_KEY
+from tests.basesite.utils import create_test_data, create_bulk_test_data
+
+
+class TrendingCacheTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ids = create_test_data()
+        self.voter = User.objects.create_user(username='trending_voter', password='voterpass')
+
+    def vote(self, question_id, increment=1):
+        self.client.force_login(self.voter)
+        self.client.post(reverse('vote', args=[question_id]),
+                         {'instance_type': 'q', 'instance_id': question_id, 'increment': increment})
+        self.client.logout()
+
+    def test_shared_by_pages(self):
+        self.client.get(reverse('list'))
+        self.assertIsNotNone(cache.get(TRENDING_CACHE_KEY))
+        ranked = [q.title for q in Question.trending.all()]
+        with self.assertNumQueries(2):  # count, page: trending is served from the cache (the page is another one)
+            self.client.get(reverse('list'), {'ordering': '-votes'})
+        with self.assertNumQueries(1):  # only LoginView's current site lookup
+            self.client.get(reverse('login'))
+        self.client.force_login(self.voter)
+        with self.assertNumQueries(2):  # session, user
+            response = self.client.get(reverse('api-question-trending-list'))
+        self.assertEqual(ranked, [q['title'] for q in response.data])
+        self.assertEqual('Q3 title', ranked[-1])  # fewest votes and no answers
+
+    def test_not_computed_when_not_rendered(self):
+        self.client.get(f"{reverse('search')}?q=tag:tag1")  # redirect
+        self.assertIsNone(cache.get(TRENDING_CACHE_KEY))
+
+    def test_vote_inside_list_refreshes(self):
+        get_trending_questions()
+        self.vote(self.ids['q3'], 1)
+        self.vote(self.ids['q3'], 1)  # already voted, not counted
+        self.assertEqual(2, get_trending_questions()[-1].votes)
+        self.vote(self.ids['q1'], -1)
+        self.vote(self.ids['q1'], -1)
+        self.assertEqual([2, 2, 2], [q.votes for q in get_trending_questions()])
+
+    def test_boundary(self):
+        create_bulk_test_data(Question.trending.size)  # votes from 0 to 6
+        trending = get_trending_questions()
+        self.assertEqual(Question.trending.size, len(trending))
+        outsider = Question.objects.filter(votes=0).exclude(id__in=[q.id for q in trending]).first()
+        self.vote(outsider.id, -1)  # a downvote cannot bring the question in
+        self.assertIsNotNone(cache.get(TRENDING_CACHE_KEY))
+        self.vote(outsider.id, 1)  # back to 0 votes, still below the boundary
+        self.assertIsNotNone(cache.get(TRENDING_CACHE_KEY))
+        Question.objects.filter(pk=outsider.id).update(votes=trending[-1].votes, hot_score=trending[-1].hot_score)
+        self.vote(outsider.id, 1)
+        self.assertIsNone(cache.get(TRENDING_CACHE_KEY))
+        self.assertIn(outsider.id, [q.id for q in get_trending_questions()])
+
+    def test_ranked_by_hot_score(self):
+        get_trending_questions()
+        Question.objects.filter(pk=self.ids['q3']).update(hot_score=F('hot_score') + 20000)  # asked much later
+        Question.objects.filter(pk=self.ids['q2']).update(hot_score=F('hot_score') + 10000)
+        cache.clear()
+        self.assertEqual([self.ids['q3'], self.ids['q2'], self.ids['q1']], [q.id for q in get_trending_questions()])
+
+    def test_answers_move_questions(self):
+        Question.objects.filter(pk=self.ids['q3']).update(hot_score=F('hot_score') + 20000)
+        Question.objects.filter(pk=self.ids['q1']).update(hot_score=F('hot_score') + 10000)
+        self.assertEqual([self.ids['q3'], self.ids['q1'], self.ids['q2']], [q.id for q in get_trending_questions()])
+        author = User.objects.get(pk=self.ids['u'])
+        with self.captureOnCommitCallbacks(execute=True):  # checked once answers commit
+            Answer.objects.create(author=author, question_id=self.ids['q3'], message='Answer to Q3', correct=False)
+            for i in range(5):  # 5 * HOT_SCORE_ANSWER_SECONDS, still below q1
+                Answer.objects.create(author=author, question_id=self.ids['q2'], message=f'Answer {i}', correct=False)
+        self.assertIsNotNone(cache.get(TRENDING_CACHE_KEY))  # ranked higher, in the same order
+        with self.captureOnCommitCallbacks() as callbacks:
+            Answer.objects.create(author=author, question_id=self.ids['q2'], message='Answer 5', correct=False)
+        self.assertIsNotNone(cache.get(TRENDING_CACHE_KEY))  # not before the commit
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(TRENDING_CACHE_KEY))
+        self.assertEqual([self.ids['q3'], self.ids['q2'], self.ids['q1']], [q.id for q in get_trending_questions()])
+        with self.captureOnCommitCallbacks(execute=True):
+            Answer.objects.filter(question_id=self.ids['q2'], message__startswith='Answer ').delete()
+        self.assertEqual([self.ids['q3'], self.ids['q1'], self.ids['q2']], [q.id for q in get_trending_questions()])
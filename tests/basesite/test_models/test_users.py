@@ -1,13 +1,25 @@
+import shutil
+import tempfile
+
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files import File
 from django.db import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from basesite.models import UserProfile
 from hasker.settings.base import MEDIA_URL
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(prefix='hasker-test-media-'))
 class TestUser(TestCase):
+    """Uploaded avatars go to a temporary MEDIA_ROOT, not to files_media of the source tree"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def test_email_unique(self):
         User.objects.create(email='test@df.com')
         with self.assertRaises(IntegrityError):
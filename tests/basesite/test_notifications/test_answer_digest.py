@@ -0,0 +1,76 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from basesite.models import Answer, AnswerNotification, Question
+from basesite.notifications import send_answer_digests
+from tests.basesite.utils import create_test_data
+
+
+class AnswerDigestTest(TestCase):
+    def setUp(self) -> None:
+        self.ids = create_test_data()
+        self.later = timezone.now() + timedelta(hours=1)
+
+    def test_queued_on_answer_creation_only(self):
+        self.assertEqual(4, AnswerNotification.objects.count())
+        self.assertEqual(0, len(mail.outbox))  # nothing is sent while answering
+        answer = Answer.objects.get(pk=self.ids['a1'])
+        answer.message = 'Updated answer'
+        answer.save()
+        self.assertEqual(4, AnswerNotification.objects.count())
+
+    def test_vote_does_not_notify(self):
+        voter = User.objects.create_user(username='voter', password='voterpass')
+        self.client.force_login(voter)
+        self.client.post(reverse('vote', args=[self.ids['q1']]),
+                         {'instance_type': 'a', 'instance_id': self.ids['a1'], 'increment': 1})
+        self.assertEqual(4, AnswerNotification.objects.count())
+        self.assertEqual(0, len(mail.outbox))
+
+    def test_window_not_passed(self):
+        self.assertEqual(0, send_answer_digests(window=60))
+        self.assertEqual(4, AnswerNotification.objects.count())
+
+    def test_one_digest_per_author(self):
+        other = User.objects.create_user(username='other', email='other@test.com')
+        q = Question.objects.create(author=other, title='Other Q title', message='Other Q content')
+        Answer.objects.create(author=other, question=q, message='Answer to other Q', correct=False)
+        self.assertEqual(2, send_answer_digests(window=60, now=self.later))
+        self.assertEqual(2, len(mail.outbox))
+        digest = next(m for m in mail.outbox if m.to == ['testuser1@test.com'])
+        self.assertEqual('4 new answers to your questions', digest.subject)
+        self.assertIn('Q2 title', digest.body)
+        self.assertIn('3 new answers', digest.body)
+        single = next(m for m in mail.outbox if m.to == ['other@test.com'])
+        self.assertEqual('New answer: Other Q title', single.subject)
+        self.assertEqual(0, AnswerNotification.objects.count())
+        self.assertEqual(0, send_answer_digests(window=60, now=self.later))  # nothing sent twice
+
+    def test_failed_email_does_not_resend_earlier_digests(self):
+        other = User.objects.create_user(username='other', email='other@test.com')
+        q = Question.objects.create(author=other, title='Other Q title', message='Other Q content')
+        Answer.objects.create(author=other, question=q, message='Answer to other Q', correct=False)
+        backend = mail.get_connection()
+        send_messages = type(backend).send_messages
+        calls = []
+
+        def fail_second(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise ConnectionError('SMTP server went away')
+            return send_messages(connection, messages)
+
+        with mock.patch.object(type(backend), 'send_messages', fail_second):
+            with self.assertRaises(ConnectionError):
+                send_answer_digests(window=60, now=self.later)
+        self.assertEqual(1, len(mail.outbox))
+        failed_author = calls[1][0].to
+        self.assertEqual(1, send_answer_digests(window=60, now=self.later))  # only the failed digest again
+        self.assertEqual(failed_author, mail.outbox[-1].to)
+        self.assertEqual(0, AnswerNotification.objects.count())
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from basesite.models import Question, Answer
+from basesite.metrics import render_metrics
+from basesite.trending import get_trending_questions
+from tests.basesite.utils import create_test_data, get_logged_user
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ids = create_test_data()
+
+    def test_requests(self):
+        requests = sample('hasker_requests_total', view='question-detail', method='GET', status='200')
+        observed = sample('hasker_request_duration_seconds_count', view='question-detail')
+        self.client.get(reverse('question-detail', args=[self.ids['q1']]))
+        self.client.get(reverse('question-detail', args=[self.ids['q1']]))
+        self.assertEqual(requests + 2, sample('hasker_requests_total', view='question-detail', method='GET',
+                                              status='200'))
+        self.assertEqual(observed + 2, sample('hasker_request_duration_seconds_count', view='question-detail'))
+        self.assertGreater(sample('hasker_request_db_queries_sum', view='question-detail'), 0)
+        unmatched = sample('hasker_requests_total', view='unmatched', method='GET', status='404')
+        self.client.get('/no-such-page')
+        self.assertEqual(unmatched + 1, sample('hasker_requests_total', view='unmatched', method='GET', status='404'))
+
+    def test_writes_and_caches(self):
+        user = User.objects.get(pk=self.ids['u'])
+        votes = sample('hasker_votes_total', target='question', direction='up')
+        answers = sample('hasker_writes_total', model='answer')
+        Question.apply_vote(self.ids['q1'], user, 1)
+        Question.apply_vote(self.ids['q1'], user, 1)  # not counted twice
+        Answer.objects.create(author=user, question_id=self.ids['q3'], message='New answer', correct=False)
+        self.assertEqual(votes + 1, sample('hasker_votes_total', target='question', direction='up'))
+        self.assertEqual(answers + 1, sample('hasker_writes_total', model='answer'))
+        misses = sample('hasker_cache_lookups_total', cache='trending', result='miss')
+        hits = sample('hasker_cache_lookups_total', cache='trending', result='hit')
+        get_trending_questions()
+        get_trending_questions()
+        self.assertEqual((misses + 1, hits + 1), (sample('hasker_cache_lookups_total', cache='trending', result='miss'),
+                                                  sample('hasker_cache_lookups_total', cache='trending', result='hit')))
+
+    def test_access(self):
+        url = reverse('metrics')
+        response = self.client.get(url)  # from 127.0.0.1
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'hasker_requests_total', response.content)
+        self.assertEqual(404, self.client.get(url, REMOTE_ADDR='203.0.113.5').status_code)
+        get_logged_user(self.client)
+        self.assertEqual(404, self.client.get(url, REMOTE_ADDR='203.0.113.5').status_code)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@test.com', 'QWEr4$31'))
+        self.assertEqual(200, self.client.get(url, REMOTE_ADDR='203.0.113.5').status_code)
+
+    def test_access_behind_a_proxy(self):
+        url = reverse('metrics')
+        self.assertEqual(404, self.client.get(url, REMOTE_ADDR='172.18.0.5').status_code)  # nginx container
+        self.assertEqual(404, self.client.get(url, REMOTE_ADDR='172.18.0.5',
+                                              HTTP_AUTHORIZATION='Bearer ').status_code)  # no token set
+        with override_settings(METRICS_TOKEN='scraper-secret'):
+            self.assertEqual(200, self.client.get(url, REMOTE_ADDR='172.18.0.5',
+                                                  HTTP_AUTHORIZATION='Bearer scraper-secret').status_code)
+            self.assertEqual(404, self.client.get(url, REMOTE_ADDR='172.18.0.5',
+                                                  HTTP_AUTHORIZATION='Bearer wrong').status_code)
+
+    def test_workers_are_aggregated(self):
+        script = ('import django; django.setup(); from basesite.metrics import WRITES; '
+                  'WRITES.labels("answer").inc(3)')
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory,
+                   'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+            for _ in range(2):  # two worker processes
+                subprocess.run([sys.executable, '-c', script], env=env, cwd=settings.BASE_DIR, check=True)
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                body, _ = render_metrics()
+        self.assertIn(b'hasker_writes_total{model="answer"} 6.0', body)
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+import tempfile
+
+from django.core.cache import cache, caches, DEFAULT_CACHE_ALIAS
+from django.core.cache.backends import locmem
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from basesite.cache_backends import CountingCacheMixin
+from tests.basesite.utils import create_test_data, get_logged_user
+
+
+def parse_server_timing(header):
+    """{metric: {param: value}}"""
+    metrics = {}
+    for metric in re.split(r', (?=[\w-]+(?:;|$))', header):  # descriptions have commas too
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ids = create_test_data()
+
+    def test_server_timing(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('question-detail', args=[self.ids['q2']]))
+        metrics = parse_server_timing(response['Server-Timing'])
+        self.assertEqual({'db', 'tpl', 'cache', 'total'}, set(metrics))
+        self.assertEqual(f'"{len(context.captured_queries)} queries"', metrics['db']['desc'])
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        self.assertLessEqual(float(metrics['db']['dur']), float(metrics['total']['dur']))
+
+    def test_cache_hits_and_misses(self):
+        url = reverse('api-question-list')
+        get_logged_user(self.client)
+        first = parse_server_timing(self.client.get(url)['Server-Timing'])['cache']['desc']
+        second = parse_server_timing(self.client.get(url)['Server-Timing'])['cache']['desc']
+        hits, misses = map(int, re.findall(r'\d+', first))
+        self.assertGreater(misses, 0)  # the response was not cached yet
+        self.assertGreater(int(re.findall(r'\d+', second)[0]), hits)
+
+    def test_cache_backend_classes_are_not_patched(self):
+        self.client.get(reverse('list'))
+        self.assertEqual('django.core.cache.backends.locmem', locmem.LocMemCache.get.__module__)
+        self.assertEqual('django.core.cache.backends.base', locmem.LocMemCache.get_many.__module__)
+        self.assertIsInstance(caches[DEFAULT_CACHE_ALIAS], CountingCacheMixin)  # counted by the configured backend
+
+    def test_log_line(self):
+        with self.assertLogs('basesite.performance', 'INFO') as logs:
+            self.client.get(reverse('list'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(('GET', '/', 200), (record['method'], record['path'], record['status']))
+        self.assertEqual(record, logs.records[0].performance)
+        self.assertGreater(record['queries'], 0)
+
+    def test_slow_requests_are_profiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(PERFORMANCE_PROFILE_DIR=directory, PERFORMANCE_PROFILE_SAMPLE_RATE=1,
+                                   PERFORMANCE_SLOW_REQUEST_MS=0), self.assertLogs('basesite.performance', 'WARNING'):
+                self.client.get(reverse('question-detail', args=[self.ids['q1']]))
+            self.assertEqual(1, len(os.listdir(directory)))
+            self.assertRegex(os.listdir(directory)[0], r'-GET-question_\d+-\d+ms\.prof$')
+            with override_settings(PERFORMANCE_PROFILE_DIR=directory, PERFORMANCE_PROFILE_SAMPLE_RATE=1):
+                self.client.get(reverse('list'))  # fast enough
+            self.assertEqual(1, len(os.listdir(directory)))
@@ -0,0 +1,145 @@
+import os
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from basesite.models import Question, Answer
+from basesite.trending import get_trending_questions
+from tests.basesite.utils import create_bulk_test_data, measure_request
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Base class for endpoint budgets: every measurement is checked against a number of SQL queries and a (generous)
+    wall time budget. Set HASKER_BENCH_OUTPUT=<file> to get the measurements appended to a file.
+    """
+    rows_per_page = (1, 5, 20)
+    max_time = 1.0  # seconds, per request
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username='budget_user', password='QWEr4$31', email='budget@test.com')
+
+    def measure(self, name, url, budget, method='get', data=None):
+        stats = measure_request(self.client, url, method=method, data=data)
+        self.report(name, stats)
+        self.assertLess(stats['status_code'], 400, f"{name}: unexpected status code")
+        self.assertLessEqual(stats['queries'], budget, f"{name}: {stats['queries']} queries, budget is {budget}")
+        self.assertLessEqual(stats['total_time'], self.max_time, f"{name}: {stats['total_time']:.3f}s")
+        return stats
+
+    def measure_scaling(self, name, budget, seed, url):
+        """
+        Grow the dataset with `seed(rows)` for every page size, and check the query count stays within the budget
+        and does not depend on the number of rows rendered
+        """
+        queries = []
+        for rows in self.rows_per_page:
+            with self.captureOnCommitCallbacks(execute=True):  # committed, as cached pages see writes after commit
+                seed(rows)
+            stats = self.measure(f'{name}[rows={rows}]', url() if callable(url) else url, budget)
+            queries.append(stats['queries'])
+        self.assertEqual(1, len(set(queries)), f"{name}: number of queries scales with rows: {queries}")
+
+    def seed_questions(self, rows):
+        missing = rows - Question.objects.count()
+        if missing > 0:
+            create_bulk_test_data(missing)
+
+    def report(self, name, stats):
+        output = os.environ.get('HASKER_BENCH_OUTPUT')
+        if not output:
+            return
+        with open(output, 'a') as f:
+            f.write(f"{self.__class__.__name__}.{name}: queries={stats['queries']} db={stats['db_time'] * 1000:.2f}ms "
+                    f"render={stats['render_time'] * 1000:.2f}ms total={stats['total_time'] * 1000:.2f}ms\n")
+
+
+class HTMLViewsQueryBudgetTest(QueryBudgetTestCase):
+    def test_question_list(self):
+        self.measure_scaling('list', 3, self.seed_questions, reverse('list'))
+
+    def test_question_list_by_votes(self):
+        self.measure_scaling('list-votes', 3, self.seed_questions, reverse('list') + '?ordering=-votes')
+
+    def test_question_tag_list(self):
+        self.measure_scaling('tag-list', 3, self.seed_questions, reverse('tag-list', args=['bulktag0']))
+
+    def test_question_search(self):
+        self.measure_scaling('search', 3, self.seed_questions, f"{reverse('search')}?{urlencode({'q': 'Bulk'})}")
+
+    def test_question_detail(self):
+        question_id = create_bulk_test_data(1, answers_per_question=0)[0]
+        question = Question.objects.get(pk=question_id)
+
+        def seed_answers(rows):
+            for i in range(rows - question.answers.count()):
+                Answer.objects.create(author=question.author, question=question, message=f'Answer {i}', correct=False)
+
+        get_trending_questions()  # cached as on a running site, answers to its only question do not change it
+        self.measure_scaling('detail', 2, seed_answers, reverse('question-detail', args=[question_id]))
+
+    def test_vote(self):
+        question_id = create_bulk_test_data(1)[0]
+        answer_id = Answer.objects.filter(question_id=question_id).values_list('id', flat=True)[0]
+        self.client.force_login(self.user)
+        # question votes read the tags of the question, to invalidate its tag pages in the page cache
+        self.measure('vote-q', reverse('vote', args=[question_id]), 10, method='post',
+                     data={'instance_type': 'q', 'instance_id': question_id, 'increment': 1})
+        self.measure('vote-a', reverse('vote', args=[question_id]), 9, method='post',
+                     data={'instance_type': 'a', 'instance_id': answer_id, 'increment': -1})
+
+    def test_tag_typeahead(self):
+        self.seed_questions(5)
+        self.measure('tag-typeahead', f"{reverse('tag-typeahead')}?query=bulk", 1)
+
+
+class APIViewsQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_question_list(self):
+        self.measure_scaling('api-question-list', 4, self.seed_questions, reverse('api-question-list'))
+
+    def test_question_search(self):
+        self.measure_scaling('api-question-search', 4, self.seed_questions,
+                             f"{reverse('api-question-list')}?{urlencode({'search': 'Bulk'})}")
+
+    def test_question_list_include(self):
+        # session, user, counter, page with authors, answers with their authors, tags
+        self.measure_scaling('api-question-list-include', 6, self.seed_questions,
+                             f"{reverse('api-question-list')}?include=answers,tags,author")
+
+    def test_question_list_ids(self):
+        self.seed_questions(20)
+        ids = ','.join(str(pk) for pk in Question.objects.values_list('id', flat=True)[:10])
+        self.measure('api-question-list-ids', f"{reverse('api-question-list')}?{urlencode({'ids': ids})}", 4)
+
+    def test_trending_questions(self):
+        self.measure_scaling('api-trending', 3, self.seed_questions, reverse('api-question-trending-list'))
+
+    def test_question_retrieve(self):
+        question_id = create_bulk_test_data(1)[0]
+        self.measure('api-question-detail', reverse('api-question-detail', args=[question_id]), 3)
+        # one query per included relation, none for the question of each of them
+        self.measure('api-question-detail-include',
+                     f"{reverse('api-question-detail', args=[question_id])}?include=answers,tags,author", 5)
+
+    def test_answer_list(self):
+        question_id = create_bulk_test_data(1, answers_per_question=0)[0]
+        question = Question.objects.get(pk=question_id)
+
+        def seed_answers(rows):
+            for i in range(rows - question.answers.count()):
+                author = User.objects.create_user(username=f'budget_author_{rows}_{i}')
+                Answer.objects.create(author=author, question=question, message=f'Answer {i}', correct=False)
+
+        self.measure_scaling('api-answer-list', 4, seed_answers, reverse('api-answer-list', args=[question_id]))
+
+    def test_question_tag_list(self):
+        question_id = create_bulk_test_data(1)[0]
+        self.measure('api-tag-list', reverse('api-tag-list', args=[question_id]), 4)
@@ -0,0 +1,61 @@
+import time
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from basesite.models import Question
+from hasker_api.serializers import QuestionSerializer
+from tests.basesite.test_performance.test_query_budgets import QueryBudgetTestCase
+
+
+class ResolverQuestionSerializer(QuestionSerializer):
+    """QuestionSerializer as it was: reverse() and build_absolute_uri() for every URL of every row"""
+    url = serializers.SerializerMethodField()
+    tags_url = serializers.SerializerMethodField()
+    answers_url = serializers.SerializerMethodField()
+
+    def get_url(self, obj):
+        return self.context['request'].build_absolute_uri(obj.api_url)
+
+    def get_tags_url(self, obj):
+        return self.context['request'].build_absolute_uri(obj.api_tags_url)
+
+    def get_answers_url(self, obj):
+        return self.context['request'].build_absolute_uri(obj.api_answers_url)
+
+
+class SerializationBenchmarkTest(QueryBudgetTestCase):
+    """Serialization time per 1000 rows, without the database: the resolver per row (before) vs URL templates"""
+    rows = 1000
+    repeat = 3
+
+    def serialize(self, serializer_class, questions, request):
+        best = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            data = serializer_class(questions, many=True, context={'request': request}).data
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return data, best
+
+    def test_question_serialization(self):
+        request = Request(APIRequestFactory().get('/api/v1/questions/', HTTP_HOST='localhost'))
+        now = timezone.now()
+        questions = [Question(id=i + 1, author_id=1, author_name='author', title=f'Question {i}', message='Content',
+                              date_created=now, votes=i, answer_count=i % 3, tags_cache=[]) for i in range(self.rows)]
+        before, before_time = self.serialize(ResolverQuestionSerializer, questions, request)
+        with mock.patch('hasker_api.serializers.reverse', wraps=reverse) as serializer_reverse, \
+                mock.patch('basesite.models.reverse', wraps=reverse) as model_reverse:
+            after, after_time = self.serialize(QuestionSerializer, questions, request)
+        self.assertEqual(before, after)
+        self.assertEqual('http://localhost/api/v1/questions/1000/answers/', after[-1]['answers_url'])
+        # the timings are reported only: the resolver is not called per row, whatever the speed of the machine
+        self.assertEqual(0, model_reverse.call_count)
+        self.assertEqual(3 * self.repeat, serializer_reverse.call_count)  # url, tags_url, answers_url per serializer
+        for name, elapsed in (('serialize-questions-resolver', before_time), ('serialize-questions', after_time)):
+            self.report(f'{name}[rows={self.rows}]', {'queries': 0, 'db_time': 0, 'render_time': elapsed,
+                                                      'total_time': elapsed})
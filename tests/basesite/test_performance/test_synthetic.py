@@ -0,0 +1,80 @@
+import random
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, F, Sum
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from basesite.load_driver import build_endpoints, percentile, run_load
+from basesite.models import Question, Answer, Tag, QuestionVotedBy, AnswerVotedBy, Counter
+from basesite.search import search_questions
+from basesite.synthetic import SyntheticDataGenerator, ZipfSampler
+
+
+class SyntheticDataTest(TestCase):
+    def test_generated_data_is_consistent(self):
+        created = SyntheticDataGenerator(users=20, tags=30, questions=120, batch_size=50, seed=1).generate()
+        self.assertEqual(120, Question.objects.count())
+        self.assertEqual((created['answers'], created['tags']), (Answer.objects.count(), Tag.objects.count()))
+        self.assertEqual(created['votes'], QuestionVotedBy.objects.count() + AnswerVotedBy.objects.count())
+        self.assertEqual(120, Counter.get_value(Counter.QUESTIONS))
+        votes = dict(QuestionVotedBy.objects.values_list('question').annotate(Sum('vote')))
+        for question in Question.objects.annotate(answers_number=Count('answers')):
+            self.assertEqual(question.answers_number, question.answer_count)
+            self.assertEqual(votes.get(question.id, 0), question.votes)
+            self.assertCountEqual(Question.build_tags_cache(question.tags.all()), question.tags_cache)
+        for tag in Tag.objects.annotate(questions_number=Count('question')):
+            self.assertEqual(tag.questions_number, tag.question_count)
+        accepted = Question.objects.filter(accepted_answer__isnull=False)
+        self.assertTrue(accepted.exists())
+        self.assertFalse(accepted.exclude(accepted_answer__question=F('pk')).exists())  # answers of their questions
+        self.assertTrue(search_questions(Question.objects.all(), 'python').exists())
+
+    def test_no_answers_from_the_future(self):
+        SyntheticDataGenerator(users=5, tags=5, questions=30, days=0.1, seed=4).generate()  # asked in the last hours
+        self.assertTrue(Answer.objects.exists())
+        self.assertFalse(Answer.objects.filter(date_created__gt=timezone.now()).exists())
+        self.assertFalse(Answer.objects.filter(date_created__lt=F('question__date_created')).exists())
+
+    def test_zipf_skew(self):
+        sampler = ZipfSampler(range(100), 1.1, random.Random(1))
+        draws = [sampler.sample(1)[0] for _ in range(2000)]
+        self.assertGreater(draws.count(0), draws.count(50) * 10)
+        self.assertEqual(5, len(set(sampler.sample(5))))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('generate_data', users=5, tags=5, questions=10, seed=2, stdout=out)
+        self.assertIn('Created 5 users, 5 tags, 10 questions', out.getvalue())
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual((50, 95, 99, 100), tuple(percentile(values, p) for p in (50, 95, 99, 100)))
+        self.assertEqual(7, percentile([7], 99))
+
+
+class LoadDriverTest(TransactionTestCase):
+    def setUp(self) -> None:
+        SyntheticDataGenerator(users=10, tags=10, questions=30, seed=3).generate()
+
+    def test_every_endpoint_is_reported(self):
+        endpoints = build_endpoints(random.Random(3))
+        report = run_load(requests=200, concurrency=1, seed=3)
+        rows = {row['endpoint']: row for row in report.rows()}
+        self.assertEqual({endpoint.name for endpoint in endpoints} | {'total'}, set(rows))
+        self.assertEqual(200, rows['total']['requests'])
+        self.assertEqual(0, rows['total']['errors'])
+        self.assertLessEqual(rows['total']['p50'], rows['total']['p99'])
+
+    def test_concurrent_reads(self):
+        endpoints = [endpoint for endpoint in build_endpoints(random.Random(4)) if endpoint.name != 'vote']
+        report = run_load(requests=60, concurrency=3, seed=4, endpoints=endpoints)
+        self.assertEqual(60, len(report.results))
+        self.assertEqual([], [result for result in report.results if result.status >= 500])  # 404: pages past the end
+
+    def test_command(self):
+        out = StringIO()
+        call_command('load_benchmark', requests=20, concurrency=2, seed=5, stdout=out)
+        self.assertIn('p99 ms', out.getvalue())
+        self.assertIn('20 requests in', out.getvalue())
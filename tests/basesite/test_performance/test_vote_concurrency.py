@@ -0,0 +1,61 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections, OperationalError
+from django.test import TransactionTestCase
+
+from basesite.models import Question, Answer, QuestionVotedBy, AnswerVotedBy
+
+
+class VoteConcurrencyTest(TransactionTestCase):
+    """
+    Fires votes from many threads (every thread works through its own DB connection) and checks no vote is lost
+    or counted twice, including repeated clicks of the same user. SQLite has no concurrent writers and reports
+    locked tables instead of waiting, such attempts are rolled back as a whole and retried
+    """
+    users_number = 300
+    clicks_per_vote = 3  # the same vote sent several times, only the first one counts
+    workers = 4
+
+    def setUp(self) -> None:
+        cache.clear()  # a trending list left by other tests would be read by vote receivers, after the vote's commit
+        User.objects.bulk_create([User(username=f'voter{i}') for i in range(self.users_number)])
+        self.users = list(User.objects.filter(username__startswith='voter'))
+        self.question = Question.objects.create(author=self.users[0], title='Concurrent Q', message='Q content')
+        self.answer = Answer.objects.create(author=self.users[0], question=self.question, message='A content',
+                                            correct=False)
+
+    @staticmethod
+    def _vote(model, target_id, user, increment, filters):
+        try:
+            while True:
+                try:
+                    return model.apply_vote(target_id, user, increment, **filters)
+                except OperationalError:
+                    time.sleep(0.001)
+        finally:
+            connections.close_all()
+
+    def test_parallel_votes_are_exact(self):
+        rnd = random.Random(42)
+        increments = {user.id: rnd.choice((-1, 1)) for user in self.users}
+        tasks = []
+        for user in self.users:
+            tasks += [(Question, self.question.id, user, increments[user.id], {})] * self.clicks_per_vote
+            tasks += [(Answer, self.answer.id, user, -increments[user.id], {'question_id': self.question.id})] \
+                * self.clicks_per_vote
+        rnd.shuffle(tasks)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(lambda task: self._vote(*task), tasks))
+
+        self.assertEqual(2 * self.users_number, sum(results))  # one counted click per user and object
+        expected = sum(increments.values())
+        self.question.refresh_from_db()
+        self.answer.refresh_from_db()
+        self.assertEqual(expected, self.question.votes)
+        self.assertEqual(-expected, self.answer.votes)
+        self.assertEqual(self.users_number, QuestionVotedBy.objects.filter(question=self.question).count())
+        self.assertEqual(self.users_number, AnswerVotedBy.objects.filter(answer=self.answer).count())
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from urllib.parse import urlparse, parse_qs
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from basesite.models import Question, Answer
+from tests.basesite.utils import create_bulk_test_data, get_logged_user
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ids = create_bulk_test_data(45, answers_per_question=0)
+        Question.objects.filter(pk__in=self.ids[:10]).update(date_created=timezone.now() - timedelta(days=1))
+
+    def walk(self, url, params):
+        """Titles of all pages, following next page links, and the query of the page before the last one"""
+        response = self.client.get(url, params)
+        titles = [q.title for q in response.context_data['page_obj']]
+        while response.context_data['next_page_query']:
+            response = self.client.get(f"{url}?{response.context_data['next_page_query']}")
+            titles += [q.title for q in response.context_data['page_obj']]
+        return titles, response.context_data['previous_page_query']
+
+    def test_same_rows_as_page_numbers(self):
+        for ordering in ('-date_created', '-votes', 'hot'):
+            titles, previous_query = self.walk(reverse('list'), {'ordering': ordering, 'cursor': ''})
+            expected = []
+            for page in (1, 2, 3):
+                response = self.client.get(reverse('list'), {'ordering': ordering, 'page': page})
+                expected += [q.title for q in response.context_data['page_obj']]
+            self.assertEqual(expected, titles, ordering)
+            self.assertEqual(45, len(set(titles)))
+            self.assertIn(f'ordering={ordering}', previous_query)
+            response = self.client.get(f"{reverse('list')}?{previous_query}")  # back from the last page
+            self.assertEqual(expected[20:40], [q.title for q in response.context_data['page_obj']])
+
+    def test_template_links(self):
+        response = self.client.get(reverse('list'), {'cursor': ''})
+        self.assertTrue(response.context_data['cursor_pagination'])
+        self.assertIsNone(response.context_data['paginator'])  # no count
+        self.assertIsNone(response.context_data['previous_page_query'])
+        self.assertContains(response, '>Next</a>')
+        self.assertNotContains(response, '>Previous</a>')
+
+    def test_deep_page_costs_the_same(self):
+        response = self.client.get(reverse('list'), {'cursor': ''})
+        with self.assertNumQueries(1):  # the page only: no count, trending comes from the cache
+            self.client.get(f"{reverse('list')}?{response.context_data['next_page_query']}")
+
+    def test_invalid_cursor(self):
+        self.assertEqual(404, self.client.get(reverse('list'), {'cursor': 'garbage'}).status_code)
+        response = self.client.get(reverse('list'), {'cursor': ''})
+        next_query = parse_qs(response.context_data['next_page_query'])
+        response = self.client.get(reverse('list'), {'cursor': next_query['cursor'][0], 'ordering': '-votes'})
+        self.assertEqual(404, response.status_code)  # cursor of another ordering
+
+    def test_answers(self):
+        question = Question.objects.get(pk=self.ids[0])
+        for i in range(35):
+            Answer.objects.create(author=question.author, question=question, message=f'Answer {i}',
+                                  correct=i == 7, votes=i % 3)
+        url = reverse('question-detail', args=[question.id])
+        response = self.client.get(url, {'cursor': ''})
+        self.assertEqual('Answer 7', response.context_data['accepted_answer'].message)  # above the first page
+        first_page = [a.message for a in response.context_data['page_obj']]
+        self.assertEqual(30, len(first_page))
+        response = self.client.get(f"{url}?{response.context_data['next_page_query']}")
+        self.assertIsNone(response.context_data['accepted_answer'])
+        second_page = [a.message for a in response.context_data['page_obj']]
+        self.assertEqual(4, len(second_page))
+        self.assertEqual(35, len(set(['Answer 7'] + first_page + second_page)))
+
+    def test_api(self):
+        get_logged_user(self.client)
+        url = reverse('api-question-list') + '?ordering=-votes&cursor='
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual({'next', 'previous', 'results'}, set(response.data.keys()))
+            titles += [q['title'] for q in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(45, len(set(titles)))
+        self.assertEqual(list(Question.objects.order_by('-votes', '-id').values_list('title', flat=True)), titles)
+        previous = urlparse(response.data['previous'])
+        self.assertIn('ordering=-votes', previous.query)
+        response = self.client.get(reverse('api-question-list') + '?cursor=garbage')
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,91 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from basesite.models import Question, Answer, UserProfile
+from basesite.templatetags.fragments import naturaltime_key
+from tests.basesite.utils import create_test_data
+
+
+def csrf_free(response):
+    return re.sub(r'csrfmiddlewaretoken: "\w+"', '', response.content.decode())
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ids = create_test_data()
+        self.author = User.objects.get(pk=self.ids['u'])
+        self.detail_url = reverse('question-detail', args=[self.ids['q2']])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return len(context.captured_queries), response
+
+    def test_cached_detail_skips_fragment_queries(self):
+        rendered, first = self.count_queries(self.detail_url)
+        cached, second = self.count_queries(self.detail_url)
+        self.assertLess(cached, rendered)  # tags, authors and avatars of the question and answers
+        self.assertEqual(csrf_free(first), csrf_free(second))
+
+    def test_fragments_follow_changes(self):
+        self.client.get(self.detail_url)
+        self.client.get(reverse('list'))
+        Answer.apply_vote(self.ids['a2_1'], self.author, 1)
+        Question.apply_vote(self.ids['q2'], self.author, 1)
+        self.client.force_login(self.author)
+        self.client.post(reverse('accept-answer', args=[self.ids['q2'], self.ids['a2_1']]),
+                         {'answer_id': self.ids['a2_1']})
+        self.client.logout()
+        content = self.client.get(self.detail_url).content.decode()
+        accepted = content.index('Accepted answer')
+        self.assertLess(content.index('A to Q2, content'), content.index('A to Q2 number 3, content'))
+        self.assertLess(accepted, content.index('A to Q2, content'))  # the badge moved to the accepted answer
+        self.assertEqual(1, content.count('Accepted answer'))
+        row = self.client.get(reverse('list'), {'ordering': '-votes'}).content.decode()
+        self.assertIn('3<br>Votes', row)  # q2 had 2 votes
+
+    def test_avatar_change(self):
+        UserProfile.objects.create(user=self.author, email=self.author.email)
+        self.client.get(self.detail_url)
+        profile = self.author.userprofile
+        profile.avatar = 'avatars/new.png'
+        with self.captureOnCommitCallbacks(execute=True):  # generations are bumped once writes commit
+            profile.save()
+        self.assertEqual(4, self.client.get(self.detail_url).content.decode().count('avatars/new.png'))  # q + 3 a
+
+    def test_user_specific_parts_are_not_cached(self):
+        self.client.get(self.detail_url)  # fragments cached by an anonymous request
+        self.client.force_login(self.author)
+        self.assertContains(self.client.get(self.detail_url), 'a-accept">', count=3)
+        self.client.force_login(User.objects.create_user('other', 'other@test.com', 'QWEr4$31'))
+        self.assertNotContains(self.client.get(self.detail_url), 'a-accept">')
+        self.assertContains(self.client.get(self.detail_url), 'bi-chevron-up a-upvote', count=3)
+
+    def test_trending_column(self):
+        self.client.get(reverse('list'))
+        Question.apply_vote(self.ids['q3'], self.author, 1)
+        Question.apply_vote(self.ids['q3'], User.objects.create_user('voter'), 1)
+        Question.apply_vote(self.ids['q3'], User.objects.create_user('voter2'), 1)
+        content = self.client.get(reverse('list')).content.decode()
+        column = content[content.index('Trending'):]
+        self.assertLess(column.index('Q3 title'), column.index('Q title'))  # 4 votes now, ahead of q1 with 3
+
+    def test_naturaltime_key(self):
+        now = timezone.now()
+        self.assertNotEqual(naturaltime_key(now - timedelta(seconds=5)), naturaltime_key(now - timedelta(seconds=6)))
+        self.assertEqual(naturaltime_key(now - timedelta(minutes=5, seconds=1)),
+                         naturaltime_key(now - timedelta(minutes=5, seconds=50)))
+        self.assertEqual(naturaltime_key(now - timedelta(days=3, minutes=1)),
+                         naturaltime_key(now - timedelta(days=3, minutes=50)))
+        self.assertNotEqual(naturaltime_key(now - timedelta(days=3, hours=1)), naturaltime_key(now - timedelta(days=3)))
+        self.assertEqual(naturaltime_key(now - timedelta(days=30, hours=1)),
+                         naturaltime_key(now - timedelta(days=30, hours=5)))
@@ -5,12 +5,13 @@ from django.template.response import TemplateResponse
 from django.test import TestCase
 from django.urls import reverse
 
+from basesite.models import Question, Answer
 from tests.basesite.utils import create_test_data
 
 
 class FuncViewAcceptAnswerTest(TestCase):
     def setUp(self) -> None:
-        ids = create_test_data()
+        self.ids = ids = create_test_data()
         self.data = {
             'question_id': ids['q1'],
             'answer_id': ids['a1'],
@@ -56,3 +57,15 @@ class FuncViewAcceptAnswerTest(TestCase):
         self.assertEqual(200, response.status_code)
         content = json.loads(response.content)
         self.assertEqual('Success', content['result'])
+
+    def test_one_statement(self):
+        user = User.objects.get(pk=self.ids['u'])
+        with self.assertNumQueries(1):
+            self.assertTrue(Question.accept_answer(self.ids['q2'], self.ids['a2_1'], user))
+        self.assertEqual(self.ids['a2_1'], Question.objects.get(pk=self.ids['q2']).accepted_answer_id)
+        self.assertEqual([self.ids['a2_1']], [answer.id for answer in Answer.objects.with_correct() if answer.correct])
+        with self.assertNumQueries(1):  # an answer of another question
+            self.assertFalse(Question.accept_answer(self.ids['q2'], self.ids['a1'], user))
+        other = User.objects.create_user(username='not_the_author')
+        self.assertFalse(Question.accept_answer(self.ids['q2'], self.ids['a2_2'], other))
+        self.assertEqual(self.ids['a2_1'], Question.objects.get(pk=self.ids['q2']).accepted_answer_id)
@@ -1,16 +1,70 @@
 import json
 
+from django.contrib.auth.models import User
 from django.template.response import TemplateResponse
 from django.test import TestCase
 from django.urls import reverse
 
+from basesite.models import Question, Tag
+from basesite.tag_index import tag_index
 from tests.basesite.utils import create_test_data
 
 
 class FuncViewTagTypeahead(TestCase):
+    def setUp(self) -> None:
+        tag_index.invalidate()  # the index outlives rolled back test data
+
+    def typeahead(self, query):
+        response = self.client.get(f"{reverse('tag-typeahead')}?query={query}")
+        return [d['value'] for d in json.loads(response.content)]
+
     def test_get(self):
         create_test_data()
         response: TemplateResponse = self.client.get(f"{reverse('tag-typeahead')}?query=ta")
         content = json.loads(response.content)
         value_exists = any(d['value'] == 'tag1' for d in content)
         self.assertTrue(value_exists)
+
+    def test_ranking(self):
+        u = User.objects.create_user(username='typeahead_user')
+        tags = {name: Tag.objects.create(tag=name) for name in ('python', 'pyramid', 'cpython', 'numpy', 'java')}
+        for i in range(3):
+            q = Question.objects.create(author=u, title=f'Q{i}', message='Content')
+            q.tags.set([tags['pyramid'], tags['cpython']] if i else [tags['pyramid']])
+        self.assertEqual(['pyramid', 'python', 'cpython', 'numpy'], self.typeahead('PY'))  # prefix matches first
+        self.assertEqual(['cpython', 'python'], self.typeahead('ytho'))
+        self.assertEqual([], self.typeahead('ruby'))
+
+    def test_kept_up_to_date(self):
+        create_test_data()
+        self.assertEqual(['tag1'], self.typeahead('tag1'))
+        with self.assertNumQueries(0):
+            self.typeahead('tag')
+        Tag.objects.create(tag='tag10')
+        Tag.objects.get(tag='tag1').delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(['tag10'], self.typeahead('tag1'))
+        tag = Tag.objects.get(tag='tag10')
+        tag.tag = 'renamed'
+        tag.save()
+        self.assertEqual(['renamed'], self.typeahead('ren'))
+
+    def test_tags_differing_by_case(self):
+        u = User.objects.create_user(username='typeahead_user')
+        upper, lower = Tag.objects.create(tag='Python'), Tag.objects.create(tag='python')
+        self.assertEqual(['Python', 'python'], self.typeahead('pyth'))
+        q = Question.objects.create(author=u, title='Q', message='Content')
+        q.tags.set([lower])
+        self.assertEqual(['python', 'Python'], self.typeahead('pyth'))  # most used first
+        upper.delete()
+        self.assertEqual(['python'], self.typeahead('pyth'))
+        q.tags.remove(lower)  # usage of the remaining tag, not of the deleted one
+        self.assertEqual(['python'], self.typeahead('yth'))
+        lower.delete()
+        q.tags.add(Tag.objects.create(tag='PYTHON'))
+        self.assertEqual(['PYTHON'], self.typeahead('python'))
+
+    def test_cache_headers(self):
+        response = self.client.get(f"{reverse('tag-typeahead')}?query=ta")
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
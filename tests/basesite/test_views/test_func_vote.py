@@ -1,10 +1,12 @@
 import json
 
 from django.contrib.auth.models import User
+from django.db import IntegrityError
 from django.template.response import TemplateResponse
 from django.test import TestCase
 from django.urls import reverse
 
+from basesite.models import Question, QuestionVotedBy, AnswerVotedBy
 from tests.basesite.utils import create_test_data
 
 
@@ -93,3 +95,21 @@ class FuncViewVoteTest(TestCase):
                                                       self.data_a)
         content = json.loads(response.content)
         self.assertEqual('Already voted', content['result'])
+
+    def test_post_q_upvote_counted_once(self):
+        self.client.force_login(self.user)
+        votes_before = Question.objects.get(pk=self.data_q['instance_id']).votes
+        for _ in range(3):
+            self.client.post(reverse('vote', args=[self.data_q['instance_id']]), self.data_q)
+        self.assertEqual(votes_before + 1, Question.objects.get(pk=self.data_q['instance_id']).votes)
+        self.assertEqual(1, QuestionVotedBy.objects.filter(user=self.user).count())
+        with self.assertRaises(IntegrityError):
+            QuestionVotedBy.objects.create(user=self.user, question_id=self.data_q['instance_id'], vote=1)
+
+    def test_post_a_of_another_question(self):
+        self.client.force_login(self.user)
+        response: TemplateResponse = self.client.post(reverse('vote', args=[self.data_q['instance_id'] + 1]),
+                                                      self.data_a)  # answer belongs to another question
+        content = json.loads(response.content)
+        self.assertIn('Wrong request data: ', content['result'])
+        self.assertEqual(0, AnswerVotedBy.objects.count())
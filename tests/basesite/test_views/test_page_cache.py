@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from basesite.models import Question, Answer, Tag
+from tests.basesite.utils import create_test_data
+
+
+class PageCacheTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.ids = create_test_data()
+        self.author = User.objects.get(pk=self.ids['u'])
+        self.detail_url = reverse('question-detail', args=[self.ids['q2']])
+
+    def assertCached(self, url, params=None):
+        with self.assertNumQueries(0):
+            return self.client.get(url, params)
+
+    def assertNotCached(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertTrue(context.captured_queries, f'{url} was served from the cache')
+        return response
+
+    def test_anonymous_pages_are_cached(self):
+        for url, params in ((reverse('list'), {}), (reverse('tag-list', args=['tag1']), {}),
+                            (self.detail_url, {}), (reverse('search'), {'q': 'title'})):
+            response = self.client.get(url, params)
+            self.assertEqual(200, response.status_code)
+            cached = self.assertCached(url, params)
+            self.assertEqual(response.content, cached.content)
+            self.assertIn('public', cached['Cache-Control'])
+            self.assertIn('max-age=5', cached['Cache-Control'])
+            self.assertIn('Cookie', cached['Vary'])
+            self.assertNotIn('csrftoken', response.cookies)
+
+    def test_query_parameters(self):
+        url = reverse('list')
+        newest = self.client.get(url).content
+        top = self.client.get(url, {'ordering': '-votes'}).content
+        self.assertNotEqual(newest, top)
+        self.assertEqual(top, self.assertCached(url, {'ordering': '-votes'}).content)
+        self.assertEqual(newest, self.assertCached(url, {'utm_source': 'feed'}).content)  # not a page parameter
+        with self.assertNumQueries(2):  # page (count is maintained, trending is cached)
+            self.client.get(url, {'ordering': '-votes', 'page': 1})
+
+    def test_logged_in_users_are_not_served_cached_pages(self):
+        self.client.get(reverse('list'))
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('list'))
+        self.assertContains(response, 'Log Out')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotCached(reverse('list'))
+        self.client.logout()
+        self.assertNotContains(self.client.get(reverse('list')), 'Log Out')
+
+    def test_invalidation_is_precise(self):
+        other_tag = Tag.objects.create(tag='other')
+        Question.objects.get(pk=self.ids['q3']).tags.add(other_tag)
+        other_detail_url = reverse('question-detail', args=[self.ids['q3']])
+        urls = [reverse('list'), reverse('tag-list', args=['tag1']), reverse('tag-list', args=['other']),
+                self.detail_url, other_detail_url]
+        for url in urls:
+            self.client.get(url)
+
+        Answer.apply_vote(self.ids['a2_1'], self.author, 1, question_id=self.ids['q2'])
+        self.assertNotCached(self.detail_url)
+        for url in urls[:3] + [other_detail_url]:
+            self.assertCached(url)
+
+        with self.captureOnCommitCallbacks(execute=True):  # generations are bumped once writes commit
+            Answer.objects.create(author=self.author, question_id=self.ids['q3'], message='Fresh answer', correct=False)
+        self.assertContains(self.client.get(other_detail_url), 'Fresh answer')
+        self.assertNotCached(reverse('tag-list', args=['other']))  # answer count of q3
+        self.assertCached(reverse('tag-list', args=['tag1']))
+        self.assertCached(self.detail_url)
+
+    def test_trending_change_invalidates_every_page(self):
+        urls = [reverse('list'), reverse('tag-list', args=['tag1']), self.detail_url]
+        for url in urls:
+            self.client.get(url)
+        Question.apply_vote(self.ids['q1'], self.author, 1)  # q1 is in the trending column of every page
+        for url in urls:
+            self.assertNotCached(url)
+        self.assertContains(self.client.get(reverse('list')), '4<br>Votes')
+
+    def test_accept_answer(self):
+        self.client.get(self.detail_url)
+        self.client.force_login(self.author)
+        self.client.post(reverse('accept-answer', args=[self.ids['q2'], self.ids['a2_1']]),
+                         {'answer_id': self.ids['a2_1']})
+        self.client.logout()
+        content = self.client.get(self.detail_url).content.decode()
+        self.assertLess(content.index('Accepted answer'), content.index('A to Q2, content'))
+        self.assertLess(content.index('A to Q2, content'), content.index('A to Q2 number 3, content'))
@@ -0,0 +1,58 @@
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from basesite.models import Question, Counter
+from basesite.pagination import CountingPaginator
+from tests.basesite.utils import create_bulk_test_data, get_logged_user
+
+
+class PaginationCountTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        create_bulk_test_data(25, answers_per_question=0)
+
+    def test_maintained_counts(self):
+        Counter.objects.filter(name=Counter.QUESTIONS).update(value=1234)  # proves where the count comes from
+        response = self.client.get(reverse('list'))
+        self.assertEqual(1234, response.context_data['paginator'].count)
+        self.assertContains(response, '1,234 total')
+        response = self.client.get(reverse('tag-list', args=['bulktag0']))
+        self.assertEqual(25, response.context_data['paginator'].count)
+        with self.assertNumQueries(2):  # tag, page (trending is cached): no COUNT(*)
+            self.client.get(reverse('tag-list', args=['bulktag0']), {'page': 1})  # not the page cached above
+
+    def test_missing_counter(self):
+        Counter.objects.all().delete()
+        response = self.client.get(reverse('list'))  # estimated instead, capped count on SQLite
+        self.assertEqual(25, response.context_data['paginator'].count)
+
+    @override_settings(PAGINATION_COUNT_CAP=15)
+    def test_capped_search_count(self):
+        url = f"{reverse('search')}?{urlencode({'q': 'Bulk'})}"
+        response = self.client.get(url)
+        paginator = response.context_data['paginator']
+        self.assertEqual((15, False), (paginator.count, paginator.count_is_exact))
+        self.assertContains(response, '15+ total')
+        response = self.client.get(f'{url}&page=2')  # past the capped count
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(5, len(response.context_data['page_obj']))
+        self.assertFalse(response.context_data['page_obj'].has_next())
+        self.assertEqual(200, self.client.get(f'{url}&page=3').status_code)
+        self.assertEqual(404, self.client.get(f'{url}&page=0').status_code)
+
+    def test_exact_below_cap(self):
+        paginator = CountingPaginator(Question.objects.order_by('id'), 20, count_mode='capped')
+        self.assertEqual((25, True), (paginator.count, paginator.count_is_exact))
+        self.assertEqual('25', paginator.count_label)
+
+    @override_settings(PAGINATION_COUNT_CAP=15)
+    def test_api(self):
+        get_logged_user(self.client)
+        response = self.client.get(reverse('api-question-list'))
+        self.assertEqual((25, True, 2), (response.data['count'], response.data['count_exact'],
+                                         response.data['page_count']))
+        response = self.client.get(f"{reverse('api-question-list')}?search=Bulk")
+        self.assertEqual((15, False), (response.data['count'], response.data['count_exact']))
@@ -2,7 +2,7 @@ from django.contrib.auth.models import User
 from django.test import TestCase
 from django.urls import reverse
 
-from basesite.models import Question
+from basesite.models import Question, Tag
 
 
 class QuestionCreateViewTest(TestCase):
@@ -30,6 +30,18 @@ class QuestionCreateViewTest(TestCase):
         response = self.client.post(reverse('create'), create_data)
         self.assertEqual(302, response.status_code)
 
+    def test_post_queries_do_not_depend_on_slug_collisions(self):
+        self.client.force_login(self.user)
+        create_data = {'title': 'Question title', 'message': 'Question message', 'tags': ['foo-', 'foo--', 'foo---']}
+        self.client.post(reverse('create'), create_data)  # warm up per-process lookups
+        Tag.objects.bulk_create(Tag(tag=f'foo{"ш" * i}', slug=f'foo{i}') for i in range(3, 50))
+        create_data['tags'] = ['fooы', 'fooъ', 'fooэ']
+        with self.assertNumQueries(18):
+            response = self.client.post(reverse('create'), create_data)
+        self.assertEqual(302, response.status_code)
+        question = Question.objects.latest('id')
+        self.assertEqual(['foo50', 'foo51', 'foo52'], sorted(t.slug for t in question.tags.all()))
+
     def test_post_validaton_errors(self):
         self.client.force_login(self.user)
         create_data = {
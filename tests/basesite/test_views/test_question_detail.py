@@ -1,12 +1,18 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
 from django.test import TestCase
 from django.urls import reverse
 
-from basesite.models import Answer
+from basesite.models import Answer, Question, UserProfile
+from basesite.trending import get_trending_questions
 from tests.basesite.utils import create_test_data
 
 
 class QuestionDetailViewTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_not_exists(self):
         response = self.client.get(reverse('question-detail', args='1'))
         self.assertEqual(404, response.status_code)
@@ -43,3 +49,49 @@ class QuestionDetailViewTest(TestCase):
 
         answers = Answer.objects.filter(message='Test answer message')
         self.assertEqual(1, answers.count())
+
+    def test_constant_queries(self):
+        ids = create_test_data()
+        # ahead of q2 in trending, even if q2 was asked a second later
+        Question.objects.filter(pk=ids['q1']).update(hot_score=F('hot_score') + 3600)
+        get_trending_questions()  # cached as on a running site, answers to its first question do not change it
+        question = Question.objects.get(pk=ids['q1'])
+        url = reverse('question-detail', args=[question.id])
+        for i in range(3):  # answers by authors of their own, with avatars
+            author = User.objects.create_user(username=f'answerer{i}', password='QWEr4$31')
+            with self.captureOnCommitCallbacks(execute=True):  # generations are bumped once writes commit
+                UserProfile.objects.create(user=author, email=f'answerer{i}@test.com',
+                                           avatar=f'avatars/answerer{i}.png')
+                Answer.objects.create(author=author, question=question, message=f'Answer number {i}', correct=False)
+            # question (with author and profile), answers (with theirs); tags are read from tags_cache
+            with self.assertNumQueries(2):
+                response = self.client.get(url)  # not cached: the new answer invalidated the page
+            self.assertContains(response, f'avatars/answerer{i}.png')
+            self.assertContains(response, 'tag1')
+
+        self.client.force_login(User.objects.get(pk=ids['u']))
+        with self.assertNumQueries(6):  # and session, user, the user's profile for the navbar avatar, the user's votes
+            self.client.get(url)
+
+    def test_user_votes(self):
+        ids = create_test_data()
+        voter = User.objects.create_user(username='detail_voter', password='QWEr4$31')
+        Question.apply_vote(ids['q2'], voter, 1)
+        Answer.apply_vote(ids['a2_1'], voter, -1)
+        Answer.apply_vote(ids['a2_2'], voter, 1)
+        Answer.apply_vote(ids['a2_2'], voter, -1)  # cancelled
+        self.assertEqual((1, {ids['a2_1']: -1, ids['a2_2']: 0}),
+                         Question.user_votes(voter, ids['q2'], [ids['a2_1'], ids['a2_2'], ids['a2_3']]))
+
+        url = reverse('question-detail', args=[ids['q2']])
+        self.client.get(url)
+        self.client.force_login(voter)
+        get_trending_questions()
+        with self.assertNumQueries(6):  # session, user, profile, question, answers and the votes of them all
+            response = self.client.get(url)
+        self.assertContains(response, 'q-upvote text-primary')
+        self.assertContains(response, f'class="col-md-1 a-vote-{ids["a2_1"]}" data-vote="-1"')
+        self.assertContains(response, f'class="col-md-1 a-vote-{ids["a2_2"]}" data-vote="0"')
+        self.assertContains(response, f'class="col-md-1 a-vote-{ids["a2_3"]}" data-vote="0"')
+        self.assertContains(response, 'a-downvote text-primary', count=1)
+        self.assertNotContains(response, 'a-upvote text-primary')
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.template.response import TemplateResponse
 from django.test import TestCase
 from django.urls import reverse
@@ -6,6 +7,9 @@ from tests.basesite.utils import create_test_data
 
 
 class QuestionListViewTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_response_no_questions(self):
         response = self.client.get(reverse('list'))
         self.assertEqual(200, response.status_code)
@@ -21,7 +25,7 @@ class QuestionListViewTest(TestCase):
         self.assertContains(response, expected_response_content)
         self.assertEqual('-date_created', response.context_data['ordering'])
         self.assertEqual(3, len(response.context_data['object_list']))
-        self.assertEqual(3, len(response.context_data['trending_object_list']))
+        self.assertEqual(3, len(response.context['trending_object_list']))  # from context processor
 
     def test_response_ordering(self):
         create_test_data()
@@ -31,11 +35,11 @@ class QuestionListViewTest(TestCase):
         idx1 = response.content.find(b'Q title')
         idx2 = response.content.find(b'Q2 title')
         self.assertGreater(idx1, idx2)
-        # yet, in trending Q2 will be earlier that Q due to higher votes
+        # yet, in trending Q3 will be after Q2 as it ranks lower with fewer votes and no answers
         trending_idx = response.content.index(b'Trending')
-        idx1 = response.content.find(b'Q title', trending_idx)
         idx2 = response.content.find(b'Q2 title', trending_idx)
-        self.assertGreater(idx2, idx1)
+        idx3 = response.content.find(b'Q3 title', trending_idx)
+        self.assertGreater(idx3, idx2)
         # now, change ordering
         response: TemplateResponse = self.client.get(reverse('list') + '?ordering=-votes')
         self.assertEqual(200, response.status_code)
@@ -45,6 +49,6 @@ class QuestionListViewTest(TestCase):
         self.assertEqual('-votes', response.context_data['ordering'])
         # but the trending is still the same
         trending_idx = response.content.index(b'Trending')
-        idx1 = response.content.find(b'Q title', trending_idx)
         idx2 = response.content.find(b'Q2 title', trending_idx)
-        self.assertGreater(idx2, idx1)
+        idx3 = response.content.find(b'Q3 title', trending_idx)
+        self.assertGreater(idx3, idx2)
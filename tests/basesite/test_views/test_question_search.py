@@ -1,5 +1,6 @@
 from urllib.parse import urlencode
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -7,6 +8,9 @@ from tests.basesite.utils import create_test_data
 
 
 class QuestionSearchListViewTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_get_not_found(self):
         response = self.client.get(f"{reverse('search')}?q=test")
         self.assertEqual(200, response.status_code)
@@ -25,7 +29,8 @@ class QuestionSearchListViewTest(TestCase):
         create_test_data()
         response = self.client.get(f"{reverse('search')}?{urlencode({'q': 'tag:tag1'})}")
         self.assertEqual(302, response.status_code)
-        self.assertRedirects(response, reverse('tag-list', args=['tag1']))
+        # the target is fetched below: fetched here too, it would be served from the page cache there
+        self.assertRedirects(response, reverse('tag-list', args=['tag1']), fetch_redirect_response=False)
         response = self.client.get(response.url)
         self.assertEqual(200, response.status_code)
         tags_found_for_q1 = response.context['page_obj'][0].tags.all()
@@ -1,6 +1,9 @@
+import time
+
 from django.contrib.auth.models import User
+from django.db import connection
 
-from basesite.models import Question, Answer, Tag
+from basesite.models import Question, Answer, Tag, UserProfile
 
 
 def create_test_data():
@@ -43,3 +46,51 @@ def create_test_data():
 def get_logged_user(client):
     u = User.objects.create_user(username='user_to_login', password="QWEr4$31", email='user_to_login@test.com')
     client.force_login(u)
+
+
+def create_bulk_test_data(questions, answers_per_question=3, tags_per_question=2, username='bulkuser'):
+    """
+    Create a dataset of a given size for performance tests: every question gets its own answers and tags shared among
+    questions, authors have profiles as real sign-ups do
+    :return: ids of created questions
+    """
+    u, created = User.objects.get_or_create(username=username, defaults={'email': f'{username}@test.com'})
+    if created:
+        UserProfile.objects.create(user=u, email=u.email)
+    tags = [Tag.objects.get_or_create(tag=f'bulktag{i}')[0] for i in range(tags_per_question)]
+    question_ids = []
+    for i in range(questions):
+        q = Question.objects.create(author=u, title=f'Bulk Q {i} title', message=f'Bulk Q {i} content', votes=i % 7)
+        q.tags.set(tags)
+        for j in range(answers_per_question):
+            Answer.objects.create(author=u, question=q, message=f'Bulk A {j} to Q {i}', correct=False, votes=j)
+        question_ids.append(q.id)
+    return question_ids
+
+
+def measure_request(client, url, method='get', data=None):
+    """
+    Run a request through the test client and return the number of SQL queries, time spent in the database and
+    the rest of the request time (view code and template rendering), in seconds
+    """
+    query_times = []
+
+    def timed_execute(execute, sql, params, many, context):
+        query_start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            query_times.append(time.perf_counter() - query_start)
+
+    with connection.execute_wrapper(timed_execute):
+        start = time.perf_counter()
+        response = getattr(client, method)(url, data)
+        total_time = time.perf_counter() - start
+    db_time = sum(query_times)
+    return {
+        'status_code': response.status_code,
+        'queries': len(query_times),
+        'db_time': db_time,
+        'render_time': max(total_time - db_time, 0),
+        'total_time': total_time,
+    }